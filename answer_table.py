@@ -0,0 +1,210 @@
+"""
+Materialized answers for every one- and two-concern query
+
+There are a few dozen concerns and six skin-type filters (five types and
+none), so every single concern and every concern pair can be answered ahead
+of time. Most traffic is one of these. The results are written to one JSON
+file, with every distinct string stored once in a shared table. An engine
+given the file (answer_table_path) loads it at start-up and answers those
+queries with a dict lookup. Larger concern sets are computed live as before.
+
+A table records the results version it was built for: the dataset hash, the
+ranking settings, the concern priorities and the reference tables (display
+names and aliases, ingredient conflicts and routine rules). An engine whose
+version differs ignores the table rather than serving stale answers.
+
+Build a table, optionally reporting how much of a query log it covers:
+    python -m answer_table skincare_dataset.csv --output answers.json --queries logged.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import SKIN_TYPES
+from conflicts import Conflict
+from ingestion import DatasetValidationError
+from recommendation_index import GENERAL_CONCERN
+
+ANSWER_TABLE_FORMAT = 1
+MAX_CONCERNS = 2  # Largest concern set that is materialized
+SKIN_TYPE_FILTERS = [None] + [skin_type.lower() for skin_type in SKIN_TYPES if skin_type != "Any"]
+# Result fields in the engine's order; 'concerns' is filled in per request
+FIELDS = ('ingredients', 'benefits', 'brands', 'directions', 'notes', 'morning_routine', 'night_routine', 'conflicts')
+
+Key = Tuple[Tuple[str, ...], Optional[str]]  # (sorted concerns, lower-cased skin type or None)
+
+
+class AnswerTable:
+    """Read-only (concern set, skin type) -> result lookup, decoded on demand"""
+
+    def __init__(self, version: str, strings: List[str], conflicts: List[Conflict], rows: Dict[Key, List]):
+        self.version = version
+        self.strings = strings
+        self.conflicts = conflicts
+        self.rows = rows
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, concerns: Tuple[str, ...], skin_type: Optional[str]) -> Optional[Dict]:
+        """The result for sorted concerns and a lower-cased skin type, or None if not materialized"""
+        row = self.rows.get((concerns, skin_type)) if len(concerns) <= MAX_CONCERNS else None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if row is None:
+            return None
+        strings = self.strings
+        ingredients, benefits, brands, directions, notes, morning, night, conflicts = row
+        return {
+            'concerns': list(concerns),
+            'ingredients': [strings[entry] for entry in ingredients],
+            'benefits': strings[benefits],
+            'brands': strings[brands],
+            'directions': strings[directions],
+            'notes': strings[notes],
+            'morning_routine': strings[morning],
+            'night_routine': strings[night],
+            'conflicts': tuple(self.conflicts[entry] for entry in conflicts),
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the counters for metrics scraping"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.rows)}
+
+
+def load_answer_table(path: str) -> AnswerTable:
+    """
+    Read an answer table file
+
+    Raises:
+        DatasetValidationError: the file is missing, unreadable or from another format
+    """
+    try:
+        with open(path, encoding='utf-8') as handle:
+            payload = json.load(handle)
+        if payload.get('format') != ANSWER_TABLE_FORMAT:
+            raise ValueError(f"unsupported format {payload.get('format')!r}, expected {ANSWER_TABLE_FORMAT}; rebuild it")
+        strings = payload['strings']
+        conflicts = [Conflict(*(strings[entry] for entry in conflict)) for conflict in payload['conflicts']]
+        skin_types = payload['skin_types']
+        rows = {(tuple(strings[entry] for entry in concerns), skin_types[skin_type]): fields
+                for concerns, skin_type, *fields in payload['answers']}
+    except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+        raise DatasetValidationError(f"Cannot load answer table {path}: {e}") from e
+    return AnswerTable(payload['version'], strings, conflicts, rows)
+
+
+def concern_sets(concerns: Sequence[str]) -> Iterable[Tuple[str, ...]]:
+    """Every sorted set of 1..MAX_CONCERNS distinct concerns"""
+    ordered = sorted(set(concerns))
+    for size in range(1, MAX_CONCERNS + 1):
+        yield from itertools.combinations(ordered, size)
+
+
+def build_payload(engine) -> Dict:
+    """Answer every materialized query with engine and encode the results"""
+    state = engine._ensure_dataset_loaded()
+    # Everything extraction can return: keyword concerns, dataset concerns
+    # (the semantic fallback's) and the general fallback
+    concerns = set(engine.concern_keywords) | {GENERAL_CONCERN}
+    concerns.update(concern for concern, _ in state.index.entries)
+
+    string_ids: Dict[str, int] = {}
+    conflict_ids: Dict[Conflict, int] = {}
+
+    def string_id(text: str) -> int:
+        return string_ids.setdefault(text, len(string_ids))
+
+    def conflict_id(conflict: Conflict) -> int:
+        entry = conflict_ids.get(conflict)
+        if entry is None:
+            entry = conflict_ids[conflict] = len(conflict_ids)
+        return entry
+
+    answers = []
+    for concern_set in concern_sets(concerns):
+        for skin_position, skin_type in enumerate(SKIN_TYPE_FILTERS):
+            result = engine._compute_recommendations(state, list(concern_set), skin_type)
+            fields = [[string_id(name) for name in result['ingredients']]]
+            fields.extend(string_id(result[field]) for field in FIELDS[1:-1])
+            fields.append([conflict_id(conflict) for conflict in result['conflicts']])
+            answers.append([[string_id(concern) for concern in concern_set], skin_position] + fields)
+
+    # Conflicts intern their strings too, so encode them before taking the string table
+    conflicts = [[string_id(value) for value in conflict] for conflict in conflict_ids]
+    return {
+        'format': ANSWER_TABLE_FORMAT,
+        'version': state.version or engine.results_version(),
+        'strings': list(string_ids),
+        'conflicts': conflicts,
+        'skin_types': SKIN_TYPE_FILTERS,
+        'answers': answers,
+    }
+
+
+def write_answer_table(engine, output_path: str) -> int:
+    """Build the table for engine's current data and write it; returns the number of answers"""
+    payload = build_payload(engine)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(payload, handle, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, output_path)
+    return len(payload['answers'])
+
+
+def coverage(engine, items: Iterable) -> Counter:
+    """Count logged queries by how many concerns they extract to ('invalid' for unparsable records)"""
+    counts: Counter = Counter()
+    state = engine._ensure_dataset_loaded()
+    for item in items:
+        counts['invalid' if isinstance(item, str) else len(set(engine._extract_concerns(item[0], state)))] += 1
+    return counts
+
+
+def main():
+    from model import RecommendationEngine
+    from replay import read_items
+
+    parser = argparse.ArgumentParser(description="Materialize answers for every one- and two-concern query")
+    parser.add_argument('csv_path')
+    parser.add_argument('--output', default='answers.json')
+    parser.add_argument('--queries', help="JSONL or .csv query log to measure coverage on (see replay.py)")
+    args = parser.parse_args()
+
+    # Built with the default settings, which serving engines must share for the version to match
+    engine = RecommendationEngine(csv_path=args.csv_path, answer_table_path=None, disk_cache_path=None)
+    start = time.perf_counter()
+    try:
+        answers = write_answer_table(engine, args.output)
+    except DatasetValidationError as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+    elapsed = time.perf_counter() - start
+    print(f"{answers:,} answers for {len(SKIN_TYPE_FILTERS)} skin-type filters in {elapsed:.1f}s, "
+          f"{os.path.getsize(args.output):,} bytes -> {args.output}")
+
+    if args.queries:
+        counts = coverage(engine, read_items(args.queries))
+        total = sum(counts.values())
+        covered = sum(count for size, count in counts.items() if size != 'invalid' and size <= MAX_CONCERNS)
+        print(f"covers {covered:,} of {total:,} logged queries ({covered / total if total else 0:.1%})")
+        for size, count in sorted(counts.items(), key=lambda item: (isinstance(item[0], str), item[0])):
+            print(f"  {size} concern(s): {count:,}")
+
+
+if __name__ == '__main__':
+    main()
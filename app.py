@@ -1,12 +1,18 @@
 import streamlit as st
 from model import RecommendationEngine
-from ingredients_db import INGREDIENT_GLOSSARY, BRAND_INFO
+from ingredients_db import BRAND_INFO, glossary_index
+from config import DATASET_WATCH_INTERVAL
+from rendering import build_fragments
 
 st.set_page_config(page_title="SkinCare Genius", page_icon="💆", layout="wide")
 
 @st.cache_resource
 def load_engine():
-    return RecommendationEngine()
+    # One engine is shared by every session; it hot-reloads the CSV when it changes
+    engine = RecommendationEngine()
+    if DATASET_WATCH_INTERVAL:
+        engine.start_watching(DATASET_WATCH_INTERVAL)
+    return engine
 
 st.markdown("<style>p, li { color: #4a5568; } .tag { display: inline-block; background: #f0f4ff; color: #4c51bf; padding: 4px 12px; border-radius: 16px; margin: 4px; font-size: 12px; }</style>", unsafe_allow_html=True)
 
@@ -16,6 +22,9 @@ if 'engine' not in st.session_state:
 
 if 'last_recommendation' not in st.session_state:
     st.session_state.last_recommendation = None
+    # (description, skin type, dataset generation) the last recommendation answered
+    st.session_state.last_request = None
+    st.session_state.last_fragments = None
 
 # Sidebar
 with st.sidebar:
@@ -32,11 +41,12 @@ with st.sidebar:
         """)
     
     with st.expander("📚 Ingredients"):
-        search = st.text_input("Search ingredients:", placeholder="e.g., Retinol")
-        ingredient_list = [(k, v) for k, v in INGREDIENT_GLOSSARY.items() if search.lower() in k.lower()]
+        search = st.text_input("Search ingredients:", placeholder="e.g., Retinol or soothing")
+        # Names, name substrings and descriptions, ranked; the index is built once per process
+        ingredient_list = glossary_index().search(search, limit=8)
         
         if ingredient_list:
-            for name, desc in ingredient_list[:8]:
+            for name, desc in ingredient_list:
                 st.markdown(f"**{name}**")
                 st.caption(desc)
         else:
@@ -88,31 +98,37 @@ st.markdown("")
 
 # Results
 if submit_button and user_input.strip():
-    with st.spinner("Analyzing..."):
-        results = st.session_state.engine.get_recommendations(
-            user_input, 
-            skin_type if skin_type != "Any" else None
-        )
-        st.session_state.last_recommendation = results
-    
-    if results:
+    engine = st.session_state.engine
+    request = (user_input.strip(), skin_type, engine.dataset_generation)
+    # Clicking Analyze again on an unchanged description reuses the last result
+    if request != st.session_state.last_request:
+        with st.spinner("Analyzing..."):
+            results = engine.get_recommendations(
+                user_input, 
+                skin_type if skin_type != "Any" else None
+            )
+            st.session_state.last_recommendation = results
+            st.session_state.last_request = (user_input.strip(), skin_type, engine.dataset_generation)
+            st.session_state.last_fragments = build_fragments(results) if results else None
+
+# Every rerun keeps showing the last result, from its prebuilt fragments
+results = st.session_state.last_recommendation
+fragments = st.session_state.last_fragments
+if results is not None:
+    if fragments is not None:
         st.markdown('<div class="success-badge">✅ Analysis Complete</div>', unsafe_allow_html=True)
         
         st.markdown("")
         
         # Detected concerns
         st.markdown("**Your Skin Concerns**")
-        concern_text = ", ".join([c.title() for c in results['concerns']])
-        st.info(concern_text)
+        st.info(fragments.concerns)
         
         st.markdown("")
         
-        # Ingredients
+        # Ingredients, most relevant first (the engine already returns the top k)
         st.markdown("**Recommended Ingredients**")
-        ingredient_html = ""
-        for ing in results['ingredients'][:12]:
-            ingredient_html += f'<span class="ingredient-tag">{ing.title()}</span>'
-        st.markdown(ingredient_html, unsafe_allow_html=True)
+        st.markdown(fragments.ingredients, unsafe_allow_html=True)
         
         st.markdown("")
         
@@ -120,19 +136,16 @@ if submit_button and user_input.strip():
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("**Why These Ingredients**")
-            st.markdown(f'<div class="card-container">{results["benefits"]}</div>', unsafe_allow_html=True)
+            st.markdown(fragments.benefits, unsafe_allow_html=True)
         with col2:
             st.markdown("**How to Use**")
-            st.markdown(f'<div class="card-container">{results["directions"]}</div>', unsafe_allow_html=True)
+            st.markdown(fragments.directions, unsafe_allow_html=True)
         
         st.markdown("")
         
         # Brands
         st.markdown("**Recommended Brands**")
-        brand_html = ""
-        for brand in results['brands'].split(", ")[:8]:
-            brand_html += f'<span class="brand-badge">{brand.strip()}</span>'
-        st.markdown(brand_html, unsafe_allow_html=True)
+        st.markdown(fragments.brands, unsafe_allow_html=True)
         
         st.markdown("")
         
@@ -140,16 +153,21 @@ if submit_button and user_input.strip():
         st.markdown("**Your Daily Routine**")
         col1, col2 = st.columns(2)
         with col1:
-            st.markdown(f'<div class="morning-routine"><h4>🌅 Morning</h4>{results.get("morning_routine", "")}</div>', unsafe_allow_html=True)
+            st.markdown(fragments.morning_routine, unsafe_allow_html=True)
         with col2:
-            st.markdown(f'<div class="night-routine"><h4>🌙 Night</h4>{results.get("night_routine", "")}</div>', unsafe_allow_html=True)
+            st.markdown(fragments.night_routine, unsafe_allow_html=True)
+        
+        # Ingredient conflicts
+        if fragments.conflicts:
+            st.markdown("**Don't Layer Together**")
+            st.markdown(fragments.conflicts)
         
         st.markdown("")
         
         # Safety
-        if results.get('notes'):
+        if fragments.notes:
             st.markdown("**Safety Notes**")
-            st.markdown(f'<div class="safety-note">{results["notes"]}</div>', unsafe_allow_html=True)
+            st.markdown(fragments.notes, unsafe_allow_html=True)
         
         st.divider()
         st.markdown("""
@@ -0,0 +1,87 @@
+"""
+Asyncio facade over RecommendationEngine
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
+from model import RecommendationEngine
+
+
+class AsyncRecommendationEngine:
+    """Awaitable recommendations with the dataset warmed in the background
+
+    Loading starts on the executor as soon as the facade is constructed, so it
+    can be built outside a running event loop. Every request awaits that one
+    shared future instead of triggering its own load, and the CPU-bound work
+    runs on the executor so the event loop keeps serving other coroutines.
+    A load that failed is retried by the next call that waits for it.
+    """
+
+    def __init__(self, engine: Optional[RecommendationEngine] = None,
+                 executor: Optional[ThreadPoolExecutor] = None, **engine_kwargs):
+        """
+        Args:
+            engine: Engine to wrap; a new one is built from engine_kwargs if omitted
+            executor: Thread pool for loading and aggregation (default: a small
+                one); the engine has to be shared in memory, so a process pool
+                can't be used
+
+        Raises:
+            TypeError: executor is a ProcessPoolExecutor
+        """
+        if isinstance(executor, ProcessPoolExecutor):
+            raise TypeError("AsyncRecommendationEngine needs a ThreadPoolExecutor; the engine can't be pickled")
+        self.engine = engine if engine is not None else RecommendationEngine(**engine_kwargs)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='skincare-async')
+        self._warmup_lock = threading.Lock()
+        self._warmup = self._executor.submit(self.engine._ensure_dataset_loaded)
+
+    @property
+    def ready(self) -> bool:
+        """True once the dataset has loaded successfully"""
+        warmup = self._warmup
+        return warmup.done() and not warmup.cancelled() and warmup.exception() is None
+
+    def _current_warmup(self) -> Future:
+        """The shared load; one that failed is replaced by a new attempt"""
+        with self._warmup_lock:
+            warmup = self._warmup
+            if warmup.done() and (warmup.cancelled() or warmup.exception() is not None):
+                warmup = self._warmup = self._executor.submit(self.engine._ensure_dataset_loaded)
+            return warmup
+
+    async def wait_ready(self):
+        """Wait for the background load; re-raises its error if it failed, and the next call retries it"""
+        await asyncio.wrap_future(self._current_warmup())
+
+    async def recommend(self, user_input: str, skin_type_filter: Optional[str] = None) -> Dict:
+        """Awaitable get_recommendations"""
+        await self.wait_ready()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.engine.get_recommendations,
+                                          user_input, skin_type_filter)
+
+    async def recommend_many(self, inputs: Iterable[str],
+                             skin_types: Union[None, str, Iterable[Optional[str]]] = None) -> List[Dict]:
+        """Awaitable get_recommendations_batch, returning results in input order"""
+        await self.wait_ready()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, lambda: list(self.engine.get_recommendations_batch(inputs, skin_types)))
+
+    def close(self):
+        """Shut down the executor if this facade created it"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> 'AsyncRecommendationEngine':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,41 @@
+"""
+Benchmark the aggregation modes of RecommendationEngine against each other
+
+Run from the repository root:
+    python -m benchmarks.aggregation
+"""
+
+import json
+import timeit
+
+from config import SAMPLE_INPUTS
+from model import AGGREGATION_MODES, RecommendationEngine
+
+BROAD_INPUTS = [
+    "oily acne-prone dull skin with dark spots and wrinkles",
+    "dry sensitive skin with redness, rosacea, flaky skin, fine lines and sun damage",
+]
+
+
+def main():
+    # Result cache off so every call measures the aggregation path itself
+    engines = {mode: RecommendationEngine(aggregation=mode, cache_size=0) for mode in AGGREGATION_MODES}
+    for engine in engines.values():
+        engine._ensure_dataset_loaded()
+
+    print(f"{'input':<40} {'skin':<8} " + ' '.join(f"{mode + ' µs':>12}" for mode in AGGREGATION_MODES))
+    for text in BROAD_INPUTS + SAMPLE_INPUTS[:2]:
+        for skin_type in (None, 'Oily'):
+            outputs = {json.dumps(engine.get_recommendations(text, skin_type)) for engine in engines.values()}
+            assert len(outputs) == 1, f"aggregation modes disagree for {text!r}"
+
+            timings = []
+            for mode, engine in engines.items():
+                number = 20 if mode == 'rows' else 500
+                seconds = timeit.timeit(lambda: engine.get_recommendations(text, skin_type), number=number)
+                timings.append(seconds / number * 1e6)
+            print(f"{text[:40]:<40} {skin_type or 'Any':<8} " + ' '.join(f"{t:>12.1f}" for t in timings))
+
+
+if __name__ == '__main__':
+    main()
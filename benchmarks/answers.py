@@ -0,0 +1,67 @@
+"""
+Benchmark the materialized answer table against live computation
+
+Builds a table for the dataset, then reports its size, build and load time,
+the share of a query log (synthetic unless --queries is given) it covers,
+and the per-query cost of answering covered queries from it vs computing
+them (in-process result cache off).
+
+Run from the repository root:
+    python -m benchmarks.answers
+    python -m benchmarks.answers --queries logged.jsonl
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from answer_table import MAX_CONCERNS, coverage, write_answer_table
+from benchmarks.batch_replay import synthetic_items
+from benchmarks.scaling import percentile
+from model import RecommendationEngine
+from replay import read_items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer table benchmark")
+    parser.add_argument('--csv', default='skincare_dataset.csv')
+    parser.add_argument('--queries', help="JSONL or .csv query log (default: synthetic descriptions)")
+    parser.add_argument('--rows', type=int, default=20_000, help="synthetic queries when no log is given")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'answers.json')
+        builder = RecommendationEngine(csv_path=args.csv, semantic_fallback=False)
+        builder._ensure_dataset_loaded()
+        start = time.perf_counter()
+        answers = write_answer_table(builder, path)
+        build = time.perf_counter() - start
+        print(f"{answers:,} answers, {os.path.getsize(path) / 2**20:.1f} MiB, built in {build:.1f}s")
+
+        live = RecommendationEngine(csv_path=args.csv, cache_size=0, semantic_fallback=False)
+        live_state = live._ensure_dataset_loaded()
+        fast = RecommendationEngine(csv_path=args.csv, cache_size=0, semantic_fallback=False, answer_table_path=path)
+        start = time.perf_counter()
+        fast_state = fast._ensure_dataset_loaded()
+        print(f"engine start-up with the table {time.perf_counter() - start:.2f}s")
+
+        items = list(read_items(args.queries)) if args.queries else synthetic_items(args.rows)
+        counts = coverage(live, items)
+        total = sum(counts.values())
+        covered = sum(count for size, count in counts.items() if size != 'invalid' and size <= MAX_CONCERNS)
+        print(f"covers {covered:,} of {total:,} queries ({covered / total if total else 0:.1%})")
+
+        keys = list(fast_state.answers.rows)
+        for name, engine, state in (('live', live, live_state), ('answer table', fast, fast_state)):
+            samples = []
+            for concerns, skin_type in keys:
+                start = time.perf_counter()
+                engine._recommend(state, list(concerns), skin_type)
+                samples.append(time.perf_counter() - start)
+            print(f"{name:<13} p50 {percentile(samples, 0.50) * 1e6:>6.1f}µs  p99 {percentile(samples, 0.99) * 1e6:>6.1f}µs "
+                  f"over {len(keys):,} covered queries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark Streamlit rerun latency of app.py with AppTest
+
+After one analysis, three kinds of rerun are timed:
+  - analyze again: clicking Analyze with the same description and skin type
+  - sidebar search: typing in the ingredient search, an unrelated widget
+  - plain rerun: a rerun with no widget change
+Each row reports p50/p99 latency, how many engine requests those reruns
+made (from the engine's result cache counters) and whether the results
+were still on the page afterwards.
+
+Run from the repository root (needs streamlit):
+    python -m benchmarks.app_rerun --runs 50
+"""
+
+import argparse
+import os
+import time
+from typing import Callable, List
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.scaling import percentile
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+DESCRIPTION = "oily, acne-prone skin with dark spots and some redness"
+SEARCHES = ['retinol', 'acid', 'soothing', 'vitamin', 'niacinamide']
+
+
+def engine_requests(at: AppTest) -> int:
+    stats = at.session_state['engine'].cache_stats()
+    return stats['hits'] + stats['misses']
+
+
+def results_shown(at: AppTest) -> bool:
+    return any('ingredient-tag' in element.value for element in at.markdown)
+
+
+def time_reruns(at: AppTest, interact: Callable[[AppTest, int], None], runs: int) -> List[float]:
+    samples = []
+    for run in range(runs):
+        interact(at, run)
+        start = time.perf_counter()
+        at.run()
+        samples.append(time.perf_counter() - start)
+        assert not at.exception, at.exception
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit rerun latency benchmark")
+    parser.add_argument('--runs', type=int, default=50)
+    parser.add_argument('--app', default=APP_PATH)
+    args = parser.parse_args()
+
+    at = AppTest.from_file(args.app, default_timeout=120)
+    at.run()
+    at.text_area[0].input(DESCRIPTION)
+    at.selectbox[0].select('Oily')
+    at.button[0].click()
+    at.run()
+    assert not at.exception, at.exception
+
+    scenarios = [
+        ('analyze again', lambda at, run: at.button[0].click()),
+        ('sidebar search', lambda at, run: at.text_input[0].input(SEARCHES[run % len(SEARCHES)])),
+        ('plain rerun', lambda at, run: None),
+    ]
+    print(f"{'rerun':<15} {'p50 ms':>8} {'p99 ms':>8} {'engine calls':>12}  results shown")
+    for name, interact in scenarios:
+        before = engine_requests(at)
+        samples = time_reruns(at, interact, args.runs)
+        print(f"{name:<15} {percentile(samples, 0.50) * 1e3:>8.1f} {percentile(samples, 0.99) * 1e3:>8.1f} "
+              f"{engine_requests(at) - before:>12}  {results_shown(at)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark batch replay throughput as worker processes are added
+
+Replays synthetic descriptions built from the engine's keywords (mostly
+distinct, so the per-batch grouping and result cache don't hide the work)
+with 0 workers (in-process), then 1, 2, 4, ... up to the core count.
+
+Run from the repository root:
+    python -m benchmarks.batch_replay --rows 200000
+"""
+
+import argparse
+import os
+import random
+import time
+from typing import List, Tuple
+
+from model import RecommendationEngine
+from replay import replay
+
+FILLER = "my skin feels different after i wash my face in the morning before work".split()
+SKIN_TYPES = [None, 'Dry', 'Oily', 'Normal', 'Sensitive', 'Combination']
+
+
+def synthetic_items(rows: int, seed: int = 0) -> List[Tuple[str, str]]:
+    rng = random.Random(seed)
+    keywords = [k for values in RecommendationEngine(semantic_fallback=False).concern_keywords.values() for k in values]
+    return [(' '.join(rng.sample(FILLER, 6) + rng.sample(keywords, rng.randint(1, 3))), rng.choice(SKIN_TYPES))
+            for _ in range(rows)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel replay throughput benchmark")
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    items = synthetic_items(args.rows)
+    worker_counts = [0] + [count for count in (1, 2, 4, 8, 16, 32, 64) if count < args.max_workers]
+    worker_counts += [args.max_workers] if args.max_workers not in worker_counts else []
+    baseline = None
+    print(f"{args.rows:,} rows on {os.cpu_count()} cores")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        lines = sum(1 for _ in replay(items, workers))
+        elapsed = time.perf_counter() - start
+        assert lines == len(items)
+        rate = lines / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>3} workers {rate:>10,.0f} rows/s   {rate / baseline:5.2f}x in-process")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark conflict detection as the aggregated ingredient list grows
+
+The compatibility-matrix lookup is compared with checking every pair of
+ingredients against the conflict table by string comparison.
+
+Run from the repository root:
+    python -m benchmarks.conflict_matrix
+"""
+
+import itertools
+from typing import List
+
+from benchmarks.ranking import percentile, time_call
+from conflicts import CompatibilityMatrix
+from ingredients_db import INGREDIENT_CONFLICTS
+from normalization import canonical_key
+
+INGREDIENT_COUNTS = (12, 100, 500, 2_000)
+ACTIVES = ['vitamin C', 'retinol', 'AHA', 'salicylic acid', 'benzoyl peroxide', 'niacinamide']
+
+
+def pairwise_scan(ingredients: List[str]) -> List:
+    """The naive alternative: compare every pair of names with every table entry"""
+    found = []
+    for a, b in itertools.combinations(ingredients, 2):
+        a, b = canonical_key(a), canonical_key(b)
+        for first, second, kind, reason in INGREDIENT_CONFLICTS:
+            first, second = first.lower(), second.lower()
+            if (a, b) == (first, second) or (b, a) == (first, second):
+                found.append((first, second, kind, reason))
+    return found
+
+
+def main():
+    matrix = CompatibilityMatrix()
+    print(f"{len(matrix.names)} known ingredients, {matrix.nbytes} byte matrix")
+    print(f"{'ingredients':>11} {'matrix p50 µs':>14} {'matrix p99 µs':>14} {'pairwise p50 µs':>16}")
+    for count in INGREDIENT_COUNTS:
+        ingredients = ACTIVES + [f"botanical extract {i:05d}" for i in range(count - len(ACTIVES))]
+        assert len(matrix.conflicts(ingredients)) == len(pairwise_scan(ingredients))
+        indexed = time_call(lambda: matrix.conflicts(ingredients), repeats=200)
+        pairwise = time_call(lambda: pairwise_scan(ingredients), repeats=1 if count > 500 else 20)
+        print(f"{count:>11,} {percentile(indexed, 0.5) * 1e6:>14.1f} {percentile(indexed, 0.99) * 1e6:>14.1f} "
+              f"{percentile(pairwise, 0.5) * 1e6:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Micro-benchmark: word-lookup concern matcher vs the original nested keyword loop
+
+Run from the repository root:
+    python -m benchmarks.extract_concerns
+"""
+
+import random
+import timeit
+from typing import Dict, List
+
+from config import SAMPLE_INPUTS
+from model import RecommendationEngine
+
+FILLER = (
+    "i have been using a new cleanser for about three weeks now and my skin "
+    "feels different in the mornings especially after i wash my face with "
+    "warm water before work and then again at night before going to bed"
+).split()
+
+
+def legacy_extract(concern_keywords: Dict[str, List[str]], text: str) -> List[str]:
+    """The original per-keyword substring scan, kept here as the baseline"""
+    text_lower = text.lower()
+    detected_concerns = []
+    for concern, keywords in concern_keywords.items():
+        for keyword in keywords:
+            if keyword in text_lower:
+                if concern not in detected_concerns:
+                    detected_concerns.append(concern)
+                break
+    return detected_concerns if detected_concerns else ['general skin care']
+
+
+def pasted_description(words: int, rng: random.Random) -> str:
+    """Long free-text description with a few real concern phrases mixed in"""
+    tokens = [rng.choice(FILLER) for _ in range(words)]
+    for sample in SAMPLE_INPUTS[:2]:
+        tokens.insert(rng.randrange(len(tokens) + 1), sample)
+    return ' '.join(tokens)
+
+
+def main():
+    # Exact matching only; the legacy loop has no typo tolerance to compare against
+    engine = RecommendationEngine(fuzzy_matching=False)
+    rng = random.Random(7)
+
+    print(f"{'words':>8} {'chars':>8} {'loop µs':>10} {'matcher µs':>11} {'speedup':>8}")
+    for words in (10, 100, 1000, 10000):
+        text = pasted_description(words, rng)
+        assert engine._extract_concerns(text) == legacy_extract(engine.concern_keywords, text)
+
+        number = max(5, 20000 // words)
+        loop = timeit.timeit(lambda: legacy_extract(engine.concern_keywords, text), number=number) / number
+        matcher = timeit.timeit(lambda: engine._extract_concerns(text), number=number) / number
+        print(f"{words:>8} {len(text):>8} {loop * 1e6:>10.1f} {matcher * 1e6:>11.1f} {loop / matcher:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
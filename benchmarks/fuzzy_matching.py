@@ -0,0 +1,100 @@
+"""
+Benchmark typo-tolerant concern matching as the keyword vocabulary grows
+
+The shipped keyword map is padded with synthetic keywords made of invented
+words, up to tens of thousands of distinct terms. Per-request latency of the
+trigram index should stay roughly flat, while a linear edit-distance scan
+over the vocabulary grows with it.
+
+Run from the repository root:
+    python -m benchmarks.fuzzy_matching
+"""
+
+import random
+import time
+from typing import Dict, List
+
+from concern_matcher import ConcernMatcher
+from fuzzy_matcher import FuzzyConcernMatcher, bounded_distance, max_distance, normalize
+from model import RecommendationEngine
+
+VOCABULARY_SIZES = (0, 1_000, 5_000, 25_000)
+# Consonant-vowel(-consonant) syllables: a few hundred, so invented words
+# spread over trigrams roughly like a real medical vocabulary does
+SYLLABLES = tuple(onset + vowel + coda for onset in ('b', 'c', 'd', 'f', 'g', 'l', 'm', 'n', 'p', 'r', 's', 't', 'v', 'ph', 'tr')
+                  for vowel in 'aeiou' for coda in ('', 'n', 'r', 'x'))
+QUERIES = [
+    "I have blackhedas on my nose and some rosaceaa on my cheeks",
+    "hyperpigmentaion and mealsma after the summer, plus wrinkels around my eyes",
+    "my skin is very dry and flakey in the mornings and I get redness at night",
+]
+REPEATS = 200
+
+
+def invented_words(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))))
+    return sorted(words)
+
+
+def grown_keywords(base: Dict[str, List[str]], extra_words: int) -> Dict[str, List[str]]:
+    """The real keyword map plus synthetic concerns using extra_words new words"""
+    keywords = dict(base)
+    words = invented_words(extra_words)
+    for i in range(0, len(words), 2):
+        keywords[f"synthetic {i:06d}"] = [' '.join(words[i:i + 2])]
+    return keywords
+
+
+def linear_scan(vocabulary: List[str], text: str) -> List[str]:
+    """The naive alternative: verify every unknown word against every vocabulary word"""
+    known = set(vocabulary)
+    found = []
+    for word in normalize(text):
+        limit = max_distance(len(word))
+        if word in known or limit == 0:
+            continue
+        found.extend(candidate for candidate in vocabulary if bounded_distance(word, candidate, limit) <= limit)
+    return found
+
+
+def median(samples: List[float]) -> float:
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    base = RecommendationEngine(fuzzy_matching=False).concern_keywords
+
+    print(f"{'vocabulary':>10} {'build ms':>9} {'index µs/req':>13} {'linear µs/req':>14}")
+    baseline = None
+    for extra in VOCABULARY_SIZES:
+        keywords = grown_keywords(base, extra)
+        start = time.perf_counter()
+        # No correction cache, so every request pays for its own lookups
+        matcher = FuzzyConcernMatcher(ConcernMatcher(keywords), cache_size=0)
+        build = time.perf_counter() - start
+
+        assert {'blackheads', 'rosacea'} <= set(matcher.match(QUERIES[0])), "typos no longer matched"
+
+        samples = []
+        for _ in range(REPEATS):
+            for query in QUERIES:
+                start = time.perf_counter()
+                matcher.match(query)
+                samples.append(time.perf_counter() - start)
+        indexed = median(samples)
+
+        start = time.perf_counter()
+        for query in QUERIES:
+            linear_scan(matcher.words, query)
+        linear = (time.perf_counter() - start) / len(QUERIES)
+
+        baseline = baseline or indexed
+        print(f"{len(matcher.words):>10,} {build * 1e3:>9.1f} {indexed * 1e6:>13.1f} {linear * 1e6:>14.1f}"
+              f"   ({indexed / baseline:.2f}x the shipped vocabulary)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark search-as-you-type over a large ingredient glossary
+
+Pads INGREDIENT_GLOSSARY with synthetic INCI-style entries, then replays
+queries one keystroke at a time against GlossarySearchIndex and against the
+sidebar's original full scan.
+
+Run from the repository root:
+    python -m benchmarks.glossary_search --entries 30000
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from ingredients_db import INGREDIENT_GLOSSARY, GlossarySearchIndex
+
+STEMS = ('hydroxy', 'methyl', 'ethyl', 'propyl', 'butyl', 'glyceryl', 'sodium', 'potassium', 'cetyl',
+         'stearyl', 'lauryl', 'myristyl', 'palmitoyl', 'acetyl', 'tocopheryl', 'ascorbyl', 'retinyl')
+SUFFIXES = ('Acid', 'Extract', 'Oil', 'Ester', 'Glucoside', 'Sulfate', 'Stearate', 'Peptide', 'Ferment')
+PLANTS = ('Camellia', 'Rosa', 'Aloe', 'Centella', 'Glycyrrhiza', 'Vitis', 'Citrus', 'Olea', 'Prunus', 'Avena')
+BENEFITS = ('soothes irritation', 'brightens skin', 'humectant', 'emollient', 'antioxidant',
+            'reduces redness', 'strengthens barrier', 'exfoliates', 'controls oil', 'preservative')
+QUERIES = ['hyaluronic acid', 'retinol', 'soothes', 'glyceryl stearate', 'camellia extract', 'peptide']
+
+
+def synthetic_glossary(entries: int, seed: int = 0) -> Dict[str, str]:
+    rng = random.Random(seed)
+    glossary = dict(INGREDIENT_GLOSSARY)
+    while len(glossary) < entries:
+        if rng.random() < 0.3:
+            name = f"{rng.choice(PLANTS)} {rng.choice(STEMS).title()} {rng.choice(SUFFIXES)} {rng.randrange(1000)}"
+        else:
+            name = f"{rng.choice(STEMS).title()}{rng.choice(STEMS)} {rng.choice(SUFFIXES)} {rng.randrange(1000)}"
+        glossary[name] = '; '.join(rng.sample(BENEFITS, 3))
+    return glossary
+
+
+def full_scan(glossary: Dict[str, str], search: str, limit: int = 8) -> List:
+    """The sidebar's original per-rerun filter"""
+    return [(k, v) for k, v in glossary.items() if search.lower() in k.lower()][:limit]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Glossary search-as-you-type benchmark")
+    parser.add_argument('--entries', type=int, default=30000)
+    args = parser.parse_args()
+
+    glossary = synthetic_glossary(args.entries)
+    start = time.perf_counter()
+    index = GlossarySearchIndex(glossary)
+    print(f"{len(glossary):,} entries, index built in {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    keystrokes = [query[:end] for query in QUERIES for end in range(1, len(query) + 1)]
+    for label, search in (('index', lambda text: index.search(text)), ('full scan', lambda text: full_scan(glossary, text))):
+        samples = []
+        for text in keystrokes:
+            start = time.perf_counter()
+            search(text)
+            samples.append(time.perf_counter() - start)
+        print(f"{label:<10} per keystroke p50 {percentile(samples, 0.5) * 1e3:7.3f} ms"
+              f"   p99 {percentile(samples, 0.99) * 1e3:7.3f} ms")
+
+    for query in QUERIES:
+        print(f"  {query!r}: {[name for name, _ in index.search(query, limit=3)]}")
+
+
+if __name__ == '__main__':
+    main()
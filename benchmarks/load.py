@@ -0,0 +1,98 @@
+"""
+Local load test for the recommendation service in server.py
+
+Start the service first, then run from the repository root:
+    python server.py --port 8000 --workers 4
+    python -m benchmarks.load --url http://127.0.0.1:8000 --concurrency 16 --requests 5000
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import List
+
+from config import SAMPLE_INPUTS, SKIN_TYPES
+
+
+def _post(url: str, payload: dict, timeout: float = 30.0) -> bytes:
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def wait_until_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/readyz', timeout=5) as response:
+                if response.status == 200:
+                    return
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not become ready within {timeout}s")
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the recommendation service")
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=0, help="use /batch with this many items per call")
+    args = parser.parse_args()
+
+    wait_until_ready(args.url)
+    counter = iter(range(args.requests))
+    counter_lock = threading.Lock()
+    latencies: List[float] = []
+    errors = []
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        while True:
+            with counter_lock:
+                if next(counter, None) is None:
+                    return
+            items = [{'text': rng.choice(SAMPLE_INPUTS), 'skin_type': rng.choice(SKIN_TYPES)}
+                     for _ in range(max(1, args.batch_size))]
+            start = time.perf_counter()
+            try:
+                if args.batch_size:
+                    _post(args.url + '/batch', {'items': items})
+                else:
+                    _post(args.url + '/recommend', items[0])
+            except (urllib.error.URLError, ConnectionError) as e:
+                errors.append(e)
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        raise SystemExit(f"all {len(errors)} requests failed; first error: {errors[0]}")
+    items_per_call = max(1, args.batch_size)
+    print(f"requests      {len(latencies)} ok, {len(errors)} failed in {elapsed:.2f}s")
+    print(f"throughput    {len(latencies) / elapsed:,.0f} req/s ({len(latencies) * items_per_call / elapsed:,.0f} recommendations/s)")
+    print(f"latency p50   {percentile(latencies, 0.50) * 1000:.2f} ms")
+    print(f"latency p95   {percentile(latencies, 0.95) * 1000:.2f} ms")
+    print(f"latency p99   {percentile(latencies, 0.99) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
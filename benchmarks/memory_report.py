@@ -0,0 +1,45 @@
+"""
+Memory footprint of the pandas frame vs the dictionary-encoded CompactDataset
+
+Run from the repository root:
+    python -m benchmarks.memory_report
+"""
+
+import random
+
+import pandas as pd
+
+from compact_store import CompactDataset
+from recommendation_index import split_list
+
+
+def expand_dataset(df: pd.DataFrame, factor: int, seed: int = 0) -> pd.DataFrame:
+    """Repeat the rows factor times, re-drawing brand lists so they stay varied"""
+    rng = random.Random(seed)
+    brands = sorted({brand for value in df['brands'] for brand in split_list(value)})
+    expanded = pd.concat([df] * factor, ignore_index=True)
+    expanded['brands'] = [', '.join(rng.sample(brands, 3)) for _ in range(len(expanded))]
+    return expanded
+
+
+def report(label: str, df: pd.DataFrame):
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+    store = CompactDataset.from_frame(df)
+    store_report = store.memory_report()
+
+    print(f"\n{label}: {len(df):,} rows")
+    print(f"  pandas frame (deep)   {frame_bytes / 1024:>12,.1f} KiB")
+    print(f"  compact store         {store_report['total'] / 1024:>12,.1f} KiB   ({frame_bytes / store_report['total']:.1f}x smaller)")
+    for name, size in store_report.items():
+        if name != 'total':
+            print(f"    {name:<19} {size / 1024:>12,.1f} KiB")
+
+
+def main():
+    df = pd.read_csv('skincare_dataset.csv')
+    report('skincare_dataset.csv', df)
+    report('100x synthetic expansion', expand_dataset(df, 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark the top-k ranking pass against sorting the full matched union
+
+Run from the repository root:
+    python -m benchmarks.ranking --budget-ms 5
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List
+
+from benchmarks.aggregation import BROAD_INPUTS
+from config import TOP_K_BRANDS
+from model import RecommendationEngine
+from ranking import top_k
+
+CANDIDATE_COUNTS = (1_000, 10_000, 100_000)
+REPEATS = 50
+
+
+def synthetic_scores(candidates: int, seed: int = 0) -> Dict[str, int]:
+    """Skewed integer scores, like brand frequencies over a large matched set"""
+    rng = random.Random(seed)
+    return {f"brand {i:06d}": int(rng.paretovariate(1.2)) for i in range(candidates)}
+
+
+def full_sort(scores: Dict[str, int], k: int) -> List[str]:
+    """The naive alternative: order the whole union, then truncate"""
+    return sorted(scores, key=lambda name: (-scores[name], name))[:k]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def time_call(call, repeats: int = REPEATS) -> List[float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-k ranking latency benchmark")
+    parser.add_argument('--k', type=int, default=TOP_K_BRANDS)
+    parser.add_argument('--budget-ms', type=float, default=5.0,
+                        help="fail if the p99 of the ranking pass exceeds this on 10k candidates")
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10} {'top-k p50 ms':>13} {'top-k p99 ms':>13} {'full sort p50 ms':>17}")
+    budget_p99 = None
+    for candidates in CANDIDATE_COUNTS:
+        scores = synthetic_scores(candidates)
+        ranked = time_call(lambda: top_k(scores, args.k))
+        full = time_call(lambda: full_sort(scores, args.k))
+        assert top_k(scores, args.k) == full_sort(scores, args.k)
+        p99 = percentile(ranked, 0.99)
+        if candidates == 10_000:
+            budget_p99 = p99
+        print(f"{candidates:>10,} {percentile(ranked, 0.5) * 1e3:>13.3f} {p99 * 1e3:>13.3f} "
+              f"{percentile(full, 0.5) * 1e3:>17.3f}")
+
+    # The ranking stage on real requests, measured by the engine's own timer
+    engine = RecommendationEngine(cache_size=0)
+    for text in BROAD_INPUTS:
+        samples = [engine.get_recommendations(text, include_timings=True)['timings']['rank']
+                   for _ in range(REPEATS)]
+        print(f"engine rank stage p99 {percentile(samples, 0.99) * 1e6:>8.1f} µs  {text[:50]!r}")
+
+    if budget_p99 is not None and budget_p99 * 1e3 > args.budget_ms:
+        raise SystemExit(f"ranking p99 {budget_p99 * 1e3:.3f} ms exceeds the {args.budget_ms} ms budget")
+    print(f"within the {args.budget_ms} ms budget")
+
+
+if __name__ == '__main__':
+    main()
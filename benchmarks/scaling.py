@@ -0,0 +1,162 @@
+"""
+Scaling benchmark suite for RecommendationEngine on synthetic datasets
+
+Generates (or reuses) synthetic CSVs, then measures each size in a fresh
+subprocess so peak RSS is per dataset:
+  - cold-start load time from CSV and from the binary snapshot
+  - _extract_concerns latency against input length
+  - get_recommendations p50/p99 latency (result cache off)
+  - peak RSS
+
+Run from the repository root:
+    python -m benchmarks.scaling                      # 10k, 100k, 1M rows
+    python -m benchmarks.scaling --sizes 10000 --output results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.synthetic import generate, synthetic_keywords
+from model import RecommendationEngine
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_WORDS = [10, 100, 1000, 10000]
+FILLER = "my skin feels different after i wash my face in the morning before work".split()
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def peak_rss_kib() -> int:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _engine_class(concerns: int):
+    class ScalingEngine(RecommendationEngine):
+        def _build_keyword_map(self):
+            keywords = super()._build_keyword_map()
+            keywords.update(synthetic_keywords(concerns))
+            return keywords
+    return ScalingEngine
+
+
+def measure(csv_path: str, concerns: int, queries: int, seed: int = 0) -> Dict:
+    """Measurements for one dataset; meant to run in its own process"""
+    engine_class = _engine_class(concerns)
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    engine = engine_class(csv_path=csv_path, use_snapshot=False, cache_size=0)
+    engine._ensure_dataset_loaded()
+    load_csv = time.perf_counter() - start
+
+    # First snapshot-enabled load writes the snapshot; the second one reads it
+    engine_class(csv_path=csv_path)._ensure_dataset_loaded()
+    start = time.perf_counter()
+    engine_class(csv_path=csv_path)._ensure_dataset_loaded()
+    load_snapshot = time.perf_counter() - start
+
+    keywords = [k for values in engine.concern_keywords.values() for k in values]
+    extract_us = {}
+    for words in INPUT_WORDS:
+        tokens = [rng.choice(FILLER) for _ in range(words)] + rng.sample(keywords, 3)
+        rng.shuffle(tokens)
+        text = ' '.join(tokens)
+        repeats = max(3, 2000 // words)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            engine._extract_concerns(text)
+        extract_us[str(words)] = (time.perf_counter() - start) / repeats * 1e6
+
+    skin_types = [None, 'dry', 'normal', 'oily', 'combination', 'sensitive']
+    latencies = []
+    for _ in range(queries):
+        text = ' and '.join(rng.sample(keywords, rng.randint(1, 4)))
+        skin_type = rng.choice(skin_types)
+        start = time.perf_counter()
+        engine.get_recommendations(text, skin_type)
+        latencies.append((time.perf_counter() - start) * 1e6)
+
+    return {
+        'rows': len(engine.store),
+        'concerns': len(engine.concern_keywords),
+        'keywords': len(keywords),
+        'load_csv_s': load_csv,
+        'load_snapshot_s': load_snapshot,
+        'extract_us_by_words': extract_us,
+        'recommend_p50_us': percentile(latencies, 0.50),
+        'recommend_p99_us': percentile(latencies, 0.99),
+        'peak_rss_kib': peak_rss_kib(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark suite for RecommendationEngine")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--concerns', type=int, default=500, help="synthetic concerns added to the keyword map")
+    parser.add_argument('--brands', type=int, default=2000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--data-dir', default=os.path.join(BENCHMARK_DIR, 'data'))
+    parser.add_argument('--output', help="JSON results path (default benchmarks/results/scaling-<rev>.json)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.concerns, args.queries)))
+        return
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    revision = git_revision()
+    results = []
+    for rows in args.sizes:
+        csv_path = os.path.join(args.data_dir, f"synthetic_{rows}_{args.concerns}c_{args.brands}b.csv")
+        if not os.path.exists(csv_path):
+            print(f"generating {csv_path}", file=sys.stderr)
+            generate(csv_path, rows, concerns=args.concerns, brands=args.brands)
+
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.scaling', '--worker', csv_path,
+             '--concerns', str(args.concerns), '--queries', str(args.queries)],
+            capture_output=True, text=True, check=True,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print(f"{rows:>9,} rows  load csv {result['load_csv_s']:.2f}s  snapshot {result['load_snapshot_s']:.2f}s  "
+              f"p50 {result['recommend_p50_us']:.0f}µs  p99 {result['recommend_p99_us']:.0f}µs  "
+              f"rss {result['peak_rss_kib'] / 1024:.0f} MiB", file=sys.stderr)
+
+    output = args.output or os.path.join(BENCHMARK_DIR, 'results', f"scaling-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump({
+            'revision': revision,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }, handle, indent=2)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
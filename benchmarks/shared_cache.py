@@ -0,0 +1,58 @@
+"""
+Benchmark a cold replica answering from the shared disk result cache
+
+One engine fills a fresh SQLite cache with every one- and two-concern query.
+New engines then stand in for cold replicas (empty in-process cache) and
+answer the same queries either by recomputing them or from the disk tier.
+
+Run from the repository root:
+    python -m benchmarks.shared_cache
+"""
+
+import itertools
+import os
+import tempfile
+import time
+from typing import List, Optional, Tuple
+
+from benchmarks.scaling import percentile
+from model import RecommendationEngine
+
+SKIN_TYPES = [None, 'Dry', 'Oily', 'Normal', 'Sensitive', 'Combination']
+
+
+def queries(engine: RecommendationEngine) -> List[Tuple[List[str], Optional[str]]]:
+    concerns = list(engine.concern_keywords)
+    sets = [[concern] for concern in concerns] + [list(pair) for pair in itertools.combinations(concerns, 2)]
+    return [(concern_set, skin_type) for concern_set in sets for skin_type in SKIN_TYPES]
+
+
+def time_requests(engine: RecommendationEngine, items) -> List[float]:
+    state = engine._ensure_dataset_loaded()
+    samples = []
+    for concerns, skin_type in items:
+        start = time.perf_counter()
+        engine._recommend(state, concerns, skin_type)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'results.sqlite')
+        filler = RecommendationEngine(disk_cache_path=path, semantic_fallback=False)
+        items = queries(filler)
+        start = time.perf_counter()
+        time_requests(filler, items)
+        fill = time.perf_counter() - start
+        print(f"{len(items):,} queries, filled in {fill:.1f}s, cache file {os.path.getsize(path) / 2**20:.1f} MiB")
+
+        for name, disk_cache_path in (('recompute', None), ('disk cache', path)):
+            replica = RecommendationEngine(disk_cache_path=disk_cache_path, semantic_fallback=False)
+            samples = time_requests(replica, items)
+            print(f"{name:<11} p50 {percentile(samples, 0.50) * 1e6:>7.0f}µs  p99 {percentile(samples, 0.99) * 1e6:>7.0f}µs  "
+                  f"{len(samples) / sum(samples):>8,.0f} req/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark process start-up: importing model and answering a first request
+
+Each mode runs in fresh subprocesses under `python -X importtime`:
+  - csv:               the default engine, from a warm dataset snapshot
+  - prebuilt:          a prebuilt index with semantic_fallback=False (stdlib only)
+  - prebuilt+semantic: a prebuilt index with the persisted TF-IDF fallback
+
+Reported per mode (median over --repeats runs): time and peak RSS after
+`import model`, total import time and module count once the first request is
+answered, and whether pandas / NumPy ended up loaded.
+
+Run from the repository root:
+    python -m benchmarks.startup --repeats 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ('csv', 'prebuilt', 'prebuilt+semantic')
+
+
+def peak_rss_kib() -> int:
+    # VmHWM belongs to this process image; ru_maxrss would also count the
+    # parent's peak inherited across fork + exec
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def measure(mode: str, csv_path: str, index_path: str) -> dict:
+    """Import model and answer one request; meant to run in its own process"""
+    start = time.perf_counter()
+    import model
+    import_s = time.perf_counter() - start
+    import_rss = peak_rss_kib()
+
+    if mode == 'csv':
+        engine = model.RecommendationEngine(csv_path=csv_path)
+    else:
+        engine = model.RecommendationEngine(index_path=index_path, semantic_fallback=mode == 'prebuilt+semantic')
+    start = time.perf_counter()
+    engine.get_recommendations("oily skin with blackheads", "Oily")
+    return {
+        'import_model_s': import_s,
+        'import_model_rss_kib': import_rss,
+        'first_request_s': time.perf_counter() - start,
+        'peak_rss_kib': peak_rss_kib(),
+        'pandas': 'pandas' in sys.modules,
+        'numpy': 'numpy' in sys.modules,
+    }
+
+
+def importtime_totals(stderr: str) -> dict:
+    """Sum the self times of every module in -X importtime output"""
+    self_us = [int(line.split('|')[0].split(':')[1]) for line in stderr.splitlines()
+               if line.startswith('import time:') and line.split('|')[0].split(':')[1].strip().isdigit()]
+    return {'imports_s': sum(self_us) / 1e6, 'modules': len(self_us)}
+
+
+def run_mode(mode: str, csv_path: str, index_path: str) -> dict:
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.startup',
+         '--worker', mode, '--csv', csv_path, '--index', index_path],
+        capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result.update(importtime_totals(completed.stderr))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start-up time and memory benchmark")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--csv', default='skincare_dataset.csv')
+    parser.add_argument('--index', help="prebuilt index (default: built from --csv into a temp dir)")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.csv, args.index)))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        index_path = args.index
+        if index_path is None:
+            index_path = os.path.join(directory, 'skincare.index.json')
+            subprocess.run([sys.executable, '-m', 'prebuilt_index', args.csv, '--output', index_path],
+                           capture_output=True, check=True)
+        # Warm the snapshot and semantic caches so every mode measures a warm start
+        for mode in MODES:
+            run_mode(mode, args.csv, index_path)
+
+        print(f"{'mode':<18} {'import model':>12} {'rss':>8} {'all imports':>11} {'modules':>7} "
+              f"{'1st request':>11} {'peak rss':>8}  pandas numpy")
+        for mode in MODES:
+            runs = [run_mode(mode, args.csv, index_path) for _ in range(args.repeats)]
+
+            def median(key):
+                return statistics.median(run[key] for run in runs)
+
+            print(f"{mode:<18} {median('import_model_s') * 1e3:>10.1f}ms "
+                  f"{median('import_model_rss_kib') / 1024:>5.1f}MiB {median('imports_s') * 1e3:>9.1f}ms "
+                  f"{median('modules'):>7.0f} {median('first_request_s') * 1e3:>9.1f}ms "
+                  f"{median('peak_rss_kib') / 1024:>5.1f}MiB  {str(runs[0]['pandas']):<6} {runs[0]['numpy']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Synthetic datasets in the skincare_dataset.csv schema for scaling benchmarks
+
+Run from the repository root:
+    python -m benchmarks.synthetic --rows 100000 --output /tmp/skincare_100k.csv
+"""
+
+import argparse
+import csv
+import random
+from typing import Dict, List
+
+import pandas as pd
+
+from recommendation_index import split_list
+
+SKIN_TYPES = ['dry', 'normal', 'oily', 'combination', 'sensitive']
+DIRECTIONS = 'AM/PM: apply after cleansing; patch test recommended; use sunscreen daily'
+NOTES = 'Avoid mixing strong actives; discontinue if irritation occurs'
+
+
+def synthetic_concern(position: int) -> str:
+    """Fixed-width name so no synthetic keyword is a substring of another"""
+    return f"condition {position:05d}"
+
+
+def synthetic_keywords(concerns: int) -> Dict[str, List[str]]:
+    """Keyword-map entries for the synthetic concerns"""
+    return {synthetic_concern(i): [synthetic_concern(i), f"symptom {i:05d}"] for i in range(concerns)}
+
+
+def generate(path: str, rows: int, concerns: int = 500, brands: int = 2000,
+             ingredients: int = 300, seed: int = 0, base_csv: str = 'skincare_dataset.csv'):
+    """Write a CSV mixing the shipped vocabulary with synthetic concerns, brands and ingredients"""
+    rng = random.Random(seed)
+    base = pd.read_csv(base_csv)
+
+    concern_names = list(base['concern'].unique()) + [synthetic_concern(i) for i in range(concerns)]
+    brand_names = sorted({b for value in base['brands'] for b in split_list(value)})
+    brand_names += [f"Brand {i:05d}" for i in range(brands)]
+    ingredient_names = sorted({i for value in base['ingredients'] for i in split_list(value)})
+    ingredient_names += [f"compound {i:04d}" for i in range(ingredients)]
+
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(['concern', 'skin_type', 'ingredients', 'benefits', 'directions', 'brands', 'notes'])
+        for _ in range(rows):
+            concern = rng.choice(concern_names)
+            writer.writerow([
+                concern,
+                rng.choice(SKIN_TYPES),
+                ', '.join(rng.sample(ingredient_names, rng.randint(2, 5))),
+                f"Helps improve {concern}; supports overall skin health",
+                DIRECTIONS,
+                ', '.join(rng.sample(brand_names, 3)),
+                NOTES,
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--output', required=True)
+    parser.add_argument('--concerns', type=int, default=500)
+    parser.add_argument('--brands', type=int, default=2000)
+    parser.add_argument('--ingredients', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    generate(args.output, args.rows, args.concerns, args.brands, args.ingredients, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Columnar (NumPy) view of the skincare dataset for vectorized aggregation
+"""
+
+from typing import Dict, List, Mapping, Optional
+
+import numpy as np
+
+from compact_store import CompactDataset
+from recommendation_index import GENERAL_CONCERN, Aggregate
+
+
+class ColumnarDataset:
+    """Exploded ingredient and brand tokens over a CompactDataset's codes
+
+    Requests build one boolean row mask and take uniques with NumPy instead of
+    walking the matched rows in Python.
+    """
+
+    def __init__(self, store: CompactDataset):
+        self.store = store
+        self.row_count = len(store)
+        self.concern_codes = store.concern.codes
+        self.skin_codes = store.skin_type.codes
+        self.benefit_codes = store.text['benefits'].codes
+        self.benefit_values = np.asarray(store.text['benefits'].values, dtype=object)
+        self.note_codes = store.text['notes'].codes
+        self.note_values = np.asarray(store.text['notes'].values, dtype=object)
+
+        # Explode the CSR columns once: one (row, token id) pair per entry
+        self.ingredient_rows = store.ingredients.row_positions()
+        self.ingredient_codes = store.ingredients.indices
+        self.brand_rows = store.brands.row_positions()
+        self.brand_codes = store.brands.indices
+
+    def select(self, concerns: List[str], skin_type_filter: Optional[str] = None) -> np.ndarray:
+        """Boolean row mask for the request, with the engine's fallback rules"""
+        lookup = self.store.concern.lookup
+        wanted = [lookup[concern] for concern in concerns if concern in lookup]
+        mask = np.isin(self.concern_codes, wanted)
+        if skin_type_filter:
+            skin_code = self.store.skin_type.lookup.get(skin_type_filter.lower())
+            if skin_code is None:
+                mask[:] = False
+            else:
+                mask &= self.skin_codes == skin_code
+
+        if not mask.any():
+            general = lookup.get(GENERAL_CONCERN)
+            if general is not None:
+                mask = self.concern_codes == general
+            else:
+                mask = np.zeros(self.row_count, dtype=bool)
+                mask[:1] = True
+        return mask
+
+    @staticmethod
+    def _first_seen(codes: np.ndarray, values: np.ndarray) -> List[str]:
+        """Unique values of codes in order of first appearance"""
+        unique, first = np.unique(codes, return_index=True)
+        return list(values[unique[np.argsort(first, kind='stable')]])
+
+    def _scores(self, codes: np.ndarray, rows: np.ndarray, vocabulary_size: int,
+                mask: np.ndarray, row_weights: np.ndarray) -> Dict[int, int]:
+        """Weighted occurrence count per token id over the masked rows"""
+        selected = mask[rows]
+        totals = np.bincount(codes[selected], weights=row_weights[rows[selected]], minlength=vocabulary_size)
+        present = np.flatnonzero(totals)
+        return dict(zip(present.tolist(), totals[present].astype(np.int64).tolist()))
+
+    def merge(self, mask: np.ndarray, weights: Mapping[str, int]) -> Aggregate:
+        """Aggregate the rows selected by a boolean mask; unweighted (fallback) rows count 1"""
+        weight_by_code = np.ones(len(self.store.concern.values), dtype=np.int64)
+        lookup = self.store.concern.lookup
+        for concern, weight in weights.items():
+            if concern in lookup:
+                weight_by_code[lookup[concern]] = weight
+        row_weights = weight_by_code[self.concern_codes]
+
+        return Aggregate(
+            self._scores(self.ingredient_codes, self.ingredient_rows, len(self.store.ingredients.values), mask, row_weights),
+            self._scores(self.brand_codes, self.brand_rows, len(self.store.brands.values), mask, row_weights),
+            self._first_seen(self.benefit_codes[mask], self.benefit_values),
+            self._first_seen(self.note_codes[mask], self.note_values),
+        )
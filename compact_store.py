@@ -0,0 +1,190 @@
+"""
+Dictionary-encoded, memory-compact store for the skincare dataset
+"""
+
+import sys
+from array import array
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from normalization import NameTable, brand_names, ingredient_names, intern_row
+from recommendation_index import split_list
+
+TEXT_COLUMNS = ('benefits', 'directions', 'notes')
+
+
+def code_dtype(size: int) -> np.dtype:
+    """Smallest unsigned integer dtype that can hold codes 0..size-1"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+class _Vocabulary:
+    """Assigns dense integer codes to interned strings"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value) if isinstance(value, str) else value)
+        return code
+
+
+class _CSRBuilder:
+    """Per-row token lists accumulated into indptr/indices arrays
+
+    Tokens are normalized and interned through a NameTable, so spellings of
+    the same name share one id and a row lists each id once.
+    """
+
+    def __init__(self, names: NameTable):
+        self.names = names
+        # Typed arrays rather than lists, so a large dataset costs bytes per entry
+        self.indptr = array('Q', [0])
+        self.indices = array('Q')
+
+    def add_row(self, tokens: List[str]):
+        self.indices.extend(intern_row(self.names, tokens))
+        self.indptr.append(len(self.indices))
+
+    def build(self) -> 'CSRColumn':
+        remap = np.asarray(self.names.freeze(), dtype=np.int64)
+        values = tuple(self.names.names)
+        indices = remap[np.asarray(self.indices, dtype=np.int64)] if self.indices else np.zeros(0, dtype=np.int64)
+        return CSRColumn(
+            np.asarray(self.indptr, dtype=code_dtype(len(self.indices) + 1)),
+            indices.astype(code_dtype(len(values))),
+            values,
+            self.names,
+        )
+
+
+class CSRColumn:
+    """Row -> token-id membership in compressed sparse row layout
+
+    Ids are in alphabetical order of the canonical names in values.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, values: Tuple[str, ...], names: NameTable):
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+        self.names = names
+
+    def row_ids(self, position: int) -> np.ndarray:
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+
+    def lookup(self, raw: str) -> int:
+        """Id for any spelling of a name, -1 if it isn't in the column"""
+        return self.names.lookup(raw)
+
+    def row_positions(self) -> np.ndarray:
+        """Row number of every entry in indices (the exploded row index)"""
+        return np.repeat(np.arange(len(self.indptr) - 1), np.diff(self.indptr.astype(np.int64)))
+
+    @property
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.indices.nbytes + _strings_nbytes(self.values)
+
+
+class EncodedColumn:
+    """One small-int code per row plus the deduplicated values"""
+
+    def __init__(self, codes: np.ndarray, values: Tuple[str, ...]):
+        self.codes = codes
+        self.values = values
+        self.lookup = {value: code for code, value in enumerate(values)}
+
+    def __getitem__(self, position: int) -> str:
+        return self.values[self.codes[position]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + _strings_nbytes(self.values)
+
+
+def _strings_nbytes(values: Sequence) -> int:
+    return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+
+class CompactDataset:
+    """Interned, integer-coded representation of skincare_dataset.csv
+
+    Concern, skin type and the text blobs are stored as one code per row into
+    a deduplicated vocabulary; ingredients and brands are CSR arrays of
+    interned ids of their canonical names, already split and normalized.
+    """
+
+    def __init__(self, concern: EncodedColumn, skin_type: EncodedColumn, ingredients: CSRColumn,
+                 brands: CSRColumn, text: Dict[str, EncodedColumn]):
+        self.concern = concern
+        self.skin_type = skin_type
+        self.ingredients = ingredients
+        self.brands = brands
+        self.text = text
+
+    def __len__(self) -> int:
+        return len(self.concern.codes)
+
+    @classmethod
+    def from_records(cls, records: Iterator[Dict], text_columns: Sequence[str] = TEXT_COLUMNS) -> 'CompactDataset':
+        """Encode dataset rows given as dicts with the CSV column names"""
+        concern, skin_type = _Vocabulary(), _Vocabulary()
+        concern_codes, skin_codes = array('I'), array('I')
+        ingredients, brands = _CSRBuilder(ingredient_names()), _CSRBuilder(brand_names())
+        text_vocabularies = {name: _Vocabulary() for name in text_columns}
+        text_codes: Dict[str, array] = {name: array('I') for name in text_columns}
+
+        for record in records:
+            concern_codes.append(concern.encode(record['concern']))
+            skin_codes.append(skin_type.encode(record['skin_type']))
+            ingredients.add_row(split_list(record['ingredients']))
+            brands.add_row(split_list(record['brands']))
+            for name in text_columns:
+                text_codes[name].append(text_vocabularies[name].encode(record[name]))
+
+        def encoded(vocabulary: _Vocabulary, codes: array) -> EncodedColumn:
+            return EncodedColumn(np.asarray(codes, dtype=code_dtype(len(vocabulary.values))), tuple(vocabulary.values))
+
+        return cls(
+            encoded(concern, concern_codes),
+            encoded(skin_type, skin_codes),
+            ingredients.build(),
+            brands.build(),
+            {name: encoded(text_vocabularies[name], text_codes[name]) for name in text_columns},
+        )
+
+    @classmethod
+    def from_frame(cls, df) -> 'CompactDataset':
+        """Encode a DataFrame with the skincare_dataset.csv columns"""
+        text_columns = [name for name in TEXT_COLUMNS if name in df.columns]
+        columns = ['concern', 'skin_type', 'ingredients', 'brands'] + text_columns
+        records = (dict(zip(columns, values)) for values in zip(*(df[name] for name in columns)))
+        return cls.from_records(records, text_columns)
+
+    def iter_rows(self) -> Iterator[Tuple[str, str, List[int], str, List[int], str]]:
+        """Yield (concern, skin_type, ingredient ids, benefit, brand ids, note) per row"""
+        benefits, notes = self.text['benefits'], self.text['notes']
+        for position in range(len(self)):
+            yield (self.concern[position], self.skin_type[position], self.ingredients.row_ids(position).tolist(),
+                   benefits[position], self.brands.row_ids(position).tolist(), notes[position])
+
+    def memory_report(self) -> Dict[str, int]:
+        """Approximate resident bytes per component"""
+        report = {
+            'concern': self.concern.nbytes,
+            'skin_type': self.skin_type.nbytes,
+            'ingredients': self.ingredients.nbytes,
+            'brands': self.brands.nbytes,
+        }
+        for name, column in self.text.items():
+            report[name] = column.nbytes
+        report['total'] = sum(report.values())
+        return report
@@ -0,0 +1,143 @@
+"""
+Single-pass concern matching for free-text skin descriptions
+"""
+
+import bisect
+import string
+from itertools import chain
+from typing import Dict, Iterable, List, Set, Tuple
+
+# Punctuation splits words, as whitespace does; str.translate does this in C
+_SEPARATORS = str.maketrans({char: ' ' for char in string.punctuation + '–—‘’“”…'})
+_HEAD = 3  # Keyword words at least this long also match as a prefix of a longer word
+_MAX_CACHED_TOKENS = 100_000  # Distinct text words whose keyword-word matches are remembered
+
+
+def words(text: str) -> List[str]:
+    """Words of text, split on whitespace and punctuation"""
+    return text.translate(_SEPARATORS).split()
+
+
+class _TokenWords(dict):
+    """Text word -> keyword words it equals or, from _HEAD characters on, starts with
+
+    Filled on first lookup; words recur across requests, so most lookups are
+    plain dict hits that can run inside map() without a Python-level loop.
+    """
+
+    def __init__(self, known: Set[str], by_head: Dict[str, List[str]]):
+        super().__init__()
+        self.known = known
+        self.by_head = by_head
+
+    def __missing__(self, token: str) -> Tuple[str, ...]:
+        found = tuple(word for word in self.by_head.get(token[:_HEAD], ()) if token.startswith(word))
+        if token in self.known and token not in found:
+            found += (token,)
+        if len(self) < _MAX_CACHED_TOKENS:
+            self[token] = found
+        return found
+
+
+class ConcernMatcher:
+    """Detect concerns from a dictionary lookup per distinct word of the text
+
+    A keyword matches where its words appear in sequence, with the last one
+    allowed to continue ('wrinkle' matches 'wrinkles', 'dry skin' matches
+    'dry skinned'). Keywords that other keywords contain inside a word (such
+    as 'aging' in 'photoaging') also match anywhere in the text, as plain
+    substrings; match_words leaves that rule out. Concerns come back in
+    keyword-map order.
+    """
+
+    def __init__(self, concern_keywords: Dict[str, List[str]]):
+        self.concerns = list(concern_keywords)
+
+        owners: Dict[str, Set[int]] = {}
+        for position, keywords in enumerate(concern_keywords.values()):
+            for keyword in keywords:
+                # Text is lower-cased, so a keyword with capitals never matched it
+                if keyword == keyword.lower() and words(keyword):
+                    owners.setdefault(keyword, set()).add(position)
+
+        # Keywords found inside a word of another keyword also match as substrings
+        inside = self._inside_words(owners)
+        self._in_word: List[Tuple[str, Tuple[int, ...]]] = []
+        # Single-word keyword -> positions
+        self._single: Dict[str, Tuple[int, ...]] = {}
+        # First word of a longer keyword -> (' '-joined words, inner words, last word, positions)
+        self._by_first: Dict[str, List[Tuple[str, Tuple[str, ...], str, Tuple[int, ...]]]] = {}
+        # Every word used by a keyword, and those of at least _HEAD characters by their head
+        self.known_words: Set[str] = set()
+        self._by_head: Dict[str, List[str]] = {}
+        self.max_words = 1  # Words in the longest keyword
+        for keyword, positions in owners.items():
+            positions = tuple(sorted(positions))
+            if keyword in inside:
+                self._in_word.append((keyword, positions))
+            keyword_words = words(keyword)
+            self.max_words = max(self.max_words, len(keyword_words))
+            if len(keyword_words) == 1:
+                merged = set(self._single.get(keyword_words[0], ())).union(positions)
+                self._single[keyword_words[0]] = tuple(sorted(merged))
+            else:
+                self._by_first.setdefault(keyword_words[0], []).append(
+                    (' '.join(keyword_words), tuple(keyword_words[1:-1]), keyword_words[-1], positions))
+            for word in keyword_words:
+                if word not in self.known_words:
+                    self.known_words.add(word)
+                    if len(word) >= _HEAD:
+                        self._by_head.setdefault(word[:_HEAD], []).append(word)
+        self._token_words = _TokenWords(self.known_words, self._by_head)
+
+    @staticmethod
+    def _inside_words(keywords: Iterable[str]) -> Set[str]:
+        """Keywords occurring in another keyword at a position right after a letter or digit
+
+        Every such position of every keyword starts one sorted tail string, so
+        the tails a keyword begins are one bisected range, rather than a scan
+        of every other keyword.
+        """
+        tails = sorted(keyword[start:] for keyword in keywords
+                       for start in range(1, len(keyword)) if keyword[start - 1].isalnum())
+        inside = set()
+        for keyword in keywords:
+            index = bisect.bisect_left(tails, keyword)
+            # A keyword's own tails are shorter than itself, so any match is another keyword
+            if index < len(tails) and tails[index].startswith(keyword):
+                inside.add(keyword)
+        return inside
+
+    def match(self, text_lower: str) -> List[str]:
+        """Return matched concerns for already lower-cased text, in map order"""
+        found = {position for keyword, positions in self._in_word if keyword in text_lower for position in positions}
+        found.update(self._word_matches(words(text_lower)))
+        return [self.concerns[position] for position in sorted(found)]
+
+    def match_words(self, tokens: List[str]) -> List[str]:
+        """Return concerns matched by whole words (and extended last words) of tokens, in map order"""
+        return [self.concerns[position] for position in sorted(self._word_matches(tokens))]
+
+    def _word_matches(self, tokens: List[str]) -> Set[int]:
+        found: Set[int] = set()
+        distinct = set(tokens)
+        exact = self.known_words.intersection(distinct)
+        present = set(chain.from_iterable(map(self._token_words.__getitem__, distinct)))
+
+        single = self._single
+        for word in present:
+            positions = single.get(word)
+            if positions is not None:
+                found.update(positions)
+
+        joined = None
+        for first in exact:
+            for phrase, inner, last, positions in self._by_first.get(first, ()):
+                # Inner words must be whole, and the sequence unbroken
+                if last not in present or not exact.issuperset(inner):
+                    continue
+                if joined is None:
+                    joined = ' ' + ' '.join(tokens)
+                if ' ' + phrase in joined:
+                    found.update(positions)
+        return found
@@ -14,6 +14,23 @@ SKIN_TYPES = ["Any", "Dry", "Oily", "Normal", "Sensitive", "Combination"]
 MIN_CONCERN_KEYWORDS = 1
 CONFIDENCE_THRESHOLD = 0.5
 
+# Engine performance settings
+RESULT_CACHE_SIZE = 512  # Distinct (concern set, skin type) results kept in memory
+DISK_CACHE_PATH = None  # SQLite file for a result cache shared across processes and restarts (None disables)
+DISK_CACHE_MAX_ENTRIES = 100_000  # Oldest disk cache entries are evicted beyond this
+DISK_CACHE_TTL = 7 * 24 * 3600  # Seconds a disk cache entry is served
+DISK_CACHE_BUSY_TIMEOUT = 5.0  # Seconds to wait for another process's disk cache write
+ANSWER_TABLE_PATH = None  # File from `python -m answer_table` answering one- and two-concern queries (None disables)
+DATASET_WATCH_INTERVAL = 5.0  # Seconds between checks for an updated CSV (0 disables hot reload)
+TOP_K_INGREDIENTS = 12  # Highest-ranked ingredients returned per request (None returns all, ranked)
+TOP_K_BRANDS = 8  # Highest-ranked brands returned per request
+FUZZY_MATCHING = True  # Match concern keywords despite small typos ("rosaceaa", "blackhedas")
+SEMANTIC_TOP_K = 3  # Concerns taken from the TF-IDF fallback when no keyword matches
+SEMANTIC_MIN_SCORE = 0.1  # Minimum cosine similarity for a fallback concern
+INGEST_CHUNK_ROWS = 50_000  # CSV rows parsed and validated at a time
+INGEST_MAX_INVALID_FRACTION = 0.05  # Refuse to serve a dataset rejecting more rows than this
+INGEST_MAX_REPORTED_ERRORS = 100  # Rejected rows listed individually in the ingest report
+
 # UI/UX settings
 CARD_SHADOW = "0 2px 8px rgba(0,0,0,0.08)"
 HOVER_SHADOW = "0 4px 16px rgba(0,0,0,0.12)"
@@ -0,0 +1,107 @@
+"""
+Ingredient interaction checks over a precomputed compatibility matrix
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from ingredients_db import CONCERN_INGREDIENT_MAP, INGREDIENT_CONFLICTS, INGREDIENT_GLOSSARY
+from normalization import canonical_key
+
+# Matrix cell values: matrix[a][b] describes the pair with a as first ingredient
+COMPATIBLE = 0
+SPLIT = 1  # a in the morning, b at night
+ALTERNATE = 2  # Both at night, on different nights
+KINDS = {'split': SPLIT, 'alternate': ALTERNATE}
+
+
+class Conflict(NamedTuple):
+    """Two recommended ingredients that shouldn't share a routine"""
+    first: str
+    second: str
+    kind: str  # 'split' or 'alternate'
+    reason: str
+
+    @property
+    def advice(self) -> str:
+        if self.kind == 'split':
+            return f"Use **{self.first}** in the morning and **{self.second}** at night"
+        return f"Use **{self.first}** and **{self.second}** on alternate nights"
+
+
+def _vocabulary(conflicts: List[Tuple[str, str, str, str]]) -> List[str]:
+    """Display names in id order: glossary, then concern map, then conflict table"""
+    names = list(INGREDIENT_GLOSSARY)
+    names.extend(name for ingredients in CONCERN_INGREDIENT_MAP.values() for name in ingredients)
+    names.extend(name for first, second, _, _ in conflicts for name in (first, second))
+    return names
+
+
+class CompatibilityMatrix:
+    """Dense small-int matrix over normalized ingredient ids
+
+    Every ingredient from the glossary, the concern map and the conflict table
+    gets an id. Each conflicting pair sets one cell, and each id keeps the
+    sorted columns of its nonzero cells, so a request's conflicts are found by
+    walking only the partners of its own ingredients, however many were
+    aggregated. Plain bytearrays keep this importable without NumPy.
+    """
+
+    def __init__(self, conflicts: Iterable[Tuple[str, str, str, str]] = INGREDIENT_CONFLICTS):
+        conflicts = list(conflicts)
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for name in _vocabulary(conflicts):
+            key = canonical_key(name)
+            if key not in self.ids:
+                self.ids[key] = len(self.names)
+                self.names.append(name)
+
+        self.matrix = [bytearray(len(self.names)) for _ in self.names]
+        self.reasons: Dict[Tuple[int, int], str] = {}
+        for first, second, kind, reason in conflicts:
+            if kind not in KINDS:
+                raise ValueError(f"Unknown conflict kind {kind!r}; expected one of {tuple(KINDS)}")
+            a, b = self.ids[canonical_key(first)], self.ids[canonical_key(second)]
+            if kind == 'alternate' and b < a:
+                # Order doesn't matter here, so keep one canonical cell per pair
+                first, second, a, b = second, first, b, a
+            self.matrix[a][b] = KINDS[kind]
+            self.reasons[a, b] = reason
+        # id -> ascending ids it conflicts with as the first ingredient
+        self.partners: Dict[int, Tuple[int, ...]] = {}
+        for a, row in enumerate(self.matrix):
+            columns = tuple(b for b, cell in enumerate(row) if cell != COMPATIBLE)
+            if columns:
+                self.partners[a] = columns
+        # Raw dataset spelling -> id (-1 when unknown), filled as names are first seen
+        self._ids_by_raw: Dict[str, int] = {}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(row) for row in self.matrix)
+
+    def lookup(self, ingredients: Iterable[str]) -> List[int]:
+        """Sorted distinct ids of the known ingredients"""
+        cache = self._ids_by_raw
+        ids = set()
+        for name in ingredients:
+            entry_id = cache.get(name)
+            if entry_id is None:
+                entry_id = cache[name] = self.ids.get(canonical_key(name), -1)
+            ids.add(entry_id)
+        ids.discard(-1)
+        return sorted(ids)
+
+    def conflicts(self, ingredients: Iterable[str]) -> Tuple[Conflict, ...]:
+        """Conflicting pairs among ingredients, in a stable (id) order"""
+        ids = self.lookup(ingredients)
+        if len(ids) < 2:
+            return ()
+        present = set(ids)
+        found = []
+        for a in ids:
+            for b in self.partners.get(a, ()):
+                if b in present:
+                    kind = 'split' if self.matrix[a][b] == SPLIT else 'alternate'
+                    found.append(Conflict(self.names[a], self.names[b], kind, self.reasons[a, b]))
+        return tuple(found)
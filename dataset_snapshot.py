@@ -0,0 +1,175 @@
+"""
+Binary snapshot of the skincare dataset so cold starts skip CSV parsing
+
+Each column is stored dictionary-encoded as two .npy files (int32 codes and
+the unique values) that load memory-mapped. A meta.json records the source
+CSV's size, mtime and SHA-256; the snapshot is rebuilt when the CSV changes.
+NumPy and pandas are only imported to read or write a snapshot, so the path
+and hashing helpers stay cheap to import.
+"""
+
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+SNAPSHOT_VERSION = 2  # 2: only rows that passed ingestion validation
+CACHE_DIR_NAME = '.skincare_cache'
+
+
+def cache_dir(csv_path: str, kind: str) -> str:
+    """Directory for one kind of derived artifact of a given CSV"""
+    directory = os.path.dirname(os.path.abspath(csv_path))
+    return os.path.join(directory, CACHE_DIR_NAME, f"{os.path.basename(csv_path)}.{kind}")
+
+
+def snapshot_dir(csv_path: str) -> str:
+    """Directory holding the snapshot for a given CSV"""
+    return cache_dir(csv_path, 'snapshot')
+
+
+def file_sha256(path: str) -> str:
+    """Content hash of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _fingerprint(csv_path: str) -> Dict:
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _changed(before: os.stat_result, after: os.stat_result) -> bool:
+    # The inode catches a same-size file swapped in by os.replace within one mtime tick
+    return ((before.st_ino, before.st_size, before.st_mtime_ns)
+            != (after.st_ino, after.st_size, after.st_mtime_ns))
+
+
+def _read_meta(directory: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(directory, 'meta.json')) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, payload: Dict):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as handle:
+        json.dump(payload, handle)
+    os.replace(tmp_path, path)
+
+
+def dataset_version(csv_path: str) -> str:
+    """SHA-256 of the CSV, reusing the snapshot's recorded hash when the file is unchanged"""
+    meta = _read_meta(snapshot_dir(csv_path))
+    fingerprint = _fingerprint(csv_path)
+    if meta and meta.get('size') == fingerprint['size'] and meta.get('mtime_ns') == fingerprint['mtime_ns']:
+        return meta['sha256']
+    return file_sha256(csv_path)
+
+
+def load_snapshot(csv_path: str) -> Optional['pd.DataFrame']:
+    """Return the dataset from a valid snapshot, or None if it is missing or stale"""
+    import numpy as np
+    import pandas as pd
+
+    directory = snapshot_dir(csv_path)
+    meta = _read_meta(directory)
+    if not meta or meta.get('version') != SNAPSHOT_VERSION:
+        return None
+
+    fingerprint = _fingerprint(csv_path)
+    if meta['size'] != fingerprint['size'] or meta['mtime_ns'] != fingerprint['mtime_ns']:
+        # Touched but possibly unchanged (checkout, copy): fall back to the content hash
+        if meta['size'] != fingerprint['size'] or file_sha256(csv_path) != meta['sha256']:
+            return None
+        meta.update(fingerprint)
+        _write_json(os.path.join(directory, 'meta.json'), meta)
+
+    try:
+        columns = {}
+        for position, name in enumerate(meta['columns']):
+            codes = np.load(os.path.join(directory, f'{position}.codes.npy'), mmap_mode='r')
+            values = np.load(os.path.join(directory, f'{position}.values.npy'), mmap_mode='r')
+            columns[name] = np.array(values.tolist(), dtype=object)[codes]
+    except (OSError, ValueError):
+        return None
+    return pd.DataFrame(columns)
+
+
+class SnapshotWriter:
+    """Builds a snapshot from DataFrame chunks, so a large CSV never has to be in memory at once
+
+    Each chunk is dictionary-encoded against the running per-column values as
+    it arrives; only the codes and the distinct values are kept until finish().
+    The CSV is fingerprinted and hashed before any chunk is read, and the
+    snapshot is discarded if the file has changed by the time it is written.
+    """
+
+    def __init__(self, csv_path: str, columns: List[str]):
+        self.csv_path = csv_path
+        # Taken up front: a file replaced mid-ingestion must not lend its hash to the old rows
+        self.source_stat = os.stat(csv_path)
+        self.sha256 = file_sha256(csv_path)
+        self.columns = [str(name) for name in columns]
+        self.codes: List[List] = [[] for _ in self.columns]  # int32 code arrays per chunk
+        self.values: List[Dict[str, int]] = [{} for _ in self.columns]
+        self.usable = True
+
+    def add(self, chunk: 'pd.DataFrame'):
+        import numpy as np
+        import pandas as pd
+
+        if not self.usable:
+            return
+        if chunk.isna().any().any():
+            # .npy string arrays can't carry NaN without pickling; keep reading the CSV
+            self.usable = False
+            return
+        for position, name in enumerate(self.columns):
+            chunk_codes, chunk_values = pd.factorize(chunk[name].astype(str))
+            known = self.values[position]
+            remap = np.fromiter((known.setdefault(value, len(known)) for value in chunk_values),
+                                dtype=np.int32, count=len(chunk_values))
+            self.codes[position].append(remap[chunk_codes])
+
+    def finish(self) -> bool:
+        """Write the snapshot; returns False when it can't be written"""
+        import numpy as np
+
+        if not self.usable:
+            return False
+        directory = snapshot_dir(self.csv_path)
+        try:
+            if _changed(self.source_stat, os.stat(self.csv_path)):
+                print(f"Warning: {self.csv_path} changed while it was being ingested; not writing a snapshot")
+                return False
+            os.makedirs(directory, exist_ok=True)
+            # Invalidate the old snapshot before its files start being replaced
+            meta_path = os.path.join(directory, 'meta.json')
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            for position in range(len(self.columns)):
+                codes = np.concatenate(self.codes[position]) if self.codes[position] else np.zeros(0, dtype=np.int32)
+                values = np.asarray(list(self.values[position]), dtype=str)
+                for suffix, array in (('codes', codes.astype(np.int32)), ('values', values)):
+                    path = os.path.join(directory, f'{position}.{suffix}.npy')
+                    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+                    np.save(tmp_path, array)
+                    os.replace(tmp_path, path)
+
+            meta = {'version': SNAPSHOT_VERSION, 'columns': self.columns, 'sha256': self.sha256,
+                    'size': self.source_stat.st_size, 'mtime_ns': self.source_stat.st_mtime_ns}
+            # meta.json is written last so a half-written snapshot is never considered valid
+            _write_json(meta_path, meta)
+        except OSError as e:
+            print(f"Warning: could not write dataset snapshot: {e}")
+            return False
+        return True
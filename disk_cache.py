@@ -0,0 +1,169 @@
+"""
+Persistent recommendation cache shared by processes and replicas
+
+Results are stored in a SQLite file in WAL mode, so any number of processes
+read it concurrently while one writes at a time. Each entry is keyed on the
+sorted concerns, the skin-type filter and the dataset version (SHA-256 of the
+CSV). A result therefore never outlives the data it was computed from. When
+an engine loads a new version, it purges the entries of every other version.
+Entries also expire after a TTL, and the oldest are trimmed beyond a maximum
+entry count. Values are JSON, never pickles, so a shared file can't carry
+code.
+
+A cache that can't be opened or written only costs recomputation. Errors are
+counted and reported once, never raised into a request.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+from config import DISK_CACHE_BUSY_TIMEOUT, DISK_CACHE_MAX_ENTRIES, DISK_CACHE_TTL
+from conflicts import Conflict
+
+CACHE_FORMAT = 1  # Bump when the stored result layout changes; part of every key
+PRUNE_INTERVAL = 256  # Writes between expiry / size checks
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    dataset TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (dataset, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_created ON results (created);
+"""
+
+
+def cache_key(concerns: Sequence[str], skin_type_filter: Optional[str]) -> str:
+    """Order- and case-insensitive key for a request's concerns and skin type"""
+    return json.dumps([CACHE_FORMAT, sorted(concerns), skin_type_filter.lower() if skin_type_filter else None])
+
+
+def _encode(result: Dict) -> str:
+    return json.dumps(result, ensure_ascii=False, separators=(',', ':'))
+
+
+def _decode(value: str) -> Dict:
+    result = json.loads(value)
+    # NamedTuples were stored as plain lists
+    result['conflicts'] = tuple(Conflict(*conflict) for conflict in result.get('conflicts', ()))
+    return result
+
+
+class DiskResultCache:
+    """SQLite-backed result cache with TTL and size eviction and hit/miss/error counters"""
+
+    def __init__(self, path: str, max_entries: int = DISK_CACHE_MAX_ENTRIES, ttl: float = DISK_CACHE_TTL,
+                 busy_timeout: float = DISK_CACHE_BUSY_TIMEOUT):
+        """
+        Args:
+            path: SQLite file, created if missing; share it between replicas
+            max_entries: Entries kept before the oldest are evicted
+            ttl: Seconds an entry is served after it was written
+            busy_timeout: Seconds to wait for another process's write lock
+        """
+        if max_entries <= 0 or ttl <= 0:
+            raise ValueError("max_entries and ttl must be positive")
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.busy_timeout = busy_timeout
+        # One connection per thread and process: sqlite3 connections can't
+        # cross threads, and must not be reused by a forked child
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._warned = False
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.evictions = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _failed(self, action: str, error: Exception):
+        with self._lock:
+            self.errors += 1
+            warn, self._warned = not self._warned, True
+        if warn:
+            print(f"Warning: disk result cache {self.path} could not {action}, recomputing instead: {error}")
+
+    def get(self, dataset: str, key: str) -> Optional[Dict]:
+        """Cached result for key under dataset version, or None if missing or expired"""
+        try:
+            row = self._connection().execute(
+                'SELECT value FROM results WHERE dataset = ? AND key = ? AND created >= ?',
+                (dataset, key, time.time() - self.ttl)).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            self._failed('read', e)
+            return None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if row is None else _decode(row[0])
+
+    def put(self, dataset: str, key: str, result: Dict):
+        """Store result, pruning expired and surplus entries every PRUNE_INTERVAL writes"""
+        try:
+            connection = self._connection()
+            connection.execute('INSERT OR REPLACE INTO results (dataset, key, value, created) VALUES (?, ?, ?, ?)',
+                               (dataset, key, _encode(result), time.time()))
+            with self._lock:
+                self._writes += 1
+                prune = self._writes % PRUNE_INTERVAL == 0
+            if prune:
+                self.prune()
+        except (sqlite3.Error, OSError) as e:
+            self._failed('write', e)
+
+    def prune(self):
+        """Drop expired entries, then the oldest ones beyond max_entries"""
+        connection = self._connection()
+        removed = connection.execute('DELETE FROM results WHERE created < ?', (time.time() - self.ttl,)).rowcount
+        cutoff = connection.execute('SELECT created FROM results ORDER BY created DESC LIMIT 1 OFFSET ?',
+                                    (self.max_entries,)).fetchone()
+        if cutoff is not None:
+            removed += connection.execute('DELETE FROM results WHERE created <= ?', cutoff).rowcount
+        with self._lock:
+            self.evictions += removed
+
+    def purge(self, dataset: str):
+        """Drop every entry computed from a dataset version other than dataset"""
+        try:
+            removed = self._connection().execute('DELETE FROM results WHERE dataset != ?', (dataset,)).rowcount
+        except (sqlite3.Error, OSError) as e:
+            self._failed('purge', e)
+            return
+        with self._lock:
+            self.evictions += removed
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the counters for metrics scraping"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'errors': self.errors,
+            }
@@ -0,0 +1,176 @@
+"""
+Typo-tolerant concern matching over a character-trigram inverted index
+
+Every word used by a concern keyword is indexed by its padded trigrams,
+bucketed by first letter and word length. A word from the description that no
+keyword uses only looks up the postings of its own trigrams within the
+lengths its edit budget allows, so candidate generation doesn't scan the vocabulary; the few
+candidates sharing enough trigrams are verified with a bounded (Damerau) edit
+distance. Each correction is put back into its surrounding words and matched
+against the keywords by whole words, so multi-word keywords still need their
+other words spelled right, and a keyword found inside a longer word ('red' in
+'tired') never fires on a correction.
+
+Only words missing from an English dictionary are treated as typos: real
+words a single edit away from a keyword word ("tried" and "tired", "serum"
+and "sebum") are left alone. The dictionary comes from pyspellchecker.
+"""
+
+import functools
+import re
+from collections import Counter
+from itertools import chain
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from concern_matcher import ConcernMatcher
+from result_cache import LRUCache
+
+_WORD = re.compile(r"[a-z0-9]+")
+MIN_TYPO_LENGTH = 5  # Shorter unknown words are too ambiguous to correct
+
+
+def normalize(text: str) -> List[str]:
+    """Lower-cased alphanumeric words; hyphens and punctuation split words"""
+    return _WORD.findall(text.lower())
+
+
+@functools.lru_cache(maxsize=None)
+def english_words() -> FrozenSet[str]:
+    """Lower-cased words of pyspellchecker's English dictionary, loaded once per process
+
+    Raises:
+        ImportError: pyspellchecker is not installed
+    """
+    from spellchecker import SpellChecker
+    return frozenset(SpellChecker(language='en', distance=1).word_frequency.keys())
+
+
+def max_distance(length: int) -> int:
+    """Edit budget for a word of the given length"""
+    if length < MIN_TYPO_LENGTH:
+        return 0
+    return 1 if length < 9 else 2
+
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a: str, b: str, limit: int) -> int:
+    """Optimal-string-alignment distance, or limit + 1 once it must exceed limit
+
+    Only the diagonal band of width 2 * limit + 1 is filled in, since any
+    cell outside it already costs more than limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    over = limit + 1
+    previous2: List[int] = []
+    previous = [j if j <= limit else over for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        if i <= limit:
+            current[0] = i
+        char, prior = a[i - 1], a[i - 2] if i > 1 else ''
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(len(b), i + limit) + 1):
+            value = previous[j - 1] if char == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if j > 1 and char == b[j - 2] and prior == b[j - 1] and previous2[j - 2] + 1 < value:
+                value = previous2[j - 2] + 1
+            current[j] = value if value < over else over
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return over
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyConcernMatcher:
+    """Find concerns whose keywords appear in the text with small typos
+
+    Only words that no keyword uses are looked up, so correctly spelled text
+    costs a set lookup per word. Concerns come back in keyword-map order, like
+    ConcernMatcher.
+    """
+
+    def __init__(self, phrase_matcher: ConcernMatcher, cache_size: int = 4096, dictionary: Iterable[str] = ()):
+        """
+        Args:
+            phrase_matcher: The exact matcher, shared with the engine; its
+                keyword words are the correction targets
+            cache_size: Unknown words whose corrections are remembered
+            dictionary: Correctly spelled lower-case words, never taken for
+                typos; usually english_words()
+        """
+        self.phrase_matcher = phrase_matcher
+        self.max_words = phrase_matcher.max_words
+
+        # Keywords match inside longer words, so "wrinkle" also covers "wrinkles";
+        # index the plural too so "wrinkels" is one edit away rather than two
+        words = phrase_matcher.known_words
+        self.known_words: Set[str] = words | {word + 's' for word in words}
+        self.words: List[str] = sorted(self.known_words)
+        self.dictionary: AbstractSet[str] = dictionary if isinstance(dictionary, (set, frozenset)) else set(dictionary)
+
+        self._positions = {concern: position for position, concern in enumerate(phrase_matcher.concerns)}
+        # Unknown words recur across requests; remember their corrections
+        self._corrections = LRUCache(cache_size)
+
+        # (trigram, first letter, word length) -> word ids. Typos rarely hit the
+        # first letter, and allowing it would turn "night" into "tight"
+        self.postings: Dict[Tuple[str, str, int], List[int]] = {}
+        self.gram_counts: List[int] = []
+        for word_id, word in enumerate(self.words):
+            grams = trigrams(word)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault((gram, word[0], len(word)), []).append(word_id)
+
+    def corrections(self, word: str) -> Tuple[str, ...]:
+        """Known words within the edit budget of word"""
+        found = self._corrections.get(word)
+        if found is None:
+            found = self._find_corrections(word)
+            self._corrections.put(word, found)
+        return found
+
+    def _find_corrections(self, word: str) -> Tuple[str, ...]:
+        limit = max_distance(len(word))
+        if limit == 0:
+            return ()
+        grams = trigrams(word)
+        first = word[0]
+        postings = self.postings
+        shared = Counter(chain.from_iterable(
+            postings.get((gram, first, length), ())
+            for length in range(len(word) - limit, len(word) + limit + 1) for gram in grams))
+
+        # Each edit (or transposition) changes at most four padded trigrams
+        required = len(grams) - 4 * limit
+        found = []
+        for word_id, count in shared.items():
+            if count >= required and count >= self.gram_counts[word_id] - 4 * limit:
+                candidate = self.words[word_id]
+                if bounded_distance(word, candidate, limit) <= limit:
+                    found.append(candidate)
+        return tuple(found)
+
+    def match(self, text: str) -> List[str]:
+        """Return concerns matched through a corrected typo anywhere in text, in map order"""
+        words = normalize(text)
+        found: Set[str] = set()
+        span = self.max_words - 1
+        for position, word in enumerate(words):
+            if word in self.known_words or word in self.dictionary or len(word) < MIN_TYPO_LENGTH:
+                continue
+            before = words[max(0, position - span):position]
+            after = words[position + 1:position + 1 + span]
+            for correction in self.corrections(word):
+                found.update(self.phrase_matcher.match_words(before + [correction] + after))
+        return sorted(found, key=self._positions.__getitem__)
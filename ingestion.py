@@ -0,0 +1,199 @@
+"""
+Streaming ingestion and validation of the skincare dataset CSV
+
+The CSV is read in chunks. Each chunk is validated, its accepted rows are
+streamed straight into the CompactDataset builder (and the snapshot writer),
+and then the chunk is dropped, so only the encoded store is resident at the
+end however large the drop was. Rejected rows are collected into an
+IngestReport; a file that is unreadable, lacks required columns or rejects
+too many rows raises DatasetValidationError instead of being served. pandas
+is only imported to parse, so the report and error types are cheap to import.
+
+Validate a drop without starting the app:
+    python -m ingestion path/to/skincare_dataset.csv
+"""
+
+import argparse
+import sys
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Iterator, List, NamedTuple, Optional
+
+from config import INGEST_CHUNK_ROWS, INGEST_MAX_INVALID_FRACTION, INGEST_MAX_REPORTED_ERRORS, SKIN_TYPES
+from dataset_snapshot import SnapshotWriter
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from compact_store import CompactDataset
+
+REQUIRED_COLUMNS = ['concern', 'skin_type', 'ingredients', 'benefits', 'brands', 'notes']
+VALID_SKIN_TYPES = frozenset(skin_type.lower() for skin_type in SKIN_TYPES if skin_type != "Any")
+
+
+class RowError(NamedTuple):
+    row: int  # 1-based data row, not counting the header
+    column: str
+    message: str
+    value: str
+
+
+class IngestReport:
+    """Counts of read and rejected rows, plus the first rejected rows in detail"""
+
+    def __init__(self, source: str, max_errors: int = INGEST_MAX_REPORTED_ERRORS):
+        self.source = source
+        self.max_errors = max_errors
+        self.rows_read = 0
+        self.rows_accepted = 0
+        self.errors: List[RowError] = []
+        self.error_counts: Counter = Counter()  # message -> rejected rows
+
+    @property
+    def rows_rejected(self) -> int:
+        return self.rows_read - self.rows_accepted
+
+    def reject(self, row: int, column: str, message: str, value: str):
+        self.error_counts[message] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(RowError(row, column, message, value))
+
+    def format(self) -> str:
+        lines = [f"{self.source}: {self.rows_read:,} rows read, {self.rows_accepted:,} accepted, "
+                 f"{self.rows_rejected:,} rejected"]
+        for message, count in self.error_counts.most_common():
+            lines.append(f"  {count:>8,} x {message}")
+        for error in self.errors:
+            lines.append(f"  row {error.row}: {error.column}: {error.message} ({error.value!r})")
+        if sum(self.error_counts.values()) > len(self.errors):
+            lines.append(f"  ... only the first {len(self.errors)} rejected rows are listed")
+        return '\n'.join(lines)
+
+
+class DatasetValidationError(ValueError):
+    """The dataset can't be served; report says why, row by row where it applies"""
+
+    def __init__(self, message: str, report: Optional[IngestReport] = None):
+        super().__init__(message if report is None else f"{message}\n{report.format()}")
+        self.report = report
+
+
+class IngestResult(NamedTuple):
+    store: 'CompactDataset'
+    frame: Optional['pd.DataFrame']  # Accepted rows, only when asked to keep them
+    report: IngestReport
+
+
+def validate_chunk(chunk: 'pd.DataFrame', first_row: int, report: IngestReport) -> 'pd.DataFrame':
+    """Accepted rows of chunk, with skin types normalized; rejects are added to report
+
+    Each row is reported for its first problem only.
+    """
+    import pandas as pd
+
+    skin_types = chunk['skin_type'].str.strip().str.lower()
+    ingredient_tokens = chunk['ingredients'].str.replace(',', '', regex=False).str.strip()
+    checks = [('concern', chunk['concern'].str.strip() == '', "missing concern")]
+    checks.append(('skin_type', ~skin_types.isin(VALID_SKIN_TYPES),
+                   f"skin type must be one of {', '.join(sorted(VALID_SKIN_TYPES))}"))
+    checks.append(('ingredients', ingredient_tokens == '', "no ingredients listed"))
+    checks.extend((column, chunk[column].str.strip() == '', f"missing {column}")
+                  for column in ('benefits', 'brands', 'notes'))
+
+    rejected = pd.Series(False, index=chunk.index)
+    for column, failed, message in checks:
+        failed = failed & ~rejected
+        for position in failed.to_numpy().nonzero()[0]:
+            report.reject(first_row + int(position), column, message, chunk[column].iat[position])
+        rejected |= failed
+
+    accepted = chunk[~rejected.to_numpy()].copy()
+    accepted['skin_type'] = skin_types[~rejected.to_numpy()]
+    return accepted
+
+
+def ingest_csv(csv_path: str, chunk_rows: int = INGEST_CHUNK_ROWS, snapshot: bool = True,
+               keep_frame: bool = False, max_invalid_fraction: float = INGEST_MAX_INVALID_FRACTION) -> IngestResult:
+    """
+    Validate csv_path chunk by chunk and encode the accepted rows
+
+    Args:
+        csv_path: Dataset CSV
+        chunk_rows: Rows parsed per chunk; bounds the memory spent on parsing
+        snapshot: Also write a binary snapshot of the accepted rows
+        keep_frame: Also return the accepted rows as one DataFrame
+        max_invalid_fraction: Largest share of rejected rows that is still served
+
+    Returns:
+        IngestResult with the encoded store, the frame if kept, and the report
+
+    Raises:
+        DatasetValidationError: the file is unreadable, lacks required columns,
+            has no valid rows, or rejects more than max_invalid_fraction of them
+    """
+    import pandas as pd
+
+    from compact_store import TEXT_COLUMNS, CompactDataset
+
+    report = IngestReport(csv_path)
+    try:
+        header = pd.read_csv(csv_path, nrows=0).columns
+    except (OSError, ValueError) as e:
+        raise DatasetValidationError(f"Cannot read dataset {csv_path}: {e}") from e
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise DatasetValidationError(f"Dataset {csv_path} is missing required columns: {', '.join(missing)}")
+    text_columns = [name for name in TEXT_COLUMNS if name in header]
+    columns = list(dict.fromkeys(REQUIRED_COLUMNS + text_columns))
+
+    writer = SnapshotWriter(csv_path, columns) if snapshot else None
+    kept: List['pd.DataFrame'] = []
+
+    def records() -> Iterator[Dict]:
+        # Every cell stays a string; empty cells are '' rather than NaN
+        chunks = pd.read_csv(csv_path, usecols=columns, dtype=str, na_filter=False, chunksize=chunk_rows)
+        for chunk in chunks:
+            accepted = validate_chunk(chunk[columns], report.rows_read + 1, report)
+            report.rows_read += len(chunk)
+            report.rows_accepted += len(accepted)
+            if writer is not None:
+                writer.add(accepted)
+            if keep_frame:
+                kept.append(accepted)
+            yield from (dict(zip(columns, values)) for values in zip(*(accepted[name] for name in columns)))
+
+    try:
+        store = CompactDataset.from_records(records(), text_columns)
+    except (OSError, ValueError) as e:
+        raise DatasetValidationError(f"Cannot parse dataset {csv_path}: {e}", report) from e
+
+    if report.rows_accepted == 0:
+        raise DatasetValidationError(f"Dataset {csv_path} has no valid rows", report)
+    if report.rows_rejected > max_invalid_fraction * report.rows_read:
+        raise DatasetValidationError(
+            f"Dataset {csv_path} rejected {report.rows_rejected:,} of {report.rows_read:,} rows, "
+            f"more than the allowed {max_invalid_fraction:.0%}", report)
+
+    # Only a dataset that passed is snapshotted, so a snapshot never needs revalidating
+    if writer is not None:
+        writer.finish()
+    frame = pd.concat(kept, ignore_index=True) if keep_frame else None
+    return IngestResult(store, frame, report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a skincare dataset CSV")
+    parser.add_argument('csv_path')
+    parser.add_argument('--chunk-rows', type=int, default=INGEST_CHUNK_ROWS)
+    parser.add_argument('--max-invalid-fraction', type=float, default=INGEST_MAX_INVALID_FRACTION)
+    args = parser.parse_args()
+    try:
+        result = ingest_csv(args.csv_path, args.chunk_rows, snapshot=False,
+                            max_invalid_fraction=args.max_invalid_fraction)
+    except DatasetValidationError as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+    print(result.report.format())
+
+
+if __name__ == '__main__':
+    main()
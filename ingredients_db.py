@@ -2,6 +2,12 @@
 Comprehensive Skincare Ingredients Database and Product Information
 """
 
+import bisect
+import functools
+import heapq
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
 INGREDIENT_GLOSSARY = {
     # Exfoliants
     'Salicylic Acid': 'BHA that exfoliates pores and reduces acne; ideal for oily, congested skin',
@@ -29,6 +35,7 @@ INGREDIENT_GLOSSARY = {
     # Anti-Aging & Retinoids
     'Retinol': 'Vitamin A derivative; stimulates collagen; reduces wrinkles and fine lines',
     'Retinoid': 'Family of vitamin A compounds; powerful anti-aging; requires gradual introduction',
+    'Bakuchiol': 'Plant-based retinol alternative; smooths fine lines; gentle enough for sensitive skin',
     'Coenzyme Q10': 'Antioxidant; boosts energy in cells; reduces fine lines',
     'Peptides': 'Amino acid chains; stimulate collagen; improve skin firmness',
     'Collagen': 'Protein; plumps skin; improves elasticity; large molecules (stays on surface)',
@@ -74,6 +81,51 @@ CONCERN_INGREDIENT_MAP = {
     'dull skin': ['vitamin c', 'aha', 'glycolic acid', 'niacinamide'],
 }
 
+# Other spellings of glossary ingredients and brands, resolved to the
+# canonical name at dataset load (matching is case-insensitive)
+INGREDIENT_ALIASES = {
+    'l-ascorbic acid': 'Vitamin C',
+    'ascorbic acid': 'Vitamin C',
+    'alpha hydroxy acid': 'AHA',
+    'alpha hydroxy acids': 'AHA',
+    'bha': 'Salicylic Acid',
+    'beta hydroxy acid': 'Salicylic Acid',
+    'sodium hyaluronate': 'Hyaluronic Acid',
+    'ceramide': 'Ceramides',
+    'peptide': 'Peptides',
+    'vitamin b3': 'Niacinamide',
+    'vitamin b5': 'Panthenol',
+    'tocopherol': 'Vitamin E',
+    'coq10': 'Coenzyme Q10',
+    'cica': 'Centella Asiatica',
+}
+
+BRAND_ALIASES = {
+    'paulas choice': 'Paula\'s Choice',
+    'kiehls': 'Kiehl\'s',
+    'estée lauder': 'Estee Lauder',
+    'sk ii': 'SK-II',
+    'la roche-posay': 'La Roche Posay',
+}
+
+# Ingredient pairs that shouldn't be layered in the same routine. 'split' pairs
+# are listed (morning, night); 'alternate' pairs both belong in the evening,
+# on different nights
+INGREDIENT_CONFLICTS = [
+    ('Vitamin C', 'Retinol', 'split', 'Both are potent actives; layered together they irritate and vitamin C loses stability'),
+    ('Vitamin C', 'Retinoid', 'split', 'Both are potent actives; layered together they irritate and vitamin C loses stability'),
+    ('Vitamin C', 'AHA', 'split', 'Acids lower the pH and destabilize vitamin C'),
+    ('Vitamin C', 'Glycolic Acid', 'split', 'Acids lower the pH and destabilize vitamin C'),
+    ('Benzoyl Peroxide', 'Retinol', 'split', 'Benzoyl peroxide oxidizes retinol and inactivates it'),
+    ('Benzoyl Peroxide', 'Retinoid', 'split', 'Benzoyl peroxide oxidizes retinoids and inactivates them'),
+    ('Salicylic Acid', 'Retinol', 'alternate', 'Exfoliating acids with retinol over-strip the barrier'),
+    ('Salicylic Acid', 'Retinoid', 'alternate', 'Exfoliating acids with retinoids over-strip the barrier'),
+    ('AHA', 'Retinol', 'alternate', 'Exfoliating acids with retinol over-strip the barrier'),
+    ('AHA', 'Retinoid', 'alternate', 'Exfoliating acids with retinoids over-strip the barrier'),
+    ('Glycolic Acid', 'Retinol', 'alternate', 'Exfoliating acids with retinol over-strip the barrier'),
+    ('Glycolic Acid', 'Retinoid', 'alternate', 'Exfoliating acids with retinoids over-strip the barrier'),
+]
+
 BRAND_INFO = {
     'The Ordinary': {
         'price_range': '$',
@@ -101,3 +153,153 @@ BRAND_INFO = {
         'best_for': 'Luxury skincare seekers'
     },
 }
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SHORT_PREFIX = 2  # Prefixes up to this length answer from a precomputed table
+_SHORT_PREFIX_TOP = 50
+_SUFFIXES = ('ing', 'ion', 'es', 'ed', 'ly', 's', 'e')
+
+
+def _stem(word: str) -> str:
+    """Crude suffix stripping, so 'soothing', 'soothes' and 'soothe' all become 'sooth'"""
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _take(id_lists: Iterable[List[int]], limit: int, seen: Set[int]) -> List[int]:
+    """First limit unseen ids from several ascending id lists"""
+    taken: List[int] = []
+    for entry_id in heapq.merge(*id_lists):
+        if entry_id not in seen:
+            seen.add(entry_id)
+            taken.append(entry_id)
+            if len(taken) == limit:
+                break
+    return taken
+
+
+def _prefix_span(keys: List, prefix: str) -> Tuple[int, int]:
+    """Index range of the sorted keys starting with prefix"""
+    return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + '\uffff')
+
+
+class GlossarySearchIndex:
+    """Ranked search-as-you-type over ingredient names and descriptions
+
+    Built once; every keystroke is then answered from prebuilt structures
+    instead of scanning the glossary. Results come in tiers, and a tier is
+    only consulted while the earlier ones leave room under the limit:
+      1. name prefix: names sorted for bisect (a flattened trie, where a prefix
+         is one contiguous range), with the best entries of every one- and
+         two-letter prefix precomputed
+      2. every query word starts a word of the name
+      3. name substring: trigram postings, verified with ``in``; one- and
+         two-letter queries have postings of their own
+      4. every query word (3+ letters) starts a word of the description, or
+         its stem starts a description word's stem ('soothing' finds 'soothes')
+    Entries are numbered by rank (shorter, then alphabetically first name), so
+    every posting list is already sorted best-first.
+    """
+
+    def __init__(self, glossary: Dict[str, str]):
+        self.first_entries: List[Tuple[str, str]] = list(glossary.items())
+        self.entries = sorted(self.first_entries, key=lambda entry: (len(entry[0]), entry[0].lower()))
+        self.names = [name.lower() for name, _ in self.entries]
+
+        self.name_keys = sorted(self.names)
+        self.name_ids: Dict[str, List[int]] = {}
+        self.prefix_top: Dict[str, List[int]] = {}
+        name_words: Dict[str, List[int]] = {}
+        trigrams: Dict[str, Set[int]] = {}
+        short_grams: Dict[str, Set[int]] = {}
+        description_words: Dict[str, List[int]] = {}
+        for entry_id, (name, (_, description)) in enumerate(zip(self.names, self.entries)):
+            self.name_ids.setdefault(name, []).append(entry_id)
+            for length in range(1, min(_SHORT_PREFIX, len(name)) + 1):
+                top = self.prefix_top.setdefault(name[:length], [])
+                if len(top) < _SHORT_PREFIX_TOP:
+                    top.append(entry_id)
+            for word in dict.fromkeys(_WORD.findall(name)):
+                name_words.setdefault(word, []).append(entry_id)
+            for start in range(len(name) - 2):
+                trigrams.setdefault(name[start:start + 3], set()).add(entry_id)
+            for length in (1, 2):
+                for start in range(len(name) - length + 1):
+                    short_grams.setdefault(name[start:start + length], set()).add(entry_id)
+            for word in _WORD.findall(description.lower()):
+                for form in dict.fromkeys((word, _stem(word))):
+                    ids = description_words.setdefault(form, [])
+                    if not ids or ids[-1] != entry_id:
+                        ids.append(entry_id)
+
+        self.trigrams = trigrams
+        self.short_grams = {gram: sorted(ids) for gram, ids in short_grams.items()}
+        self.name_words = sorted(name_words)
+        self.name_word_ids = [name_words[word] for word in self.name_words]
+        self.description_words = sorted(description_words)
+        self.description_ids = [description_words[word] for word in self.description_words]
+
+    def _name_prefix(self, query: str, limit: int, seen: Set[int]) -> List[int]:
+        if len(query) <= _SHORT_PREFIX and limit <= _SHORT_PREFIX_TOP:
+            return _take([self.prefix_top.get(query, [])], limit, seen)
+        start, end = _prefix_span(self.name_keys, query)
+        ids = sorted(entry_id for name in dict.fromkeys(self.name_keys[start:end]) for entry_id in self.name_ids[name])
+        return _take([ids], limit, seen)
+
+    @staticmethod
+    def _word_prefixes(words: List[Tuple[str, ...]], vocabulary: List[str], postings: List[List[int]],
+                       limit: int, seen: Set[int]) -> List[int]:
+        """Entries with a word starting with one of the forms of each of words"""
+        if not words:
+            return []
+        spans = [[_prefix_span(vocabulary, form) for form in forms] for forms in words]
+        if len(words) == 1:
+            return _take([ids for start, end in spans[0] for ids in postings[start:end]], limit, seen)
+        matches: Optional[Set[int]] = None
+        for word_spans in sorted(spans, key=lambda spans: sum(end - start for start, end in spans)):
+            ids = set().union(*(ids for start, end in word_spans for ids in postings[start:end]))
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                return []
+        return _take([sorted(matches)], limit, seen)
+
+    def _substring(self, query: str, limit: int, seen: Set[int]) -> List[int]:
+        if len(query) < 3:
+            return _take([self.short_grams.get(query, [])], limit, seen)
+        grams = sorted((self.trigrams.get(query[start:start + 3], set()) for start in range(len(query) - 2)), key=len)
+        candidates = grams[0].intersection(*grams[1:])
+        return _take([sorted(entry_id for entry_id in candidates if query in self.names[entry_id])], limit, seen)
+
+    def search(self, query: str, limit: int = 8) -> List[Tuple[str, str]]:
+        """Up to limit (name, description) pairs for query, best match first"""
+        query = query.strip().lower()
+        if not query:
+            return self.first_entries[:limit]
+
+        words = _WORD.findall(query)
+        tiers = (
+            lambda remaining, seen: self._name_prefix(query, remaining, seen),
+            lambda remaining, seen: self._word_prefixes([(word,) for word in words], self.name_words,
+                                                        self.name_word_ids, remaining, seen),
+            lambda remaining, seen: self._substring(query, remaining, seen),
+            # One- and two-letter fragments would match most descriptions
+            lambda remaining, seen: self._word_prefixes([tuple(dict.fromkeys((word, _stem(word))))
+                                                         for word in words if len(word) >= 3],
+                                                        self.description_words, self.description_ids, remaining, seen),
+        )
+        found: List[int] = []
+        seen: Set[int] = set()
+        for tier in tiers:
+            if len(found) >= limit:
+                break
+            found.extend(tier(limit - len(found), seen))
+        return [self.entries[entry_id] for entry_id in found]
+
+
+@functools.lru_cache(maxsize=None)
+def glossary_index() -> GlossarySearchIndex:
+    """The search index over INGREDIENT_GLOSSARY, built on first use once per process"""
+    return GlossarySearchIndex(INGREDIENT_GLOSSARY)
@@ -0,0 +1,175 @@
+"""
+Optional per-stage timing for RecommendationEngine requests
+
+Stages are 'load', 'extract', 'disk_cache' (when enabled), 'filter',
+'aggregate', 'rank' and 'render'. When instrumentation is off the engine uses
+NULL_TIMER, whose stages are a shared no-op context manager, so the hot path
+pays only an empty with-block.
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+import multiprocessing
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+STAGES = ('load', 'extract', 'disk_cache', 'filter', 'aggregate', 'rank', 'render')
+
+
+class _Stage:
+    __slots__ = ('timer', 'name', 'start')
+
+    def __init__(self, timer: 'StageTimer', name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        self.timer.durations[self.name] = self.timer.durations.get(self.name, 0.0) + elapsed
+
+
+class StageTimer:
+    """Collects wall-clock seconds per stage for a single request"""
+
+    enabled = True
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage durations in seconds, plus their total"""
+        breakdown = dict(self.durations)
+        breakdown['total'] = sum(self.durations.values())
+        return breakdown
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class _NullTimer:
+    """Stand-in used when instrumentation is off"""
+
+    enabled = False
+    _stage = _NullStage()
+
+    def stage(self, name: str) -> _NullStage:
+        return self._stage
+
+
+NULL_TIMER = _NullTimer()
+
+
+class TimingSink(ABC):
+    """Receives one timing breakdown per instrumented request"""
+
+    @abstractmethod
+    def emit(self, timings: Dict[str, float]):
+        """Called with the request's seconds per stage and their 'total'"""
+
+
+class LoggingSink(TimingSink):
+    """Log each breakdown as one line, in milliseconds"""
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger('skincare.timings')
+        self.level = level
+
+    def emit(self, timings: Dict[str, float]):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(self.level, "recommendation timings: %s",
+                            ' '.join(f"{stage}={seconds * 1000:.3f}ms" for stage, seconds in timings.items()))
+
+
+class JsonLinesSink(TimingSink):
+    """Append each breakdown to a JSON lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, timings: Dict[str, float]):
+        line = json.dumps({'timestamp': time.time(), **timings})
+        with self._lock, open(self.path, 'a') as handle:
+            handle.write(line + '\n')
+
+
+class PrometheusSink(TimingSink):
+    """Accumulate per-stage summaries and render them in Prometheus text format"""
+
+    def __init__(self, namespace: str = 'skincare'):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._sums: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+
+    def emit(self, timings: Dict[str, float]):
+        with self._lock:
+            for stage, seconds in timings.items():
+                self._sums[stage] = self._sums.get(stage, 0.0) + seconds
+                self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def totals(self) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """Snapshot of the per-stage (sums, counts)"""
+        with self._lock:
+            return dict(self._sums), dict(self._counts)
+
+    def render(self) -> str:
+        """Metrics page body for a /metrics endpoint"""
+        name = f"{self.namespace}_stage_seconds"
+        lines = [f"# HELP {name} Time spent per recommendation stage", f"# TYPE {name} summary"]
+        sums, counts = self.totals()
+        for stage in sorted(sums):
+            lines.append(f'{name}_sum{{stage="{stage}"}} {sums[stage]:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {counts[stage]}')
+        return '\n'.join(lines) + '\n'
+
+
+class SharedPrometheusSink(PrometheusSink):
+    """
+    PrometheusSink whose totals live in shared memory
+
+    Create it before forking: every child process then adds to the same
+    totals, so whichever process renders them reports the whole service.
+    """
+
+    _NAMES = STAGES + ('total',)
+
+    def __init__(self, namespace: str = 'skincare'):
+        super().__init__(namespace)
+        self._positions = {stage: position for position, stage in enumerate(self._NAMES)}
+        # Sums followed by counts
+        self._shared = multiprocessing.Array('d', 2 * len(self._NAMES))
+
+    def emit(self, timings: Dict[str, float]):
+        shared, positions, offset = self._shared, self._positions, len(self._NAMES)
+        with shared.get_lock():
+            for stage, seconds in timings.items():
+                position = positions[stage]
+                shared[position] += seconds
+                shared[offset + position] += 1
+
+    def totals(self) -> Tuple[Dict[str, float], Dict[str, int]]:
+        with self._shared.get_lock():
+            values = self._shared[:]
+        offset = len(self._NAMES)
+        sums, counts = {}, {}
+        for position, stage in enumerate(self._NAMES):
+            if values[offset + position]:
+                sums[stage] = values[position]
+                counts[stage] = int(values[offset + position])
+        return sums, counts
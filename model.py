@@ -1,271 +1,331 @@
-import pandas as pd
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+import hashlib
+import itertools
+import json
 import re
 import os
+import threading
+
+from config import ANSWER_TABLE_PATH, DISK_CACHE_PATH, FUZZY_MATCHING, RESULT_CACHE_SIZE, SEMANTIC_MIN_SCORE, SEMANTIC_TOP_K, TOP_K_BRANDS, TOP_K_INGREDIENTS
+from answer_table import AnswerTable, load_answer_table
+from concern_matcher import ConcernMatcher
+from conflicts import CompatibilityMatrix
+from disk_cache import DiskResultCache, cache_key
+from fuzzy_matcher import FuzzyConcernMatcher, english_words
+from dataset_snapshot import cache_dir, dataset_version, load_snapshot
+from ingestion import DatasetValidationError, IngestReport, ingest_csv
+from ingredients_db import BRAND_ALIASES, BRAND_INFO, INGREDIENT_ALIASES, INGREDIENT_GLOSSARY, PRODUCT_IMAGES
+from instrumentation import NULL_TIMER, StageTimer, TimingSink
+from ranking import concern_weights, top_k
+from recommendation_index import GENERAL_CONCERN, Aggregate, RecommendationIndex, split_list
+from result_cache import LRUCache
+from routines import DIRECTIONS, RoutineTable
+
+# pandas and NumPy are only imported by the code paths that need them, so
+# importing this module (and serving from a prebuilt index) stays light
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from compact_store import CompactDataset
+
+# 'index': dict lookups on the load-time index (default)
+# 'columnar': vectorized NumPy masks over dictionary-encoded columns
+# 'rows': the original DataFrame filter + iterrows loop, kept for benchmarking
+AGGREGATION_MODES = ('index', 'columnar', 'rows')
+
+_MISSING = object()
+
+class DatasetState(NamedTuple):
+    """Everything derived from one load of the dataset, swapped in as a unit"""
+    generation: int
+    store: Optional['CompactDataset']  # None when served from a prebuilt index
+    index: Optional[RecommendationIndex]
+    columns: Optional[object]
+    df: Optional['pd.DataFrame']  # Raw frame, only retained for the 'rows' aggregation mode
+    fingerprint: Optional[Tuple[int, int]]  # (size, mtime_ns) of the file it was loaded from
+    semantic: Optional[object]  # SemanticMatcher for unmatched descriptions, if enabled
+    report: Optional[IngestReport]  # Validation of the CSV, when it was parsed for this load
+    ingredient_names: Sequence[str]  # Display names by interned id
+    brand_names: Sequence[str]
+    version: Optional[str]  # results_version(), when the disk cache or an answer table needs it
+    answers: Optional[AnswerTable]  # Precomputed one- and two-concern results, if configured and current
 
 class RecommendationEngine:
     """Core recommendation engine using rule-based NLP and keyword matching"""
     
-    def __init__(self):
-        """Initialize the recommendation engine with skincare dataset"""
-        self.df = None
+    def __init__(self, aggregation: str = 'index', cache_size: int = RESULT_CACHE_SIZE,
+                 use_snapshot: bool = True, csv_path: str = "skincare_dataset.csv",
+                 timing_sink: Optional[TimingSink] = None,
+                 top_k_ingredients: Optional[int] = TOP_K_INGREDIENTS, top_k_brands: Optional[int] = TOP_K_BRANDS,
+                 semantic_fallback: bool = True, fuzzy_matching: bool = FUZZY_MATCHING,
+                 index_path: Optional[str] = None, disk_cache_path: Optional[str] = DISK_CACHE_PATH,
+                 answer_table_path: Optional[str] = ANSWER_TABLE_PATH):
+        """
+        Initialize the recommendation engine with skincare dataset
+        
+        Args:
+            aggregation: One of AGGREGATION_MODES
+            cache_size: Maximum number of cached results (0 disables the cache)
+            use_snapshot: Load from / write a binary snapshot of the CSV
+            csv_path: Dataset CSV; loading raises DatasetValidationError if it is
+                missing or invalid
+            timing_sink: Receives a per-stage timing breakdown for every request
+            top_k_ingredients: Number of ranked ingredients to return (None for all)
+            top_k_brands: Number of ranked brands to return (None for all)
+            semantic_fallback: Match descriptions with no keyword hit by TF-IDF similarity
+            fuzzy_matching: Also match keywords written with small typos
+            index_path: Serve from an index written by `python -m prebuilt_index`
+                instead of csv_path; with semantic_fallback=False this needs
+                neither pandas nor NumPy
+            disk_cache_path: SQLite file backing a second result cache tier that
+                survives restarts and is shared by every process using it
+            answer_table_path: File written by `python -m answer_table`, loaded
+                with the dataset to answer one- and two-concern queries directly
+        """
+        if aggregation not in AGGREGATION_MODES:
+            raise ValueError(f"Unknown aggregation mode {aggregation!r}; expected one of {AGGREGATION_MODES}")
+        if index_path is not None and aggregation != 'index':
+            raise ValueError("A prebuilt index only supports the 'index' aggregation mode")
+        self.aggregation = aggregation
+        self.use_snapshot = use_snapshot
+        self.csv_path = csv_path
+        self.index_path = index_path
+        self.timing_sink = timing_sink
+        self.top_k_ingredients = top_k_ingredients
+        self.top_k_brands = top_k_brands
+        self.semantic_fallback = semantic_fallback
+        self._state: Optional[DatasetState] = None
+        self._load_lock = threading.Lock()
+        self._generations = itertools.count(1)
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self.result_cache = LRUCache(cache_size)
+        self.disk_cache = DiskResultCache(disk_cache_path) if disk_cache_path else None
+        self.answer_table_path = answer_table_path
         self.concern_keywords = self._build_keyword_map()
+        self.concern_matcher = ConcernMatcher(self.concern_keywords)
+        self.fuzzy_matcher = self._build_fuzzy() if fuzzy_matching else None
+        self.routines = RoutineTable()
+        self.compatibility = CompatibilityMatrix()
+        # Concerns listed earlier in the keyword map weigh more when ranking
+        self._concern_priority = {concern: rank for rank, concern in enumerate(self.concern_keywords)}
+    
+    # Read-only views of the current state; requests take one snapshot of
+    # self._state instead so a concurrent reload can't mix two datasets
+    store = property(lambda self: self._state.store if self._state else None)
+    index = property(lambda self: self._state.index if self._state else None)
+    columns = property(lambda self: self._state.columns if self._state else None)
+    df = property(lambda self: self._state.df if self._state else None)
+    ingest_report = property(lambda self: self._state.report if self._state else None)
+    # Bumped by every (re)load, so callers can tell results of older data apart
+    dataset_generation = property(lambda self: self._state.generation if self._state else None)
     
-    def _ensure_dataset_loaded(self):
-        """Lazy load dataset only when needed"""
-        if self.df is None:
-            self.df = self._load_dataset()
+    def _ensure_dataset_loaded(self) -> DatasetState:
+        """Lazy load dataset only when needed; concurrent first calls share one load"""
+        state = self._state
+        if state is None:
+            with self._load_lock:
+                state = self._state
+                if state is None:
+                    state = self._swap_state(self._build_state())
+        return state
     
-    def _load_dataset(self) -> pd.DataFrame:
-        """Load skincare recommendations from CSV or embedded data"""
+    def _build_state(self) -> DatasetState:
+        """Load the dataset and build every derived structure, without publishing it"""
+        fingerprint = self._source_fingerprint()
+        if self.index_path is not None:
+            from prebuilt_index import load_prebuilt
+            prebuilt = load_prebuilt(self.index_path)
+            return DatasetState(next(self._generations), None, prebuilt.index, None, None, fingerprint,
+                                self._build_semantic(self.index_path, benefits=prebuilt.concern_benefits),
+                                None, prebuilt.ingredient_names, prebuilt.brand_names,
+                                *self._precomputed_results(prebuilt.source_sha256))
+        
+        # Keep the dictionary-encoded store resident instead of the object-column frame
+        store, df, report = self._load_dataset()
+        index = columns = None
+        if self.aggregation == 'index':
+            index = RecommendationIndex.from_store(store)
+        elif self.aggregation == 'columnar':
+            from columnar import ColumnarDataset
+            columns = ColumnarDataset(store)
+        return DatasetState(next(self._generations), store, index, columns, df, fingerprint,
+                            self._build_semantic(self.csv_path, store=store), report,
+                            store.ingredients.values, store.brands.values, *self._precomputed_results())
+    
+    def results_version(self, source_sha256: Optional[str] = None) -> str:
+        """
+        Identify everything a computed result depends on
+        
+        Args:
+            source_sha256: Hash of the source data; defaults to the CSV's
+        """
+        if source_sha256 is None:
+            source_sha256 = dataset_version(self.csv_path)
+        # Ranking settings and concern priorities change results too, so they are part of the version
+        settings = json.dumps([self.aggregation, self.top_k_ingredients, self.top_k_brands, list(self.concern_keywords),
+                               self._rules()])
+        return f"{source_sha256}:{hashlib.sha256(settings.encode()).hexdigest()[:16]}"
+    
+    def _rules(self) -> List:
+        """The reference tables results are built from besides the CSV, as JSON-ready lists"""
+        compatibility = self.compatibility
+        return [
+            # Display names and the aliases folded into them
+            list(INGREDIENT_GLOSSARY), sorted(INGREDIENT_ALIASES.items()),
+            list(BRAND_INFO), list(PRODUCT_IMAGES), sorted(BRAND_ALIASES.items()),
+            # Ingredient conflicts, kinds and reasons
+            [[compatibility.names[a], compatibility.names[b], compatibility.matrix[a][b], reason]
+             for (a, b), reason in sorted(compatibility.reasons.items())],
+            # Routine flags and every rendered routine
+            sorted(self.routines.flags_by_name.items()),
+            sorted(self.routines.morning.items()), sorted(self.routines.night.items()), DIRECTIONS,
+        ]
+    
+    def _precomputed_results(self, source_sha256: Optional[str] = None) -> Tuple[Optional[str], Optional[AnswerTable]]:
+        """Results version of freshly loaded data and its answer table, purging stale disk cache entries"""
+        if self.disk_cache is None and self.answer_table_path is None:
+            return None, None
+        version = self.results_version(source_sha256)
+        if self.disk_cache is not None:
+            self.disk_cache.purge(version)
+        
+        answers = None
+        if self.answer_table_path is not None:
+            try:
+                answers = load_answer_table(self.answer_table_path)
+            except DatasetValidationError as e:
+                print(f"Warning: answer table disabled, computing every query live: {e}")
+            else:
+                if answers.version != version:
+                    print(f"Warning: answer table {self.answer_table_path} was built for other data or settings, "
+                          f"computing every query live; rebuild it with `python -m answer_table`")
+                    answers = None
+        return version, answers
+    
+    def _build_semantic(self, source_path: str, store: Optional['CompactDataset'] = None,
+                        benefits: Optional[Mapping[str, Sequence[str]]] = None):
+        """Load or fit the TF-IDF fallback matcher; None when disabled or unavailable
+        
+        The concern documents come from benefits when given, else from store.
+        """
+        if not self.semantic_fallback:
+            return None
+        # Persist next to the dataset snapshot
+        directory = cache_dir(source_path, 'semantic') if self.use_snapshot else None
+        try:
+            from semantic_matcher import concern_benefits, concern_documents, load_or_fit
+            if benefits is None:
+                benefits = concern_benefits(store)
+            return load_or_fit(concern_documents(benefits, self.concern_keywords), directory)
+        except ImportError as e:
+            # Needs NumPy, and scikit-learn to fit; keyword matching still works without them
+            print(f"Warning: semantic fallback disabled, its dependencies are unavailable: {e}")
+            return None
+    
+    def _build_fuzzy(self) -> Optional[FuzzyConcernMatcher]:
+        """The typo-tolerant matcher; None when no English dictionary is available"""
+        try:
+            dictionary = english_words()
+        except ImportError as e:
+            # Without a dictionary every real word near a keyword would be "corrected"
+            print(f"Warning: fuzzy matching disabled, its English dictionary is unavailable: {e}")
+            return None
+        return FuzzyConcernMatcher(self.concern_matcher, dictionary=dictionary)
+    
+    def _swap_state(self, state: DatasetState) -> DatasetState:
+        # A single attribute store is atomic; in-flight requests keep the state they read
+        self._state = state
+        # Results computed against the previous data are no longer valid
+        self.result_cache.clear()
+        return state
+    
+    def _source_fingerprint(self) -> Optional[Tuple[int, int]]:
         try:
-            # Try to load from CSV file first
-            csv_path = "skincare_dataset.csv"
-            if os.path.exists(csv_path):
-                try:
-                    df = pd.read_csv(csv_path)
-                    # Ensure all required columns exist
-                    required_columns = ['concern', 'skin_type', 'ingredients', 'benefits', 'brands', 'notes']
-                    if all(col in df.columns for col in required_columns):
-                        return df
-                except Exception as csv_error:
-                    print(f"Warning: CSV loading failed, using embedded data: {csv_error}")
-        except Exception as e:
-            print(f"Error during CSV load attempt: {e}")
+            stat = os.stat(self.index_path if self.index_path is not None else self.csv_path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+    
+    def reload_dataset(self):
+        """Rebuild the dataset off to the side, then swap it in and invalidate cached results"""
+        with self._load_lock:
+            self._swap_state(self._build_state())
+    
+    def start_watching(self, interval: float = 5.0):
+        """Poll the CSV (or prebuilt index) in a background thread and hot-reload it when it changes"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                         name='skincare-dataset-watcher', daemon=True)
+        self._watcher.start()
+    
+    def stop_watching(self):
+        """Stop the background CSV watcher"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+    
+    def _watch(self, interval: float):
+        pending = None
+        # A file version that failed to load is not retried until it changes again
+        failed = None
+        while not self._stop_watching.wait(interval):
+            state = self._state
+            fingerprint = self._source_fingerprint()
+            if state is None or fingerprint is None or fingerprint in (state.fingerprint, failed):
+                pending = None
+                continue
+            # Only reload once the file has stopped changing, not halfway through a write
+            if fingerprint != pending:
+                pending = fingerprint
+                continue
+            pending = None
+            try:
+                self.reload_dataset()
+            except Exception as e:
+                failed = fingerprint
+                print(f"Warning: dataset reload failed, keeping the previous data until the file changes: {e}")
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Result cache hits, misses, evictions and current size, plus disk_* and answers_* counters when enabled"""
+        stats = self.result_cache.stats()
+        if self.disk_cache is not None:
+            stats.update((f"disk_{name}", value) for name, value in self.disk_cache.stats().items())
+        state = self._state
+        if state is not None and state.answers is not None:
+            stats.update((f"answers_{name}", value) for name, value in state.answers.stats().items())
+        return stats
+    
+    def _load_dataset(self) -> Tuple['CompactDataset', Optional['pd.DataFrame'], Optional[IngestReport]]:
+        """
+        Load and validate the dataset CSV
         
-        data = {
-            'concern': [
-                'acne', 'oily skin', 'dry skin', 'hyperpigmentation', 'blackheads',
-                'wrinkles', 'dull skin', 'dark spots', 'enlarged pores', 'sensitivity',
-                'redness', 'bumpy skin', 'textured skin', 'rosacea', 'cystic acne',
-                'under-eye circles', 'puffy eyes', 'uneven texture', 'sun damage',
-                'age spots', 'melasma', 'back acne', 'body acne', 'razor bumps',
-                'flaky skin', 'peeling skin', 'makeup irritation', 'damaged skin barrier',
-                'large pores', 'clogged pores', 'stress acne', 'hormonal acne',
-                'whiteheads', 'blotchiness', 'rough patches', 'itchy skin', 'psoriasis',
-                'rosacea', 'seborrheic dermatitis', 'pollution damage', 'tanning damage',
-                'inflamed acne', 'deep acne', 'inflammatory acne', 'breakouts',
-                'combination skin', 'dehydrated skin', 'mature skin', 'oily t-zone'
-            ],
-            'skin_type': [
-                'oily', 'oily', 'dry', 'combination', 'oily',
-                'normal', 'oily', 'combination', 'combination', 'sensitive',
-                'combination', 'dry', 'sensitive', 'normal', 'oily',
-                'sensitive', 'oily', 'normal', 'sensitive',
-                'combination', 'combination', 'oily', 'dry', 'combination',
-                'dry', 'dry', 'oily', 'combination',
-                'combination', 'sensitive', 'normal', 'combination',
-                'combination', 'normal', 'dry', 'combination', 'dry', 'combination',
-                'normal', 'normal', 'normal', 'sensitive',
-                'combination', 'oily', 'oily', 'normal',
-                'combination', 'combination', 'normal', 'combination'
-            ],
-            'ingredients': [
-                'salicylic acid, niacinamide, tea tree oil',
-                'niacinamide, glycerin, clay',
-                'panthenol, hyaluronic acid, glycerin',
-                'niacinamide, vitamin C, azelaic acid',
-                'salicylic acid, tea tree oil, benzoyl peroxide',
-                'retinol, coenzyme Q10, peptides',
-                'vitamin C, AHA, glycolic acid, azelaic acid',
-                'arbutin, AHA, kojic acid, vitamin C',
-                'panthenol, hyaluronic acid, niacinamide',
-                'green tea, allantoin, centella asiatica',
-                'centella asiatica, allantoin, green tea',
-                'ceramides, colloidal oatmeal, squalane',
-                'azelaic acid, benzoyl peroxide, salicylic acid',
-                'calendula, allantoin, azelaic acid',
-                'tea tree oil, benzoyl peroxide, salicylic acid',
-                'coenzyme Q10, retinol, caffeine',
-                'caffeine, centella asiatica, peptides',
-                'AHA, azelaic acid, vitamin C, kojic acid',
-                'AHA, peptides, sunscreen protection',
-                'peptides, retinol, age spots treatment',
-                'vitamin C, azelaic acid, niacinamide',
-                'salicylic acid, benzoyl peroxide, tea tree oil',
-                'salicylic acid, azelaic acid, benzoyl peroxide',
-                'aloe vera, allantoin, azelaic acid',
-                'panthenol, hyaluronic acid, glycerin',
-                'glycerin, panthenol, ceramides',
-                'allantoin, green tea, calendula',
-                'ceramides, lanolin, fatty acids',
-                'hyaluronic acid, niacinamide, peptides',
-                'benzoyl peroxide, salicylic acid, niacinamide',
-                'tea tree oil, salicylic acid, azelaic acid',
-                'niacinamide, hormonal support, salicylic acid',
-                'benzoyl peroxide, niacinamide, salicylic acid',
-                'glycerin, hyaluronic acid, niacinamide',
-                'kojic acid, azelaic acid, rough patch treatment',
-                'ceramides, cholesterol, lanolin',
-                'ceramides, colloidal oatmeal, cholesterol',
-                'centella asiatica, calendula, allantoin',
-                'ceramides, squalane, antioxidants',
-                'arbutin, AHA, kojic acid',
-                'kojic acid, azelaic acid, tranexamic acid',
-                'azelaic acid, benzoyl peroxide, salicylic acid',
-                'tea tree oil, benzoyl peroxide, salicylic acid',
-                'niacinamide, salicylic acid, azelaic acid',
-                'niacinamide, glycerin, hyaluronic acid',
-                'hyaluronic acid, glycerin, ceramides',
-                'retinol, peptides, vitamin C',
-                'niacinamide, glycerin, salicylic acid'
-            ],
-            'benefits': [
-                'Unclogs pores, kills acne-causing bacteria, reduces acne scars, controls oil',
-                'Controls sebum, reduces shine, minimizes pore appearance, prevents congestion',
-                'Deep hydration, restores moisture barrier, reduces flaking, soothes skin',
-                'Inhibits melanin production, fades dark marks, evens skin tone',
-                'Exfoliates, unclogs comedones, antibacterial, prevents future blackheads',
-                'Reduces fine lines, boosts collagen production, improves elasticity',
-                'Brightens dull complexion, removes dead cells, improves radiance, smooths texture',
-                'Fades hyperpigmentation, removes dead skin, promotes cell turnover',
-                'Minimizes appearance, hydrates, improves skin texture, refines surface',
-                'Calms irritation, reduces sensitivity, strengthens barrier',
-                'Reduces inflammation, calms redness, provides antioxidant protection',
-                'Smooths texture, repairs barrier, reduces bumpy appearance',
-                'Improves uneven surface, reduces congestion, smooths rough areas',
-                'Reduces vascular redness, calms inflammation, strengthens barrier',
-                'Clears cystic acne, reduces deep inflammation, prevents future breakouts',
-                'Brightens under-eye area, reduces puffiness, diminishes circles',
-                'Reduces puffiness, depuffs under-eye area, refreshes appearance',
-                'Smooths texture, evens tone, improves overall appearance',
-                'Reverses UV damage, promotes healing, prevents future damage',
-                'Fades age spots, promotes cell renewal, improves skin tone',
-                'Targets stubborn melasma, inhibits melanin, fades patches',
-                'Clears back acne, prevents bacteria buildup, reduces inflammation',
-                'Treats body acne, clears congestion, prevents recurring breakouts',
-                'Heals irritation, smooths bumps, prevents ingrown hairs',
-                'Restores hydration, removes dead skin, reveals smooth texture',
-                'Exfoliates gently, hydrates, reveals fresh skin beneath',
-                'Calms irritation, soothes sensitivity, reduces redness',
-                'Repairs barrier, restores lipids, strengthens skin protection',
-                'Refines pores, hydrates, improves skin smoothness',
-                'Unclogs pores, prevents congestion, clears comedones',
-                'Manages stress-related breakouts, calms inflammation, reduces redness',
-                'Targets hormonal breakouts, regulates sebum, reduces acne',
-                'Clears whiteheads, controls oil, prevents new breakouts',
-                'Evens tone, improves texture, reduces blotchy appearance',
-                'Softens patches, improves texture, calms irritation',
-                'Soothes itching, hydrates, calms irritation',
-                'Treats psoriasis scales, hydrates, reduces inflammation',
-                'Treats rosacea, reduces flushing, calms inflammation',
-                'Treats seborrheic dermatitis, reduces flaking, calms scalp',
-                'Protects against pollution damage, detoxifies, improves clarity',
-                'Reverses tanning damage, brightens tone, restores health',
-                'Reduces inflammation, clears acne, prevents scarring',
-                'Deep treatment for cystic acne, reduces severe breakouts',
-                'Manages inflammatory responses, reduces redness, treats severe acne',
-                'Prevents future breakouts, clears existing, maintains clear skin',
-                'Balances skin type, manages oil and dry zones, harmonizes skin',
-                'Hydrates deeply, restores moisture, plumps skin',
-                'Anti-aging treatment, targets mature skin concerns, reduces wrinkles',
-                'Controls T-zone oil, hydrates cheeks, balances skin'
-            ],
-            'brands': [
-                'The Ordinary, Cosrx, Paula\'s Choice, Minimalist, Neutrogena',
-                'CeraVe, Olay, The Ordinary, Cosrx, Good Molecules',
-                'Aveeno, LANEIGE, Tatcha, SK-II, StriVectin',
-                'Peach & Lily, Neutrogena, Allies of Skin, The Ordinary, LANEIGE',
-                'Olay, First Aid Beauty, Kiehl\'s, Cosrx, The Ordinary',
-                'The Ordinary, Vichy, Sunday Riley, Murad, Estee Lauder',
-                'Vichy, Ren Clean Skincare, Minimalist, The Ordinary, CeraVe',
-                'Krave Beauty, Augustinus Bader, Clarins, The Ordinary, Murad',
-                'Estee Lauder, Dermalogica, Drunk Elephant, Tatcha, The Ordinary',
-                'Avene, Peter Thomas Roth, Good Molecules, Youth to the People, The Ordinary',
-                'Olay, Biossance, Clinique, The Ordinary, Allies of Skin',
-                'Ren Clean Skincare, Cosrx, StriVectin, Olay, CeraVe',
-                'Obagi, Cosrx, Simple, The Ordinary, Paula\'s Choice',
-                'La Roche Posay, CeraVe, Estee Lauder, Krave Beauty, The Ordinary',
-                'La Roche Posay, Ren Clean Skincare, Inkey List, Clinique, Paula\'s Choice',
-                'Vichy, The Ordinary, Shiseido, Olay, First Aid Beauty',
-                'LANEIGE, Olay, Cosrx, The Ordinary, Peach & Lily',
-                'Glow Recipe, Allies of Skin, Peter Thomas Roth, The Ordinary, Murad',
-                'SK-II, Sunday Riley, Peter Thomas Roth, Glow Recipe, Olay',
-                'Biossance, Murad, Dermalogica, Tatcha, Estee Lauder',
-                'Naturium, Sunday Riley, SK-II, The Ordinary, Paula\'s Choice',
-                'Kiehl\'s, La Roche Posay, Ren Clean Skincare, Cosrx, Paula\'s Choice',
-                'Guerlain, Babor, Peter Thomas Roth, The Ordinary, Clinique',
-                'Vichy, Dermalogica, Allies of Skin, Aloe-based brands, The Ordinary',
-                'Inkey List, Naturium, Aveeno, Tatcha, La Roche Posay',
-                'Aveeno, Cetaphil, Drunk Elephant, Farmacy, Simple',
-                'First Aid Beauty, Clinique, Youth to the People, The Ordinary, Allantoin-based brands',
-                'Versed, StriVectin, Sulwhasoo, SK-II, La Roche Posay',
-                'Estee Lauder, Dermalogica, Drunk Elephant, Tatcha, Olay',
-                'Youth to the People, Peter Thomas Roth, Sisley Paris, The Ordinary, Cosrx',
-                'Inkey List, Babor, Cetaphil, The Ordinary, Ren Clean Skincare',
-                'StriVectin, Clinique, Minimalist, The Ordinary, Cosrx',
-                'Peach & Lily, Cosrx, La Mer, The Ordinary, Minimalist',
-                'Tatcha, Sulwhasoo, Peach & Lily, Farmacy, CeraVe',
-                'Sisley Paris, Paula\'s Choice, Youth to the People, The Ordinary, Inkey List',
-                'Avene, Inkey List, Sisley Paris, The Ordinary, Naturium',
-                'Krave Beauty, LANEIGE, Tatcha, La Roche Posay, CeraVe',
-                'La Roche Posay, CeraVe, Estee Lauder, SK-II, The Ordinary',
-                'Krave Beauty, LANEIGE, Tatcha, Versed, StriVectin',
-                'Biossance, Minimalist, Sulwhasoo, The Ordinary, Vichy',
-                'Glow Recipe, Peter Thomas Roth, SK-II, Youth to the People, The Ordinary',
-                'Babor, Glow Recipe, Guerlain, The Ordinary, Paula\'s Choice',
-                'Inkey List, Ren Clean Skincare, Minimalist, Paula\'s Choice, The Ordinary',
-                'Inkey List, Babor, Cetaphil, The Ordinary, Cosrx',
-                'Sunday Riley, Minimalist, The Ordinary, CeraVe, Olay',
-                'Tatcha, LANEIGE, Sulwhasoo, Peach & Lily, SK-II',
-                'Tatcha, Sulwhasoo, Peach & Lily, SK-II, Estee Lauder',
-                'Tatcha, The Ordinary, Murad, Sunday Riley, SK-II',
-                'The Ordinary, LANEIGE, Cosrx, Olay, CeraVe'
-            ],
-            'notes': [
-                'May cause initial purging. Avoid mixing with vitamin C. Use SPF 30+ daily. Start 1-2x per week.',
-                'Suitable for oily skin types. Use SPF 50+ daily. Can cause initial dryness.',
-                'Results take 2-3 weeks. Patch test first. Do not skip moisturizer.',
-                'Use SPF 50+ during day. Results visible after 4-6 weeks. Avoid direct sun.',
-                'Can cause initial dryness. Introduce gradually. Start 2-3x per week.',
-                'Use at night 2-3x per week initially. Increases sun sensitivity. Avoid mixing with actives.',
-                'Start with once weekly. Build up frequency gradually. Use SPF 50+.',
-                'Use with SPF 50+ during day. Avoid direct sun. Results after 4-8 weeks.',
-                'Hydrating formula works best. Use daily after cleansing. Pair with moisturizer.',
-                'For sensitive skin. Do not combine with strong actives. Patch test.',
-                'Calming formula suitable for reactive skin. Use AM and PM. Very gentle.',
-                'Moisture-rich ingredients recommended. Use daily. Results in 2-4 weeks.',
-                'May cause slight dryness. Start slowly. Use 3-4x per week.',
-                'Calming ingredients essential. Avoid hot water. Use gentle products.',
-                'Potent formula. Use every 2-3 nights initially. Build tolerance slowly.',
-                'Apply around eye area. Use night and morning. Results in 4 weeks.',
-                'Apply under eyes. Use morning and night. Refrigerate for extra depuffing.',
-                'Use consistently. Results visible after 4-8 weeks. Pair with sun protection.',
-                'Essential to use SPF 50+ daily. Results after 8 weeks. Build tolerance.',
-                'Use SPF 50+. Results after 6-8 weeks. Use consistently for best results.',
-                'Use SPF 50+ daily. Results after 6-8 weeks. Very important for stubborn melasma.',
-                'Can cause dryness. Start 1-2x per week. Gradually increase frequency.',
-                'Apply to affected areas. Start slowly. May cause initial irritation.',
-                'Use post-hair removal. Prevents ingrown hairs. Very soothing.',
-                'Use daily AM and PM. Results in 1-2 weeks. Keep skin hydrated.',
-                'Use 1-2x per week initially. Can be drying. Follow with rich moisturizer.',
-                'Very gentle formula. Use as needed. Good for sensitive skin types.',
-                'Essential for damaged barrier. Use 2x daily. Avoid strong actives initially.',
-                'Use consistently. Results after 2-4 weeks. Pair with hydrating serum.',
-                'Use 2-3x per week. Can cause dryness. Build tolerance gradually.',
-                'Manage stress levels. Use consistently. Results after 4 weeks.',
-                'Consistency is key. Use 4-8 weeks for results. May regulate after adjustment.',
-                'Use 3-4x per week. Can cause dryness. Follow with rich moisturizer.',
-                'Use consistently. Results after 4-6 weeks. Avoid strong actives simultaneously.',
-                'Use gently. May cause initial dryness. Pair with hydrating serum.',
-                'Use with hydrating products. Can cause slight dryness. Very soothing.',
-                'Use carefully. May require medical supervision. Consult dermatologist.',
-                'Consult dermatologist for proper treatment. Gentle formulas recommended.',
-                'Long-term management. Use consistently. Dermatologist guidance helpful.',
-                'Use antioxidant products. Pair with sun protection. Prevention is key.',
-                'Use SPF 50+. Prevention is important. Reverse damage gradually over time.',
-                'Very potent. Start slowly. Can cause initial irritation. Increase gradually.',
-                'Requires patience. Results after 6-8 weeks. Professional guidance recommended.',
-                'Very effective for severe acne. Start low. Build up concentration.',
-                'Consistency is key. Results after 4-8 weeks. Maintain routine.',
-                'Balance oil and dry zones. Use targeted products. Customize routine.',
-                'Deep hydration essential. Use rich moisturizer. Avoid over-exfoliation.',
-                'Use anti-aging routine. Consistent application important. Results after 8 weeks.',
-                'Target T-zone with oil control. Hydrate cheeks separately. Customize approach.'
-            ]
-        }
+        Returns:
+            (store, frame, report): the frame is only kept for the 'rows'
+            aggregation mode, and the report is None when the rows came from a
+            snapshot of an already validated CSV
+        
+        Raises:
+            DatasetValidationError: the CSV is missing or can't be served
+        """
+        csv_path = self.csv_path
+        keep_frame = self.aggregation == 'rows'
+        if not os.path.exists(csv_path):
+            raise DatasetValidationError(f"Dataset {csv_path} not found")
+        
+        # A binary snapshot of an unchanged CSV skips parsing and validation entirely
+        df = load_snapshot(csv_path) if self.use_snapshot else None
+        if df is not None:
+            from compact_store import CompactDataset
+            return CompactDataset.from_frame(df), df if keep_frame else None, None
         
-        return pd.DataFrame(data)
+        result = ingest_csv(csv_path, snapshot=self.use_snapshot, keep_frame=keep_frame)
+        if result.report.rows_rejected:
+            print(f"Warning: skipped invalid dataset rows\n{result.report.format()}")
+        return result
     
     def _build_keyword_map(self) -> Dict[str, List[str]]:
         """Build a map of keywords to concern categories"""
@@ -320,117 +380,218 @@ class RecommendationEngine:
             'oily t-zone': ['oily t-zone', 't-zone shine', 't-zone congestion']
         }
     
-    def _extract_concerns(self, text: str) -> List[str]:
+    def _extract_concerns(self, text: str, state: Optional[DatasetState] = None) -> List[str]:
         """Extract skin concerns from user input using keyword matching"""
-        text_lower = text.lower()
-        detected_concerns = []
-        
-        for concern, keywords in self.concern_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    if concern not in detected_concerns:
-                        detected_concerns.append(concern)
-                    break
-        
+        detected_concerns = self.concern_matcher.match(text.lower())
+        if self.fuzzy_matcher is not None:
+            corrected = self.fuzzy_matcher.match(text)
+            if corrected:
+                detected_concerns = sorted(set(detected_concerns).union(corrected),
+                                           key=self._concern_priority.__getitem__)
+        if not detected_concerns and state is not None and state.semantic is not None:
+            # No keyword hit: take the most similar concerns by TF-IDF instead
+            detected_concerns = state.semantic.match(text, SEMANTIC_TOP_K, SEMANTIC_MIN_SCORE)
         return detected_concerns if detected_concerns else ['general skin care']
     
-    def get_recommendations(self, user_input: str, skin_type_filter: Optional[str] = None) -> Dict:
+    def get_recommendations(self, user_input: str, skin_type_filter: Optional[str] = None,
+                            include_timings: bool = False) -> Dict:
         """
         Get personalized skincare recommendations
         
         Args:
             user_input: User's description of skin concerns
             skin_type_filter: Optional skin type filter
+            include_timings: Add a 'timings' dict of per-stage seconds to the result
         
         Returns:
             Dictionary with recommendations
         """
+        timer = StageTimer() if include_timings or self.timing_sink is not None else NULL_TIMER
+        
         # Ensure dataset is loaded
-        self._ensure_dataset_loaded()
+        with timer.stage('load'):
+            state = self._ensure_dataset_loaded()
         
         # Extract concerns
-        concerns = self._extract_concerns(user_input)
+        with timer.stage('extract'):
+            concerns = self._extract_concerns(user_input, state)
         
-        # Filter dataset based on detected concerns and skin type
-        filtered_df = self.df[self.df['concern'].isin(concerns)]
+        recommendations = self._recommend(state, concerns, skin_type_filter, timer)
         
-        if skin_type_filter:
-            filtered_df = filtered_df[filtered_df['skin_type'] == skin_type_filter.lower()]
+        if timer.enabled:
+            timings = timer.as_dict()
+            if self.timing_sink is not None:
+                self.timing_sink.emit(timings)
+            if include_timings:
+                recommendations['timings'] = timings
         
-        if filtered_df.empty:
-            # Return default recommendations if no matches
-            filtered_df = self.df[self.df['concern'] == 'general skin care']
-            if filtered_df.empty:
-                filtered_df = self.df.head(1)
+        return recommendations
+    
+    def get_recommendations_batch(self, inputs: Iterable[str],
+                                  skin_types: Union[None, str, Iterable[Optional[str]]] = None) -> Iterator[Dict]:
+        """
+        Get recommendations for many descriptions, computing each distinct
+        (concern set, skin type) group only once
         
-        # Aggregate recommendations
-        all_ingredients = set()
-        all_brands = set()
-        all_benefits = []
-        all_notes = []
+        Args:
+            inputs: Iterable (or generator) of user descriptions
+            skin_types: One skin type filter for every input, or an iterable
+                of filters aligned with inputs
         
-        for _, row in filtered_df.iterrows():
-            ingredients = [ing.strip() for ing in str(row['ingredients']).split(',')]
-            all_ingredients.update(ingredients)
+        Returns:
+            Iterator yielding one recommendation dict per input, in input order;
+            inputs are consumed lazily so large replays can be streamed
+        """
+        # Each input is reported to the timing sink like a single request; the
+        # first one carries the load stage, and inputs answered by an earlier
+        # group only the extraction
+        timer = StageTimer() if self.timing_sink is not None else NULL_TIMER
+        
+        # The whole batch is answered from one dataset state, even across a reload
+        with timer.stage('load'):
+            state = self._ensure_dataset_loaded()
+        
+        if skin_types is None or isinstance(skin_types, str):
+            pairs = zip(inputs, itertools.repeat(skin_types))
+        else:
+            pairs = itertools.zip_longest(inputs, skin_types, fillvalue=_MISSING)
+        
+        groups: Dict[Tuple[Tuple[str, ...], Optional[str]], Dict] = {}
+        for user_input, skin_type_filter in pairs:
+            if user_input is _MISSING or skin_type_filter is _MISSING:
+                raise ValueError("inputs and skin_types must have the same length")
             
-            brands = [brand.strip() for brand in str(row['brands']).split(',')]
-            all_brands.update(brands)
+            with timer.stage('extract'):
+                concerns = self._extract_concerns(user_input, state)
+            key = (tuple(concerns), skin_type_filter.lower() if skin_type_filter else None)
+            result = groups.get(key)
+            if result is None:
+                result = groups[key] = self._recommend(state, concerns, skin_type_filter, timer)
             
-            all_benefits.append(row['benefits'])
-            all_notes.append(row['notes'])
+            if timer.enabled:
+                self.timing_sink.emit(timer.as_dict())
+                timer = StageTimer()
+            
+            # Fan out a copy so callers can't mutate a result shared by the group
+            yield dict(result, concerns=list(concerns), ingredients=list(result['ingredients']))
+    
+    def _recommend(self, state: DatasetState, concerns: List[str], skin_type_filter: Optional[str] = None,
+                   timer=NULL_TIMER) -> Dict:
+        """Build the recommendation dict for already extracted concerns, via the result cache"""
+        # Results depend only on the concern set, so many phrasings share one entry;
+        # the generation keeps a result computed during a reload from outliving it
+        key = (state.generation, tuple(sorted(concerns)), skin_type_filter.lower() if skin_type_filter else None)
+        recommendations = self.result_cache.get(key)
+        if recommendations is None:
+            recommendations = self._lookup_precomputed(state, key[1], key[2], timer)
+            if recommendations is None:
+                recommendations = self._compute_recommendations(state, concerns, skin_type_filter, timer)
+                if self.disk_cache is not None:
+                    self.disk_cache.put(state.version, cache_key(key[1], key[2]), recommendations)
+            self.result_cache.put(key, recommendations)
         
-        # Format recommendations
-        recommendations = {
-            'concerns': concerns,
-            'ingredients': sorted(list(all_ingredients)),
-            'benefits': ' '.join(set(all_benefits)),
-            'brands': ', '.join(sorted(list(all_brands))[:8]),  # Top 8 brands
-            'directions': self._generate_directions(list(all_ingredients)),
-            'notes': ' | '.join(set(all_notes)),
-            'morning_routine': self._generate_morning_routine(list(all_ingredients)),
-            'night_routine': self._generate_night_routine(list(all_ingredients))
-        }
+        # Hand out a copy so callers can't mutate the cached entry
+        return dict(recommendations, concerns=list(concerns), ingredients=list(recommendations['ingredients']))
+    
+    def _lookup_precomputed(self, state: DatasetState, concerns: Tuple[str, ...], skin_type: Optional[str],
+                            timer=NULL_TIMER) -> Optional[Dict]:
+        """A result from the answer table or the disk cache, for sorted concerns and a lower-cased skin type"""
+        if state.answers is not None:
+            recommendations = state.answers.get(concerns, skin_type)
+            if recommendations is not None:
+                return recommendations
+        if self.disk_cache is not None:
+            # Shared tier: another process or an earlier run may have computed it already
+            with timer.stage('disk_cache'):
+                return self.disk_cache.get(state.version, cache_key(concerns, skin_type))
+        return None
+    
+    def _compute_recommendations(self, state: DatasetState, concerns: List[str],
+                                 skin_type_filter: Optional[str] = None, timer=NULL_TIMER) -> Dict:
+        """Build the recommendation dict for already extracted concerns"""
+        # Select the matching rows for the detected concerns and skin type
+        with timer.stage('filter'):
+            selection = self._select(state, concerns, skin_type_filter)
+        
+        # Merge ingredients, brands, benefits and notes for the matched rows, with scores
+        # weighted by row frequency and concern priority
+        weights = concern_weights(concerns, self._concern_priority)
+        with timer.stage('aggregate'):
+            aggregate = self._merge(state, selection, weights)
+        all_benefits = aggregate.benefits
+        all_notes = aggregate.notes
+        
+        # Keep only the most relevant ingredients and brands
+        with timer.stage('rank'):
+            top_ingredients = top_k(aggregate.ingredient_scores, self.top_k_ingredients)
+            top_brands = top_k(aggregate.brand_scores, self.top_k_brands)
+        
+        # Format recommendations, resolving interned ids to display names
+        with timer.stage('render'):
+            ingredient_names = state.ingredient_names
+            brand_names = state.brand_names
+            matched_ingredients = [ingredient_names[entry_id] for entry_id in aggregate.ingredient_scores]
+            # Routines and conflicts reflect every matched ingredient, not just the top k shown
+            routine_mask = self.routines.mask(matched_ingredients)
+            conflicts = self.compatibility.conflicts(matched_ingredients)
+            recommendations = {
+                'concerns': concerns,
+                'ingredients': [ingredient_names[entry_id] for entry_id in top_ingredients],
+                'benefits': ' '.join(dict.fromkeys(all_benefits)),
+                'brands': ', '.join(brand_names[entry_id] for entry_id in top_brands),
+                'directions': DIRECTIONS,
+                'notes': ' | '.join(dict.fromkeys(all_notes)),
+                'morning_routine': self.routines.morning_routine(routine_mask),
+                'night_routine': self.routines.night_routine(routine_mask),
+                'conflicts': conflicts
+            }
         
         return recommendations
     
-    def _generate_directions(self, ingredients: List[str]) -> str:
-        """Generate usage directions based on ingredients"""
-        directions = "• **Frequency**: Use as directed on product packaging\n"
-        directions += "• **Application**: Apply to cleansed, dry skin\n"
-        directions += "• **Layering**: Wait 1-2 minutes between product applications\n"
-        directions += "• **SPF**: Always use SPF 30+ during the day\n"
-        directions += "• **Patch Test**: Test on small area for 24-48 hours first"
-        return directions
+    def _select(self, state: DatasetState, concerns: List[str], skin_type_filter: Optional[str]):
+        """Pick the matched rows/entries using the configured aggregation mode"""
+        if self.aggregation == 'index':
+            return state.index.select(concerns, skin_type_filter)
+        if self.aggregation == 'columnar':
+            return state.columns.select(concerns, skin_type_filter)
+        return self._select_rows(state.df, concerns, skin_type_filter)
     
-    def _generate_morning_routine(self, ingredients: List[str]) -> str:
-        """Generate morning routine based on ingredients"""
-        routine = "1. **Cleanser**: Gentle cleanser suitable for your skin type\n"
-        routine += "2. **Toner** (Optional): Hydrating or exfoliating toner\n"
+    def _merge(self, state: DatasetState, selection, weights: Dict[str, int]) -> Aggregate:
+        """Aggregate a selection from _select, scoring each row by its concern's weight"""
+        if self.aggregation == 'index':
+            return state.index.merge(selection, weights)
+        if self.aggregation == 'columnar':
+            return state.columns.merge(selection, weights)
+        return self._merge_rows(state.store, selection, weights)
+    
+    def _select_rows(self, df: 'pd.DataFrame', concerns: List[str], skin_type_filter: Optional[str]) -> 'pd.DataFrame':
+        """Original DataFrame filter"""
+        filtered_df = df[df['concern'].isin(concerns)]
         
-        if any(ing in str(ingredients) for ing in ['vitamin c', 'azelaic acid']):
-            routine += "3. **Serum**: Vitamin C or brightening serum (2-3 drops)\n"
-        else:
-            routine += "3. **Serum**: Lightweight serum (2-3 drops)\n"
+        if skin_type_filter:
+            filtered_df = filtered_df[filtered_df['skin_type'] == skin_type_filter.lower()]
         
-        routine += "4. **Moisturizer**: Suitable for your skin type\n"
-        routine += "5. **SPF**: Broad-spectrum SPF 30+ sunscreen"
-        return routine
+        if filtered_df.empty:
+            # Return default recommendations if no matches
+            filtered_df = df[df['concern'] == GENERAL_CONCERN]
+            if filtered_df.empty:
+                filtered_df = df.head(1)
+        return filtered_df
     
-    def _generate_night_routine(self, ingredients: List[str]) -> str:
-        """Generate night routine based on ingredients"""
-        routine = "1. **Cleanser**: Gentle cleanser to remove impurities\n"
-        
-        if any(ing in str(ingredients) for ing in ['salicylic acid', 'benzoyl peroxide']):
-            routine += "2. **Exfoliant**: Salicylic acid or BHA (2-3x per week)\n"
-        else:
-            routine += "2. **Toner** (Optional): Hydrating or treatment toner\n"
+    def _merge_rows(self, store: 'CompactDataset', filtered_df: 'pd.DataFrame', weights: Dict[str, int]) -> Aggregate:
+        """Original iterrows aggregation, interning names through the store's tables"""
+        ingredient_scores: Dict[int, int] = {}
+        brand_scores: Dict[int, int] = {}
+        all_benefits = []
+        all_notes = []
         
-        if any(ing in str(ingredients) for ing in ['retinol']):
-            routine += "3. **Retinoid**: Start with 1-2x per week, build up gradually\n"
-        elif any(ing in str(ingredients) for ing in ['AHA']):
-            routine += "3. **AHA**: 2-3x per week for exfoliation\n"
-        else:
-            routine += "3. **Treatment**: Target serum or treatment (as needed)\n"
+        for _, row in filtered_df.iterrows():
+            weight = weights.get(row['concern'], 1)
+            for ingredient in set(map(store.ingredients.lookup, split_list(row['ingredients']))):
+                ingredient_scores[ingredient] = ingredient_scores.get(ingredient, 0) + weight
+            for brand in set(map(store.brands.lookup, split_list(row['brands']))):
+                brand_scores[brand] = brand_scores.get(brand, 0) + weight
+            all_benefits.append(row['benefits'])
+            all_notes.append(row['notes'])
         
-        routine += "4. **Moisturizer**: Richer formula for overnight hydration"
-        return routine
+        return Aggregate(ingredient_scores, brand_scores, all_benefits, all_notes)
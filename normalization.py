@@ -0,0 +1,79 @@
+"""
+Canonical ingredient and brand names, interned into integer ids at dataset load
+"""
+
+import sys
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from ingredients_db import BRAND_ALIASES, BRAND_INFO, INGREDIENT_ALIASES, INGREDIENT_GLOSSARY, PRODUCT_IMAGES
+
+
+def canonical_key(name: str) -> str:
+    """Case- and whitespace-insensitive form of a name"""
+    return ' '.join(name.split()).casefold()
+
+
+class NameTable:
+    """Resolves raw spellings to canonical names and interns them as ids
+
+    Known names (and their aliases) display as written in the reference
+    tables; any other name displays as first spelled in the data. Once
+    frozen, ids are renumbered in alphabetical order of the canonical key, so
+    ordering by id is ordering by name.
+    """
+
+    def __init__(self, known: Iterable[str] = (), aliases: Mapping[str, str] = None):
+        self.display: Dict[str, str] = {}  # canonical key -> display name
+        for name in known:
+            self.display.setdefault(canonical_key(name), name)
+        for alias, name in (aliases or {}).items():
+            self.display[canonical_key(alias)] = self.display.setdefault(canonical_key(name), name)
+        self.ids: Dict[str, int] = {}  # key of the display name -> id
+        self.names: List[str] = []
+        # Raw spelling -> id, so every repeated spelling costs one dict lookup
+        self._ids_by_raw: Dict[str, int] = {}
+
+    def intern(self, raw: str) -> int:
+        entry_id = self._ids_by_raw.get(raw)
+        if entry_id is None:
+            key = canonical_key(raw)
+            display = self.display.setdefault(key, raw.strip())
+            display_key = canonical_key(display)
+            entry_id = self.ids.get(display_key)
+            if entry_id is None:
+                entry_id = self.ids[display_key] = len(self.names)
+                self.names.append(sys.intern(display))
+            self._ids_by_raw[raw] = entry_id
+        return entry_id
+
+    def freeze(self) -> List[int]:
+        """Renumber ids alphabetically; returns old id -> new id"""
+        order = sorted(range(len(self.names)), key=lambda entry_id: (canonical_key(self.names[entry_id]), self.names[entry_id]))
+        remap = [0] * len(order)
+        for new_id, old_id in enumerate(order):
+            remap[old_id] = new_id
+        self.names = [self.names[old_id] for old_id in order]
+        self.ids = {key: remap[entry_id] for key, entry_id in self.ids.items()}
+        self._ids_by_raw = {raw: remap[entry_id] for raw, entry_id in self._ids_by_raw.items()}
+        return remap
+
+    def lookup(self, raw: str) -> int:
+        """Id of an already interned spelling (or alias), -1 if unknown"""
+        entry_id = self._ids_by_raw.get(raw)
+        if entry_id is None:
+            display = self.display.get(canonical_key(raw))
+            entry_id = self.ids.get(canonical_key(display), -1) if display is not None else -1
+        return entry_id
+
+
+def ingredient_names() -> NameTable:
+    return NameTable(INGREDIENT_GLOSSARY, INGREDIENT_ALIASES)
+
+
+def brand_names() -> NameTable:
+    return NameTable(list(BRAND_INFO) + list(PRODUCT_IMAGES), BRAND_ALIASES)
+
+
+def intern_row(table: NameTable, tokens: Iterable[str]) -> Tuple[int, ...]:
+    """Distinct ids of one row's tokens, in first-seen order"""
+    return tuple(dict.fromkeys(table.intern(token) for token in tokens))
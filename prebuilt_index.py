@@ -0,0 +1,150 @@
+"""
+Prebuilt recommendation index that loads with the standard library alone
+
+The (concern, skin type) index, the interned ingredient and brand names and
+the per-concern benefits texts (for the semantic fallback) are written to one
+JSON file. RecommendationEngine(index_path=...) serves from it without
+importing pandas or NumPy or parsing the CSV, which suits CLI tools and
+short-lived workers. Benefits and notes texts are stored once in a shared
+table and referenced by position.
+
+Build one from a dataset CSV:
+    python -m prebuilt_index skincare_dataset.csv --output skincare.index.json
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Mapping, NamedTuple, Sequence, Tuple
+
+from dataset_snapshot import file_sha256
+from ingestion import DatasetValidationError, IngestReport, ingest_csv
+from recommendation_index import IndexEntry, RecommendationIndex
+
+PREBUILT_VERSION = 1
+
+
+class PrebuiltIndex(NamedTuple):
+    index: RecommendationIndex
+    ingredient_names: Tuple[str, ...]  # Display names by interned id
+    brand_names: Tuple[str, ...]
+    concern_benefits: Dict[str, List[str]]  # concern -> distinct benefits texts
+    source_sha256: str  # Content hash of the CSV it was built from
+
+
+class _TextTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def __call__(self, text: str) -> int:
+        return self.ids.setdefault(text, len(self.ids))
+
+
+def _flatten(pairs) -> List:
+    return [value for pair in pairs for value in pair]
+
+
+def _entry_payload(entry: IndexEntry, text_id: _TextTable) -> List[List]:
+    # Flat [id, count, id, count, ...] lists, in the entry's own order so ties rank the same
+    return [_flatten(entry.ingredient_counts.items()), _flatten(entry.brand_counts.items()),
+            _flatten((position, text_id(text)) for position, text in entry.benefits),
+            _flatten((position, text_id(text)) for position, text in entry.notes)]
+
+
+def to_payload(index: RecommendationIndex, ingredient_names: Sequence[str], brand_names: Sequence[str],
+               concern_benefits: Mapping[str, Sequence[str]], source_sha256: str) -> Dict:
+    """JSON-serializable form of an index and the names it refers to"""
+    text_id = _TextTable()
+    entries = [[concern, skin_type] + _entry_payload(entry, text_id)
+               for (concern, skin_type), entry in index.entries.items()]
+    first_row = _entry_payload(index.first_row, text_id)
+    benefits = [[concern, [text_id(text) for text in texts]] for concern, texts in concern_benefits.items()]
+    return {
+        'version': PREBUILT_VERSION,
+        'source_sha256': source_sha256,
+        'ingredients': list(ingredient_names),
+        'brands': list(brand_names),
+        'texts': list(text_id.ids),
+        'entries': entries,
+        'first_row': first_row,
+        'concern_benefits': benefits,
+    }
+
+
+def _entry(ingredients: List[int], brands: List[int], benefits: List[int], notes: List[int],
+           texts: List[str]) -> IndexEntry:
+    return IndexEntry(
+        dict(zip(ingredients[::2], ingredients[1::2])),
+        dict(zip(brands[::2], brands[1::2])),
+        tuple(zip(benefits[::2], (texts[text] for text in benefits[1::2]))),
+        tuple(zip(notes[::2], (texts[text] for text in notes[1::2]))),
+    )
+
+
+def from_payload(payload: Dict) -> PrebuiltIndex:
+    """Inverse of to_payload"""
+    if payload.get('version') != PREBUILT_VERSION:
+        raise ValueError(f"unsupported version {payload.get('version')!r}, expected {PREBUILT_VERSION}; rebuild it")
+    texts = payload['texts']
+    entries = {(concern, skin_type): _entry(*lists, texts)
+               for concern, skin_type, *lists in payload['entries']}
+    index = RecommendationIndex(entries, _entry(*payload['first_row'], texts))
+    benefits = {concern: [texts[text] for text in text_ids] for concern, text_ids in payload['concern_benefits']}
+    return PrebuiltIndex(index, tuple(payload['ingredients']), tuple(payload['brands']), benefits,
+                         payload['source_sha256'])
+
+
+def load_prebuilt(path: str) -> PrebuiltIndex:
+    """
+    Read a prebuilt index file
+
+    Raises:
+        DatasetValidationError: the file is missing, unreadable or from another version
+    """
+    try:
+        with open(path, encoding='utf-8') as handle:
+            return from_payload(json.load(handle))
+    except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+        raise DatasetValidationError(f"Cannot load prebuilt index {path}: {e}") from e
+
+
+def build_prebuilt(csv_path: str, output_path: str) -> IngestReport:
+    """
+    Validate csv_path and write its prebuilt index to output_path
+
+    Returns:
+        The ingestion report of the CSV
+
+    Raises:
+        DatasetValidationError: the CSV can't be served
+    """
+    from semantic_matcher import concern_benefits
+
+    result = ingest_csv(csv_path, snapshot=False)
+    store = result.store
+    payload = to_payload(RecommendationIndex.from_store(store), store.ingredients.values, store.brands.values,
+                         concern_benefits(store), file_sha256(csv_path))
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        json.dump(payload, handle, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, output_path)
+    return result.report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a prebuilt recommendation index from a dataset CSV")
+    parser.add_argument('csv_path')
+    parser.add_argument('--output', default='skincare.index.json')
+    args = parser.parse_args()
+    try:
+        report = build_prebuilt(args.csv_path, args.output)
+    except DatasetValidationError as e:
+        print(e, file=sys.stderr)
+        raise SystemExit(1)
+    print(report.format())
+    print(f"Wrote {args.output} ({os.path.getsize(args.output):,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Relevance ranking of aggregated ingredients and brands
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Mapping, Optional
+
+
+def concern_weights(concerns: Iterable[str], priority: Mapping[str, int]) -> Dict[str, int]:
+    """Integer weight per concern: the highest-priority concern counts n, the lowest 1
+
+    priority maps concern -> rank (lower is more important); concerns without
+    a rank come last, alphabetically. Weights depend only on the concern set,
+    so cached results stay valid for any phrasing, and integer scores make
+    every aggregation mode rank identically.
+    """
+    ordered = sorted(set(concerns), key=lambda concern: (priority.get(concern, len(priority)), concern))
+    return {concern: len(ordered) - position for position, concern in enumerate(ordered)}
+
+
+def top_k(scores: Mapping[int, int], k: Optional[int]) -> List[int]:
+    """Highest-scoring ids, best first; ties go to the lower id
+
+    Interned ids are numbered in alphabetical order of their names, so ties
+    go to the alphabetically earlier name.
+
+    Finds the k-th best score with a bounded heap over the bare scores, then
+    orders only the ids at or above it, so the full union is never sorted.
+    k=None ranks everything.
+    """
+    if k is None or k >= len(scores):
+        return sorted(scores, key=lambda entry_id: (-scores[entry_id], entry_id))
+    if k <= 0:
+        return []
+
+    threshold = heapq.nlargest(k, scores.values())[-1]
+    above = sorted((entry_id for entry_id, score in scores.items() if score > threshold),
+                   key=lambda entry_id: (-scores[entry_id], entry_id))
+    tied = [entry_id for entry_id, score in scores.items() if score == threshold]
+    return above + heapq.nsmallest(k - len(above), tied)
@@ -0,0 +1,144 @@
+"""
+Load-time index of the skincare dataset keyed by (concern, skin type)
+"""
+
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+GENERAL_CONCERN = 'general skin care'
+
+
+def split_list(value) -> List[str]:
+    """Tokenize a comma-separated dataset cell the way the engine always has"""
+    return [item.strip() for item in str(value).split(',')]
+
+
+class IndexEntry(NamedTuple):
+    """Pre-tokenized recommendations for one (concern, skin type) key"""
+    # interned id -> number of rows under this key that list it
+    ingredient_counts: Dict[int, int]
+    brand_counts: Dict[int, int]
+    # (first row position, text) in dataset order, so merged output keeps row order
+    benefits: Tuple[Tuple[int, str], ...]
+    notes: Tuple[Tuple[int, str], ...]
+
+
+class Aggregate(NamedTuple):
+    """Recommendations merged across every key a request touches"""
+    # interned id -> relevance score (row frequency weighted by concern
+    # priority); the keys are every matched ingredient / brand, whose display
+    # names are resolved at render time (CSRColumn.values, or a prebuilt index)
+    ingredient_scores: Dict[int, int]
+    brand_scores: Dict[int, int]
+    benefits: List[str]
+    notes: List[str]
+
+
+def _merge_scores(weighted: Iterable[Tuple[int, Dict[int, int]]]) -> Dict[int, int]:
+    """Sum weight * count over (weight, counts) pairs"""
+    scores: Dict[int, int] = {}
+    for weight, counts in weighted:
+        for entry_id, count in counts.items():
+            scores[entry_id] = scores.get(entry_id, 0) + weight * count
+    return scores
+
+
+def _merge_ordered(groups: Iterable[Tuple[Tuple[int, str], ...]]) -> List[str]:
+    """Union (position, text) groups, keeping each text at its first row position"""
+    first_seen: Dict[str, int] = {}
+    for group in groups:
+        for position, text in group:
+            if text not in first_seen or position < first_seen[text]:
+                first_seen[text] = position
+    return sorted(first_seen, key=first_seen.__getitem__)
+
+
+class _EntryBuilder:
+    """Mutable accumulator used while the index is being built"""
+
+    def __init__(self):
+        self.ingredients: Dict[int, int] = {}
+        self.brands: Dict[int, int] = {}
+        self.benefits: Dict[str, int] = {}
+        self.notes: Dict[str, int] = {}
+
+    def add(self, position: int, ingredients: List[int], brands: List[int], benefit: str, note: str):
+        for entry_id in ingredients:
+            self.ingredients[entry_id] = self.ingredients.get(entry_id, 0) + 1
+        for entry_id in brands:
+            self.brands[entry_id] = self.brands.get(entry_id, 0) + 1
+        self.benefits.setdefault(benefit, position)
+        self.notes.setdefault(note, position)
+
+    def build(self) -> IndexEntry:
+        return IndexEntry(
+            self.ingredients,
+            self.brands,
+            tuple((position, text) for text, position in self.benefits.items()),
+            tuple((position, text) for text, position in self.notes.items()),
+        )
+
+
+class RecommendationIndex:
+    """Dict-of-entries view of the dataset so requests never touch pandas
+
+    Entries exist for every (concern, skin_type) pair in the data and for
+    (concern, None), which covers all skin types for requests without a
+    skin-type filter.
+    """
+
+    def __init__(self, entries: Dict[Tuple[str, Optional[str]], IndexEntry], first_row: IndexEntry):
+        self.entries = entries
+        self.first_row = first_row
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, List[int], str, List[int], str]]) -> 'RecommendationIndex':
+        """Build from (concern, skin_type, ingredient ids, benefit, brand ids, note) rows"""
+        builders: Dict[Tuple[str, Optional[str]], _EntryBuilder] = {}
+        first_row = None
+        for position, (concern, skin_type, ingredient_list, benefit, brand_list, note) in enumerate(rows):
+            for key in ((concern, skin_type), (concern, None)):
+                builder = builders.get(key)
+                if builder is None:
+                    builder = builders[key] = _EntryBuilder()
+                builder.add(position, ingredient_list, brand_list, benefit, note)
+            if first_row is None:
+                first_row = _EntryBuilder()
+                first_row.add(position, ingredient_list, brand_list, benefit, note)
+
+        if first_row is None:
+            raise ValueError("Cannot build a recommendation index from an empty dataset")
+        return cls({key: builder.build() for key, builder in builders.items()}, first_row.build())
+
+    @classmethod
+    def from_store(cls, store) -> 'RecommendationIndex':
+        """Build from a CompactDataset, whose token lists are already interned"""
+        return cls.from_rows(store.iter_rows())
+
+    def select(self, concerns: List[str], skin_type_filter: Optional[str] = None) -> List[Tuple[Optional[str], IndexEntry]]:
+        """(concern, entry) pairs for the request, with the engine's fallback rules"""
+        skin_type = skin_type_filter.lower() if skin_type_filter else None
+        selection = [(concern, self.entries[(concern, skin_type)]) for concern in concerns
+                     if (concern, skin_type) in self.entries]
+
+        if not selection:
+            # Same fallback as the DataFrame path: general rows, else the first row
+            general = self.entries.get((GENERAL_CONCERN, None))
+            selection = [(None, general if general is not None else self.first_row)]
+        return selection
+
+    @staticmethod
+    def merge(selection: List[Tuple[Optional[str], IndexEntry]], weights: Mapping[str, int]) -> Aggregate:
+        """Union selected entries into one Aggregate; unweighted (fallback) entries count 1"""
+        if len(selection) == 1:
+            # Scaling a single entry's counts doesn't change the ranking
+            entry = selection[0][1]
+            return Aggregate(entry.ingredient_counts, entry.brand_counts,
+                             [text for _, text in entry.benefits], [text for _, text in entry.notes])
+
+        entries = [entry for _, entry in selection]
+        return Aggregate(
+            _merge_scores((weights.get(concern, 1), entry.ingredient_counts) for concern, entry in selection),
+            _merge_scores((weights.get(concern, 1), entry.brand_counts) for concern, entry in selection),
+            _merge_ordered(entry.benefits for entry in entries),
+            _merge_ordered(entry.notes for entry in entries),
+        )
@@ -0,0 +1,38 @@
+"""
+HTML/markdown fragments of the results page
+
+Streamlit reruns app.py on every widget interaction. app.py builds the
+fragments once, when a result arrives, and keeps them in session state next
+to the result, so reruns only hand finished strings to Streamlit.
+"""
+
+from typing import Dict, NamedTuple
+
+
+class ResultFragments(NamedTuple):
+    """Ready-to-display pieces of one recommendation result"""
+    concerns: str
+    ingredients: str
+    benefits: str
+    directions: str
+    brands: str
+    morning_routine: str
+    night_routine: str
+    conflicts: str  # Markdown list, '' when there are none
+    notes: str  # '' when there are none
+
+
+def build_fragments(results: Dict) -> ResultFragments:
+    """Build the page fragments for one recommendation result"""
+    return ResultFragments(
+        concerns=", ".join(concern.title() for concern in results['concerns']),
+        ingredients=''.join(f'<span class="ingredient-tag">{ing}</span>' for ing in results['ingredients']),
+        benefits=f'<div class="card-container">{results["benefits"]}</div>',
+        directions=f'<div class="card-container">{results["directions"]}</div>',
+        brands=''.join(f'<span class="brand-badge">{brand.strip()}</span>'
+                       for brand in results['brands'].split(", ")),
+        morning_routine=f'<div class="morning-routine"><h4>🌅 Morning</h4>{results.get("morning_routine", "")}</div>',
+        night_routine=f'<div class="night-routine"><h4>🌙 Night</h4>{results.get("night_routine", "")}</div>',
+        conflicts='\n'.join(f"- {conflict.advice}: {conflict.reason}" for conflict in results.get('conflicts', ())),
+        notes=f'<div class="safety-note">{results["notes"]}</div>' if results.get('notes') else '',
+    )
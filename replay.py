@@ -0,0 +1,165 @@
+"""
+Parallel batch replay of logged descriptions through RecommendationEngine
+
+The input (JSONL or CSV) is read lazily and cut into chunks that a
+ProcessPoolExecutor works through. The engine is loaded once in the parent
+before the pool starts: forked workers share that loaded dataset, index and
+keyword matchers copy-on-write, and spawned workers (where fork isn't
+available) attach to the memory-mapped dataset snapshot instead of parsing
+the CSV. Results stream back out as JSONL in input order, with only a
+bounded number of chunks in flight.
+
+Input records:
+    JSONL  {"text": "...", "skin_type": "Oily" | null}, or a bare JSON string
+    CSV    a header with a 'text' column and an optional 'skin_type' column
+
+Usage:
+    python replay.py logged.jsonl --output results.jsonl --workers 8
+"""
+
+import argparse
+import csv
+import gc
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from model import RecommendationEngine
+
+CHUNK_SIZE = 500  # Records per task: large enough to amortize pickling, small enough to balance
+IN_FLIGHT_PER_WORKER = 4  # Chunks queued per worker; bounds memory held by out-of-order results
+
+# (text, skin type), or an error message for a record that couldn't be parsed
+Item = Union[Tuple[str, Optional[str]], str]
+
+_engine: Optional[RecommendationEngine] = None
+
+
+def _parse_record(record) -> Item:
+    if isinstance(record, str):
+        record = {'text': record}
+    if not isinstance(record, dict) or not isinstance(record.get('text'), str):
+        return "each record needs a 'text' string"
+    skin_type = record.get('skin_type') or None
+    if skin_type is not None and not isinstance(skin_type, str):
+        return "'skin_type' must be a string or null"
+    if skin_type and skin_type.lower() == 'any':
+        skin_type = None
+    return record['text'], skin_type
+
+
+def read_items(path: str) -> Iterator[Item]:
+    """Lazily parse a .csv or JSONL input file, one item per record"""
+    with open(path, newline='' if path.endswith('.csv') else None, encoding='utf-8') as handle:
+        if path.endswith('.csv'):
+            for row in csv.DictReader(handle):
+                yield _parse_record(row)
+            return
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            try:
+                yield _parse_record(json.loads(line))
+            except ValueError:
+                yield f"line {line_number} is not valid JSON"
+
+
+def _init_worker(csv_path: str):
+    """Spawned workers build their engine from the snapshot; forked ones inherited it"""
+    global _engine
+    if _engine is None:
+        _engine = RecommendationEngine(csv_path=csv_path)
+        _engine._ensure_dataset_loaded()
+
+
+def replay_chunk(items: List[Item]) -> List[str]:
+    """JSON lines for one chunk; serialized here so the parent only writes them out"""
+    valid = [item for item in items if not isinstance(item, str)]
+    results = _engine.get_recommendations_batch((text for text, _ in valid), [skin for _, skin in valid])
+    return [json.dumps({'error': item}) if isinstance(item, str) else json.dumps(next(results))
+            for item in items]
+
+
+def _chunks(items: Iterable[Item], size: int) -> Iterator[List[Item]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def replay(items: Iterable[Item], workers: int, csv_path: str = 'skincare_dataset.csv',
+           chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield one JSON line per item, in input order
+
+    Args:
+        items: (text, skin type) pairs, or error strings passed through as errors
+        workers: Worker processes; 0 replays in this process
+        csv_path: Dataset CSV
+        chunk_size: Items per task
+    """
+    global _engine
+    # Load (and validate, and snapshot) the dataset exactly once, before any worker exists
+    _engine = RecommendationEngine(csv_path=csv_path)
+    _engine._ensure_dataset_loaded()
+    chunks = _chunks(items, chunk_size)
+    if workers <= 0:
+        for chunk in chunks:
+            yield from replay_chunk(chunk)
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    # Keep the engine's objects out of the collector's reach so forked
+    # workers don't dirty (and copy) the shared pages just by scanning them
+    gc.freeze()
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(csv_path,)) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(replay_chunk, chunk))
+                if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    finally:
+        gc.unfreeze()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged descriptions through the recommendation engine")
+    parser.add_argument('input', help="JSONL or .csv file of records")
+    parser.add_argument('--output', help="JSONL results path (default stdout)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes (0 replays in this process)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--csv', default='skincare_dataset.csv', help="dataset CSV")
+    args = parser.parse_args()
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    rows = 0
+    start = time.perf_counter()
+    try:
+        for line in replay(read_items(args.input), args.workers, args.csv, args.chunk_size):
+            output.write(line)
+            output.write('\n')
+            rows += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+    print(f"{rows:,} rows in {elapsed:.1f}s: {rows / elapsed if elapsed else 0:,.0f} rows/s "
+          f"with {args.workers} worker(s)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
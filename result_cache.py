@@ -0,0 +1,62 @@
+"""
+Bounded LRU cache for computed recommendations
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss/eviction counters"""
+
+    def __init__(self, maxsize: int):
+        if maxsize < 0:
+            raise ValueError("maxsize must be >= 0")
+        self.maxsize = maxsize
+        self._data: 'OrderedDict[Hashable, object]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """Return the cached value (marking it recently used) or None"""
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: object):
+        """Insert or refresh a value, evicting the least recently used entry if full"""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry; counters are kept so scrapes stay monotonic"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Snapshot of the counters for metrics scraping"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
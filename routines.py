@@ -0,0 +1,120 @@
+"""
+Routine templates compiled once from a rule table over ingredient flags
+
+The steps follow the conflict kinds in ingredients_db.INGREDIENT_CONFLICTS:
+a 'split' pair puts its first ingredient in the morning and its second at
+night, and an 'alternate' pair shares the night routine on different nights.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+from normalization import canonical_key
+
+# Ingredient flags; an ingredient list reduces to the OR of its members' bits
+BRIGHTENING = 1 << 0
+BHA = 1 << 1
+RETINOID = 1 << 2
+AHA = 1 << 3
+BENZOYL_PEROXIDE = 1 << 4
+
+# flag -> normalized (casefolded) ingredient names that set it
+FLAG_INGREDIENTS: Dict[int, Tuple[str, ...]] = {
+    BRIGHTENING: ('vitamin c', 'azelaic acid'),
+    BHA: ('salicylic acid', 'bha'),
+    RETINOID: ('retinol', 'retinoid', 'retinal'),
+    AHA: ('aha', 'glycolic acid', 'lactic acid', 'mandelic acid'),
+    BENZOYL_PEROXIDE: ('benzoyl peroxide',),
+}
+
+DIRECTIONS = (
+    "• **Frequency**: Use as directed on product packaging\n"
+    "• **Application**: Apply to cleansed, dry skin\n"
+    "• **Layering**: Wait 1-2 minutes between product applications\n"
+    "• **SPF**: Always use SPF 30+ during the day\n"
+    "• **Patch Test**: Test on small area for 24-48 hours first"
+)
+
+# Each routine is a list of steps, and each step a list of (flags, text) options:
+# the first option whose flags are all in the mask is used; flags 0 is the
+# default, and an empty text leaves the step out.
+MORNING_STEPS: List[List[Tuple[int, str]]] = [
+    [(0, "**Cleanser**: Gentle cleanser suitable for your skin type")],
+    [(0, "**Toner** (Optional): Hydrating or exfoliating toner")],
+    [(BRIGHTENING, "**Serum**: Vitamin C or brightening serum (2-3 drops)"),
+     (0, "**Serum**: Lightweight serum (2-3 drops)")],
+    # Benzoyl peroxide inactivates retinoids, so it moves to the morning
+    [(BENZOYL_PEROXIDE | RETINOID, "**Treatment**: Benzoyl peroxide in the morning, away from your retinoid"),
+     (0, "")],
+    [(0, "**Moisturizer**: Suitable for your skin type")],
+    [(0, "**SPF**: Broad-spectrum SPF 30+ sunscreen")],
+]
+
+NIGHT_STEPS: List[List[Tuple[int, str]]] = [
+    [(0, "**Cleanser**: Gentle cleanser to remove impurities")],
+    [(BHA | RETINOID, "**Exfoliant**: Salicylic acid or BHA (2-3x per week), on nights without the retinoid"),
+     (BHA, "**Exfoliant**: Salicylic acid or BHA (2-3x per week)"),
+     (BENZOYL_PEROXIDE | RETINOID, "**Toner** (Optional): Hydrating or treatment toner"),
+     (BENZOYL_PEROXIDE, "**Exfoliant**: Salicylic acid or BHA (2-3x per week)"),
+     (0, "**Toner** (Optional): Hydrating or treatment toner")],
+    [(RETINOID | AHA, "**Retinoid**: Start with 1-2x per week, build up gradually; use the AHA on other nights"),
+     (RETINOID, "**Retinoid**: Start with 1-2x per week, build up gradually"),
+     (AHA, "**AHA**: 2-3x per week for exfoliation"),
+     (0, "**Treatment**: Target serum or treatment (as needed)")],
+    [(0, "**Moisturizer**: Richer formula for overnight hydration")],
+]
+
+
+def _render(steps: List[List[Tuple[int, str]]], mask: int) -> str:
+    lines = []
+    for options in steps:
+        text = next(text for flags, text in options if mask & flags == flags)
+        if text:
+            lines.append(f"{len(lines) + 1}. {text}")
+    return '\n'.join(lines)
+
+
+def _relevant_bits(steps: List[List[Tuple[int, str]]]) -> int:
+    bits = 0
+    for options in steps:
+        for flag, _ in options:
+            bits |= flag
+    return bits
+
+
+class RoutineTable:
+    """Pre-rendered routines for every combination of ingredient flags
+
+    Ingredient names are matched whole and case-insensitively, so 'vitamin C'
+    and 'AHA' count while an ingredient merely containing 'retinol' doesn't.
+    """
+
+    def __init__(self, flag_ingredients: Dict[int, Tuple[str, ...]] = FLAG_INGREDIENTS):
+        self.flags_by_name: Dict[str, int] = {}
+        for flag, names in flag_ingredients.items():
+            for name in names:
+                self.flags_by_name[name] = self.flags_by_name.get(name, 0) | flag
+        # Raw dataset spelling -> flags, filled as names are first seen
+        self._flags_by_raw: Dict[str, int] = {}
+
+        self.morning_bits = _relevant_bits(MORNING_STEPS)
+        self.night_bits = _relevant_bits(NIGHT_STEPS)
+        all_bits = self.morning_bits | self.night_bits
+        self.morning = {mask: _render(MORNING_STEPS, mask) for mask in range(all_bits + 1) if mask & ~self.morning_bits == 0}
+        self.night = {mask: _render(NIGHT_STEPS, mask) for mask in range(all_bits + 1) if mask & ~self.night_bits == 0}
+
+    def mask(self, ingredients: Iterable[str]) -> int:
+        """OR of the flags of every ingredient"""
+        mask = 0
+        cache = self._flags_by_raw
+        for name in ingredients:
+            flags = cache.get(name)
+            if flags is None:
+                flags = cache[name] = self.flags_by_name.get(canonical_key(name), 0)
+            mask |= flags
+        return mask
+
+    def morning_routine(self, mask: int) -> str:
+        return self.morning[mask & self.morning_bits]
+
+    def night_routine(self, mask: int) -> str:
+        return self.night[mask & self.night_bits]
@@ -0,0 +1,171 @@
+"""
+TF-IDF fallback for descriptions that match no concern keyword
+
+Each dataset concern becomes one document (its name, its keywords and the
+benefits text of its rows). An unmatched query is vectorized the same way and
+scored against every concern with one sparse mat-vec. The fitted vocabulary,
+IDF weights and matrix are written next to the dataset snapshot, so later
+start-ups load them with NumPy alone instead of importing scikit-learn to refit.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from compact_store import CompactDataset
+
+SEMANTIC_VERSION = 1
+# scikit-learn's default token pattern, so fitted and query-time tokens agree
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+# Words in almost every document (and the benefits template) that would
+# otherwise let a lone "skin" pull in whichever concern has the shortest text
+DOMAIN_STOP_WORDS = ('skin', 'face', 'helps', 'improve', 'supports', 'overall', 'health')
+
+
+def concern_benefits(store: CompactDataset) -> Dict[str, List[str]]:
+    """Distinct benefits texts of each dataset concern, in dataset concern order"""
+    benefits = store.text['benefits']
+    pairs = np.unique(store.concern.codes.astype(np.int64) * len(benefits.values) + benefits.codes)
+    texts: Dict[int, List[str]] = {}
+    for pair in pairs.tolist():
+        concern_code, benefit_code = divmod(pair, len(benefits.values))
+        texts.setdefault(concern_code, []).append(benefits.values[benefit_code])
+    return {concern: texts.get(code, []) for code, concern in enumerate(store.concern.values)}
+
+
+def concern_documents(benefits: Mapping[str, Sequence[str]],
+                      concern_keywords: Mapping[str, Sequence[str]]) -> Dict[str, str]:
+    """One document per concern in benefits: name, keywords and distinct benefits"""
+    documents = {}
+    for concern, texts in benefits.items():
+        parts = [concern, concern]  # The name counts double against the longer benefit text
+        parts.extend(concern_keywords.get(concern, ()))
+        parts.extend(texts)
+        documents[concern] = ' '.join(parts)
+    return documents
+
+
+def documents_digest(documents: Mapping[str, str]) -> str:
+    """Content hash of the fitting input, used to validate a persisted matcher"""
+    payload = json.dumps([SEMANTIC_VERSION, DOMAIN_STOP_WORDS, sorted(documents.items())])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class SemanticMatcher:
+    """Ranks concerns for free text by cosine similarity of TF-IDF vectors"""
+
+    def __init__(self, concerns: Sequence[str], terms: Sequence[str], stop_words: Iterable[str],
+                 idf: np.ndarray, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray):
+        self.concerns = list(concerns)
+        self.vocabulary = {term: position for position, term in enumerate(terms)}
+        self.stop_words: FrozenSet[str] = frozenset(stop_words)
+        self.idf = idf
+        # concerns x terms matrix in CSC layout (rows L2-normalized): a query
+        # only touches the columns of its own terms
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def fit(cls, documents: Mapping[str, str]) -> 'SemanticMatcher':
+        """Fit TF-IDF over the documents (needs scikit-learn)"""
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+
+        stop_words = sorted(ENGLISH_STOP_WORDS.union(DOMAIN_STOP_WORDS))
+        vectorizer = TfidfVectorizer(lowercase=True, stop_words=stop_words, token_pattern=TOKEN_PATTERN.pattern,
+                                     ngram_range=(1, 2), sublinear_tf=True)
+        matrix = vectorizer.fit_transform(documents.values()).tocsc()
+        matrix.sort_indices()
+        return cls(list(documents), vectorizer.get_feature_names_out().tolist(), stop_words,
+                   vectorizer.idf_.astype(np.float32), matrix.indptr.astype(np.int64),
+                   matrix.indices.astype(np.int32), matrix.data.astype(np.float32))
+
+    def analyze(self, text: str) -> List[str]:
+        """Unigrams and bigrams after stop-word removal, as TfidfVectorizer produces them"""
+        tokens = [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in self.stop_words]
+        return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+    def scores(self, text: str) -> Optional[np.ndarray]:
+        """Cosine similarity of text to every concern, or None if no term is known"""
+        counts: Dict[int, int] = {}
+        for token in self.analyze(text):
+            position = self.vocabulary.get(token)
+            if position is not None:
+                counts[position] = counts.get(position, 0) + 1
+        if not counts:
+            return None
+
+        columns = np.fromiter(counts, dtype=np.int64, count=len(counts))
+        weights = np.array([1.0 + math.log(count) for count in counts.values()], dtype=np.float32) * self.idf[columns]
+        weights /= np.linalg.norm(weights)
+
+        # Sparse mat-vec: gather the query's columns and sum them per concern
+        starts, ends = self.indptr[columns], self.indptr[columns + 1]
+        entries = np.concatenate([np.arange(start, end) for start, end in zip(starts.tolist(), ends.tolist())])
+        entry_weights = self.data[entries] * np.repeat(weights, ends - starts)
+        return np.bincount(self.indices[entries], weights=entry_weights, minlength=len(self.concerns))
+
+    def match(self, text: str, k: int = 3, min_score: float = 0.1) -> List[str]:
+        """Up to k concerns scoring at least min_score, best first"""
+        scores = self.scores(text)
+        if scores is None:
+            return []
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = sorted(candidates.tolist(), key=lambda position: (-scores[position], self.concerns[position]))
+        return [self.concerns[position] for position in ranked if scores[position] >= min_score]
+
+    def save(self, directory: str, digest: str):
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, 'meta.json')
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(os.path.join(directory, 'terms.json'), 'w') as handle:
+            json.dump(terms, handle)
+        np.savez(os.path.join(directory, 'matrix.npz'), idf=self.idf, indptr=self.indptr,
+                 indices=self.indices, data=self.data)
+        # meta.json is written last so a half-written matcher is never considered valid
+        with open(meta_path, 'w') as handle:
+            json.dump({'version': SEMANTIC_VERSION, 'digest': digest, 'concerns': self.concerns,
+                       'stop_words': sorted(self.stop_words)}, handle)
+
+    @classmethod
+    def load(cls, directory: str, digest: str) -> Optional['SemanticMatcher']:
+        """The persisted matcher if it was fitted on the same documents, else None"""
+        try:
+            with open(os.path.join(directory, 'meta.json')) as handle:
+                meta = json.load(handle)
+            if meta.get('version') != SEMANTIC_VERSION or meta.get('digest') != digest:
+                return None
+            with open(os.path.join(directory, 'terms.json')) as handle:
+                terms = json.load(handle)
+            with np.load(os.path.join(directory, 'matrix.npz')) as arrays:
+                return cls(meta['concerns'], terms, meta['stop_words'], arrays['idf'],
+                           arrays['indptr'], arrays['indices'], arrays['data'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def load_or_fit(documents: Mapping[str, str], directory: Optional[str] = None) -> SemanticMatcher:
+    """Load the persisted matcher for these documents, fitting and saving it when missing or stale"""
+    digest = documents_digest(documents)
+    if directory is not None:
+        matcher = SemanticMatcher.load(directory, digest)
+        if matcher is not None:
+            return matcher
+
+    matcher = SemanticMatcher.fit(documents)
+    if directory is not None:
+        try:
+            matcher.save(directory, digest)
+        except OSError as e:
+            print(f"Warning: could not write semantic matcher: {e}")
+    return matcher
@@ -0,0 +1,317 @@
+"""
+Headless JSON HTTP service around RecommendationEngine
+
+Pre-forks worker processes that share one listening socket; each worker keeps
+a single engine, warmed in the background at start-up, and serves requests on
+a thread pool. A worker that can't load the dataset exits, and the service
+stops with it rather than staying unready.
+
+Routes:
+    POST /recommend   {"text": "...", "skin_type": "Oily" | null}
+    POST /batch       {"items": [{"text": "...", "skin_type": ...}, ...]}
+    GET  /healthz     liveness
+    GET  /readyz      200 once every worker has loaded the dataset, else 503
+    GET  /metrics     Prometheus text: stage timings and result cache counters,
+                      summed over all workers, so any worker's page covers the
+                      whole service
+
+Usage:
+    python server.py --port 8000 --workers 4
+    python server.py --disk-cache /var/cache/skincare/results.sqlite  # shared by replicas
+    python server.py --answer-table answers.json  # from python -m answer_table
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from instrumentation import SharedPrometheusSink
+from model import RecommendationEngine
+
+MAX_BATCH_ITEMS = 1000
+MAX_BODY_BYTES = 1 << 20
+READY_WAIT_SECONDS = 30.0
+# RecommendationEngine.cache_stats() names; disk_* and answers_* only appear when enabled
+CACHE_COUNTERS = ('hits', 'misses', 'evictions', 'size', 'maxsize',
+                  'disk_hits', 'disk_misses', 'disk_evictions', 'disk_errors',
+                  'answers_hits', 'answers_misses', 'answers_size')
+
+
+class WorkerCounters:
+    """Every worker's latest cache counters in shared memory, one slot per worker"""
+
+    def __init__(self, worker_count: int):
+        # NaN marks a counter a worker has not reported (e.g. no disk cache)
+        self.values = multiprocessing.Array('d', [math.nan] * (worker_count * len(CACHE_COUNTERS)))
+
+    def publish(self, slot: int, stats: Dict[str, int]):
+        base = slot * len(CACHE_COUNTERS)
+        with self.values.get_lock():
+            for position, name in enumerate(CACHE_COUNTERS):
+                if name in stats:
+                    self.values[base + position] = stats[name]
+
+    def totals(self) -> Dict[str, int]:
+        """Each counter summed over the workers that reported it"""
+        with self.values.get_lock():
+            values = self.values[:]
+        totals = {}
+        for position, name in enumerate(CACHE_COUNTERS):
+            reported = [value for value in values[position::len(CACHE_COUNTERS)] if not math.isnan(value)]
+            if reported:
+                totals[name] = int(sum(reported))
+        return totals
+
+
+class ServiceState:
+    """Per-worker engine plus readiness bookkeeping"""
+
+    def __init__(self, ready_workers, worker_count: int, csv_path: str, disk_cache_path: Optional[str] = None,
+                 answer_table_path: Optional[str] = None, metrics: Optional[SharedPrometheusSink] = None,
+                 counters: Optional[WorkerCounters] = None, slot: int = 0):
+        # Metrics and counters are created before forking so that they are shared
+        self.metrics = metrics or SharedPrometheusSink()
+        self.counters = counters or WorkerCounters(worker_count)
+        self.slot = slot
+        self.engine = RecommendationEngine(csv_path=csv_path, timing_sink=self.metrics,
+                                           disk_cache_path=disk_cache_path, answer_table_path=answer_table_path)
+        self.ready = threading.Event()
+        self.ready_workers = ready_workers
+        self.worker_count = worker_count
+
+    def warm(self):
+        """Load the dataset once, then mark this worker ready; a worker that can't load it exits"""
+        try:
+            self.engine._ensure_dataset_loaded()
+        except Exception as e:
+            # Staying up would leave /readyz at 503 forever with the cause unlogged
+            print(f"Worker {self.slot} could not load the dataset, exiting: {e}", file=sys.stderr, flush=True)
+            os._exit(1)
+        self.publish_counters()
+        with self.ready_workers.get_lock():
+            self.ready_workers.value += 1
+        self.ready.set()
+
+    def all_ready(self) -> bool:
+        return self.ready.is_set() and self.ready_workers.value >= self.worker_count
+
+    def publish_counters(self):
+        """Make this worker's cache counters visible to the other workers' /metrics"""
+        self.counters.publish(self.slot, self.engine.cache_stats())
+
+    def render_metrics(self) -> str:
+        self.publish_counters()
+        lines = [self.metrics.render()]
+        for name, value in self.counters.totals().items():
+            lines.append(f"skincare_result_cache_{name} {value}\n")
+        lines.append(f"skincare_workers {self.worker_count}\n")
+        lines.append(f"skincare_workers_ready {self.ready_workers.value}\n")
+        return ''.join(lines)
+
+
+class RecommendationHandler(BaseHTTPRequestHandler):
+    server_version = 'SkinCareGenius/1.0'
+    protocol_version = 'HTTP/1.1'
+
+    @property
+    def state(self) -> ServiceState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        # Access logs on every request would dominate the service's own cost
+        pass
+
+    def _send(self, status: int, payload, content_type: str = 'application/json'):
+        body = payload.encode() if isinstance(payload, str) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Tuple[Optional[Dict], int, Optional[str]]:
+        """The JSON object body, or the status and error to reject the request with"""
+        header = self.headers.get('Content-Length')
+        if header is None:
+            # The body can't be delimited, so the connection can't be reused either
+            self.close_connection = True
+            return None, 411, "Content-Length required"
+        header = header.strip()
+        # int() alone would also take '-1', '+5' and '1_0'; a negative read blocks until EOF
+        if not (header.isascii() and header.isdigit()):
+            self.close_connection = True
+            return None, 400, "invalid Content-Length"
+        length = int(header)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            return None, 413, "request body too large"
+        try:
+            payload = json.loads(self.rfile.read(length) or b'null')
+        except ValueError:
+            return None, 400, "body must be valid JSON"
+        if not isinstance(payload, dict):
+            return None, 400, "body must be a JSON object"
+        return payload, 200, None
+
+    @staticmethod
+    def _parse_item(item) -> Tuple[Optional[Tuple[str, Optional[str]]], Optional[str]]:
+        if not isinstance(item, dict) or not isinstance(item.get('text'), str) or not item['text'].strip():
+            return None, "each request needs a non-empty 'text' string"
+        skin_type = item.get('skin_type')
+        if skin_type is not None and not isinstance(skin_type, str):
+            return None, "'skin_type' must be a string or null"
+        if skin_type and skin_type.lower() == 'any':
+            skin_type = None
+        return (item['text'], skin_type), None
+
+    def do_GET(self):
+        if self.path == '/healthz':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/readyz':
+            if self.state.all_ready():
+                self._send(200, {'status': 'ready'})
+            else:
+                self._send(503, {'status': 'loading'})
+        elif self.path == '/metrics':
+            self._send(200, self.state.render_metrics(), 'text/plain; version=0.0.4')
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if self.path not in ('/recommend', '/batch'):
+            self._send(404, {'error': 'not found'})
+            return
+
+        payload, status, error = self._read_json()
+        if error:
+            self._send(status, {'error': error})
+            return
+        if not self.state.ready.wait(READY_WAIT_SECONDS):
+            self._send(503, {'error': 'dataset still loading'})
+            return
+
+        engine = self.state.engine
+        if self.path == '/recommend':
+            parsed, error = self._parse_item(payload)
+            if error:
+                self._send(400, {'error': error})
+                return
+            self._send(200, engine.get_recommendations(*parsed))
+            self.state.publish_counters()
+            return
+
+        items = payload.get('items')
+        if not isinstance(items, list):
+            self._send(400, {'error': "'items' must be a list"})
+            return
+        if len(items) > MAX_BATCH_ITEMS:
+            self._send(413, {'error': f"at most {MAX_BATCH_ITEMS} items per batch"})
+            return
+        parsed_items = []
+        for item in items:
+            parsed, error = self._parse_item(item)
+            if error:
+                self._send(400, {'error': error})
+                return
+            parsed_items.append(parsed)
+        texts = [text for text, _ in parsed_items]
+        skin_types = [skin_type for _, skin_type in parsed_items]
+        self._send(200, {'results': list(engine.get_recommendations_batch(texts, skin_types))})
+        self.state.publish_counters()
+
+
+def _run_worker(listener: socket.socket, ready_workers, worker_count: int, csv_path: str,
+                disk_cache_path: Optional[str] = None, answer_table_path: Optional[str] = None,
+                metrics: Optional[SharedPrometheusSink] = None, counters: Optional[WorkerCounters] = None,
+                slot: int = 0):
+    state = ServiceState(ready_workers, worker_count, csv_path, disk_cache_path, answer_table_path,
+                         metrics, counters, slot)
+    threading.Thread(target=state.warm, name='engine-warmup', daemon=True).start()
+
+    httpd = ThreadingHTTPServer(listener.getsockname()[:2], RecommendationHandler, bind_and_activate=False)
+    httpd.socket.close()
+    httpd.socket = listener
+    httpd.daemon_threads = True
+    httpd.state = state
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+def serve(host: str = '127.0.0.1', port: int = 8000, workers: int = 1,
+          csv_path: str = 'skincare_dataset.csv', disk_cache_path: Optional[str] = None,
+          answer_table_path: Optional[str] = None):
+    """Bind once, then run the given number of worker processes on the socket"""
+    listener = socket.create_server((host, port), backlog=256)
+    ready_workers = multiprocessing.Value('i', 0)
+    metrics = SharedPrometheusSink()
+    counters = WorkerCounters(max(workers, 1))
+    print(f"Serving on http://{host}:{listener.getsockname()[1]} with {workers} worker(s)")
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        _run_worker(listener, ready_workers, 1, csv_path, disk_cache_path, answer_table_path, metrics, counters)
+        return
+
+    children = []
+    for slot in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                _run_worker(listener, ready_workers, workers, csv_path, disk_cache_path, answer_table_path,
+                            metrics, counters, slot)
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    failed = False
+    try:
+        for _ in children:
+            pid, status = os.wait()
+            if status and not stopping:
+                # A worker that can't serve (e.g. the dataset failed to load) takes the service down
+                print(f"Worker process {pid} failed, stopping the service", file=sys.stderr)
+                failed = True
+                stop(signal.SIGTERM, None)
+    except KeyboardInterrupt:
+        stop(signal.SIGINT, None)
+    finally:
+        listener.close()
+    if failed:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SkinCare Genius recommendation service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--csv', default='skincare_dataset.csv', help="dataset CSV to serve")
+    parser.add_argument('--disk-cache', help="SQLite file for a result cache shared across workers and restarts")
+    parser.add_argument('--answer-table', help="precomputed one- and two-concern answers (python -m answer_table)")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.csv, args.disk_cache, args.answer_table)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import json
+import os
+import random
+
+import pytest
+
+from config import SAMPLE_INPUTS
+from model import AGGREGATION_MODES, RecommendationEngine
+from prebuilt_index import build_prebuilt
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'skincare_dataset.csv')
+SKIN_TYPES = [None, 'Dry', 'Oily', 'Normal', 'Sensitive', 'Combination']
+
+
+def engine(aggregation: str, **options) -> RecommendationEngine:
+    return RecommendationEngine(aggregation, cache_size=0, csv_path=DATASET, use_snapshot=False,
+                                semantic_fallback=False, disk_cache_path=None, answer_table_path=None, **options)
+
+
+def inputs(reference: RecommendationEngine):
+    keywords = sorted({keyword for words in reference.concern_keywords.values() for keyword in words})
+    rng = random.Random(0)
+    return list(SAMPLE_INPUTS) + ['', 'nothing here'] + [
+        ' '.join(rng.sample(keywords, rng.randint(1, 6))) for _ in range(40)]
+
+
+@pytest.fixture(scope='module')
+def prebuilt_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('prebuilt') / 'skincare.index.json')
+    build_prebuilt(DATASET, path)
+    return path
+
+
+@pytest.mark.parametrize('top_k', [{}, {'top_k_ingredients': None, 'top_k_brands': None}])
+@pytest.mark.parametrize('aggregation', [mode for mode in AGGREGATION_MODES if mode != 'rows'])
+def test_aggregation_matches_rows(aggregation, top_k):
+    rows, other = engine('rows', **top_k), engine(aggregation, **top_k)
+    for text in inputs(rows):
+        for skin_type in SKIN_TYPES:
+            expected = rows.get_recommendations(text, skin_type)
+            assert json.dumps(other.get_recommendations(text, skin_type)) == json.dumps(expected), (text, skin_type)
+
+
+def test_prebuilt_index_matches_rows(prebuilt_path):
+    rows, prebuilt = engine('rows'), engine('index', index_path=prebuilt_path)
+    for text in inputs(rows):
+        for skin_type in SKIN_TYPES:
+            expected = rows.get_recommendations(text, skin_type)
+            assert json.dumps(prebuilt.get_recommendations(text, skin_type)) == json.dumps(expected), (text, skin_type)
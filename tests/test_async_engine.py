@@ -0,0 +1,53 @@
+import asyncio
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from async_engine import AsyncRecommendationEngine
+from ingestion import DatasetValidationError
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'skincare_dataset.csv')
+
+
+def facade(csv_path: str) -> AsyncRecommendationEngine:
+    return AsyncRecommendationEngine(csv_path=csv_path, use_snapshot=False, semantic_fallback=False,
+                                     disk_cache_path=None, answer_table_path=None)
+
+
+def test_recommendations_match_the_engine():
+    async def run(engine):
+        async with engine:
+            single = await engine.recommend('acne and redness', 'Oily')
+            many = await engine.recommend_many(['acne and redness', 'dry skin'], 'Oily')
+        return single, many
+
+    engine = facade(DATASET)
+    single, many = asyncio.run(run(engine))
+    assert engine.ready
+    assert single == many[0] == engine.engine.get_recommendations('acne and redness', 'Oily')
+    assert many[1] == engine.engine.get_recommendations('dry skin', 'Oily')
+
+
+def test_failed_warmup_is_retried(tmp_path):
+    csv_path = str(tmp_path / 'data.csv')
+    engine = facade(csv_path)
+
+    async def run():
+        with pytest.raises(DatasetValidationError):
+            await engine.wait_ready()
+        assert not engine.ready
+        # The failure is not cached: once the file exists, the next request loads it
+        shutil.copy(DATASET, csv_path)
+        return await engine.recommend('acne')
+
+    assert asyncio.run(run())['concerns'] == ['acne']
+    assert engine.ready
+    engine.close()
+
+
+def test_process_pool_is_rejected():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(TypeError, match='ThreadPoolExecutor'):
+            AsyncRecommendationEngine(executor=executor)
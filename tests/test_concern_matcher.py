@@ -0,0 +1,56 @@
+import pytest
+
+from concern_matcher import ConcernMatcher
+from model import RecommendationEngine
+
+
+@pytest.fixture(scope='module')
+def matcher():
+    return RecommendationEngine(semantic_fallback=False, fuzzy_matching=False).concern_matcher
+
+
+@pytest.mark.parametrize('text, concern', [
+    ("deep wrinkles around my eyes", 'wrinkles'),
+    ("my skin is so dry, and oily on the nose", 'dry skin'),
+    ("i have dry skin", 'dry skin'),
+    ("oily t-zone by noon", 'oily t-zone'),
+    ("signs of photoaging", 'wrinkles'),
+    ("lots of blackheads!", 'blackheads'),
+])
+def test_keywords_match_whole_words_and_their_extensions(matcher, text, concern):
+    assert concern in matcher.match(text)
+
+
+@pytest.mark.parametrize('text, concern', [
+    ("old sun damage spots", 'age spots'),
+    ("tired acne-prone skin", 'inflamed acne'),
+])
+def test_multi_word_keywords_do_not_start_inside_a_word(matcher, text, concern):
+    assert concern not in matcher.match(text)
+
+
+def test_concerns_come_back_in_map_order():
+    matcher = ConcernMatcher({'first': ['zzz'], 'second': ['aaa bbb'], 'third': ['aaa']})
+    assert matcher.match("aaa bbb and zzz") == ['first', 'second', 'third']
+
+
+def test_phrase_words_must_be_adjacent():
+    matcher = ConcernMatcher({'dry skin': ['dry skin']})
+    assert matcher.match("dry and tight skin") == []
+    assert matcher.match("dry skinned") == ['dry skin']
+
+
+
+def test_in_word_keywords_match_a_pairwise_scan(matcher):
+    keywords = [keyword for keywords in RecommendationEngine(semantic_fallback=False, fuzzy_matching=False)
+                .concern_keywords.values() for keyword in keywords if keyword == keyword.lower()]
+    expected = set()
+    for keyword in keywords:
+        for other in keywords:
+            start = other.find(keyword, 1)
+            while start != -1:
+                if other[start - 1].isalnum():
+                    expected.add(keyword)
+                start = other.find(keyword, start + 1)
+    assert {keyword for keyword, _ in matcher._in_word} == expected
+    assert {'aging', 'acne', 'red'} <= expected
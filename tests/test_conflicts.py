@@ -0,0 +1,50 @@
+import pytest
+
+from conflicts import CompatibilityMatrix
+from ingredients_db import INGREDIENT_CONFLICTS
+from routines import RoutineTable
+
+
+@pytest.fixture(scope='module')
+def routines():
+    return RoutineTable()
+
+
+def test_exfoliating_acids_alternate_with_retinoids():
+    acids = {'Salicylic Acid', 'AHA', 'Glycolic Acid'}
+    kinds = {kind for first, second, kind, _ in INGREDIENT_CONFLICTS if {first, second} & acids and 'Retino' in second}
+    assert kinds == {'alternate'}
+
+
+@pytest.mark.parametrize('first, second, kind, reason', INGREDIENT_CONFLICTS)
+def test_routine_follows_conflict_kind(routines, first, second, kind, reason):
+    mask = routines.mask([first, second])
+    morning, night = routines.morning_routine(mask), routines.night_routine(mask)
+    if kind == 'split':
+        assert first.lower() in morning.lower()
+    else:
+        assert 'nights' in night
+
+
+def test_benzoyl_peroxide_moves_to_the_morning_with_a_retinoid(routines):
+    ingredients = ['Benzoyl Peroxide', 'Retinol']
+    mask = routines.mask(ingredients)
+    assert 'Benzoyl peroxide in the morning' in routines.morning_routine(mask)
+    assert '**Exfoliant**' not in routines.night_routine(mask)
+    conflict, = CompatibilityMatrix().conflicts(ingredients)
+    assert (conflict.first, conflict.second, conflict.kind) == ('Benzoyl Peroxide', 'Retinol', 'split')
+
+
+def test_salicylic_acid_alternates_with_a_retinoid(routines):
+    ingredients = ['Salicylic Acid', 'Retinol']
+    night = routines.night_routine(routines.mask(ingredients))
+    assert 'on nights without the retinoid' in night
+    conflict, = CompatibilityMatrix().conflicts(ingredients)
+    assert conflict.kind == 'alternate'
+    assert conflict.advice == "Use **Salicylic Acid** and **Retinol** on alternate nights"
+
+
+def test_benzoyl_peroxide_without_a_retinoid_stays_at_night(routines):
+    mask = routines.mask(['Benzoyl Peroxide'])
+    assert 'Benzoyl peroxide' not in routines.morning_routine(mask)
+    assert '**Exfoliant**' in routines.night_routine(mask)
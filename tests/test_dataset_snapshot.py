@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import dataset_snapshot
+from dataset_snapshot import file_sha256, load_snapshot, snapshot_dir
+from ingestion import ingest_csv
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'skincare_dataset.csv')
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    with open(DATASET) as handle:
+        lines = handle.readlines()
+    path = tmp_path / 'skincare.csv'
+    path.write_text(''.join(lines[:41]))
+    return str(path)
+
+
+def test_snapshot_round_trips_the_accepted_rows(csv_path):
+    result = ingest_csv(csv_path, chunk_rows=15, keep_frame=True)
+    snapshot = load_snapshot(csv_path)
+    assert snapshot is not None
+    assert snapshot.to_dict('records') == result.frame[list(snapshot.columns)].to_dict('records')
+    assert dataset_snapshot.dataset_version(csv_path) == file_sha256(csv_path)
+
+
+def test_file_replaced_during_ingestion_is_not_snapshotted(monkeypatch, csv_path):
+    add = dataset_snapshot.SnapshotWriter.add
+    with open(csv_path) as handle:
+        header = handle.readline()
+
+    def add_then_replace(writer, chunk):
+        add(writer, chunk)
+        if not replaced:
+            # Another process swaps in a new version while the old one is still being read
+            with open(f"{csv_path}.new", 'w') as handle:
+                handle.write(header + 'acne,oily,salicylic acid,Clears pores,Use at night,Cosrx,Patch test first\n')
+            os.replace(f"{csv_path}.new", csv_path)
+            replaced.append(True)
+
+    replaced = []
+    monkeypatch.setattr(dataset_snapshot.SnapshotWriter, 'add', add_then_replace)
+    ingest_csv(csv_path, chunk_rows=15)
+
+    assert not os.path.exists(os.path.join(snapshot_dir(csv_path), 'meta.json'))
+    assert load_snapshot(csv_path) is None
@@ -0,0 +1,109 @@
+import os
+import shutil
+
+import pytest
+
+import disk_cache
+from conflicts import Conflict
+from disk_cache import DiskResultCache, cache_key
+from model import RecommendationEngine
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'skincare_dataset.csv')
+RESULT = {'concerns': ['acne'], 'ingredients': ['Niacinamide'],
+          'conflicts': (Conflict('Retinol', 'Vitamin C', 'split', 'Use at different times'),)}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(disk_cache.time, 'time', clock.time)
+    return clock
+
+
+def test_round_trip_restores_conflicts(tmp_path):
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'))
+    cache.put('v1', cache_key(['acne', 'redness'], 'Oily'), RESULT)
+    assert cache.get('v1', cache_key(['redness', 'acne'], 'oily')) == RESULT
+    assert cache.get('v2', cache_key(['acne', 'redness'], 'Oily')) is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'errors': 0}
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'), ttl=60)
+    cache.put('v1', 'old', RESULT)
+    clock.now += 30
+    cache.put('v1', 'new', RESULT)
+    clock.now += 31
+    assert cache.get('v1', 'old') is None
+    assert cache.get('v1', 'new') == RESULT
+
+    cache.prune()
+    assert len(cache) == 1 and cache.stats()['evictions'] == 1
+
+
+def test_oldest_entries_are_evicted_beyond_max_entries(tmp_path, clock):
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'), max_entries=3)
+    for number in range(5):
+        clock.now += 1
+        cache.put('v1', str(number), RESULT)
+    cache.prune()
+    assert [cache.get('v1', str(number)) is not None for number in range(5)] == [False, False, True, True, True]
+    assert cache.stats()['evictions'] == 2
+
+
+def test_writes_prune_periodically(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, 'PRUNE_INTERVAL', 4)
+    cache = DiskResultCache(str(tmp_path / 'results.sqlite'), max_entries=2)
+    for number in range(4):
+        cache.put('v1', str(number), RESULT)
+    assert len(cache) == 2
+
+
+def test_unusable_file_only_costs_recomputation(tmp_path):
+    blocker = tmp_path / 'not-a-directory'
+    blocker.write_text('')
+    cache = DiskResultCache(str(blocker / 'results.sqlite'))
+    cache.put('v1', 'key', RESULT)
+    assert cache.get('v1', 'key') is None
+    assert cache.stats()['errors'] == 2
+
+
+def engine_for(csv_path, cache_path, **options):
+    return RecommendationEngine(csv_path=csv_path, use_snapshot=False, semantic_fallback=False,
+                                disk_cache_path=cache_path, answer_table_path=None, **options)
+
+
+def test_new_results_version_purges_other_versions(tmp_path):
+    csv_path = str(tmp_path / 'data.csv')
+    shutil.copy(DATASET, csv_path)
+    cache_path = str(tmp_path / 'results.sqlite')
+
+    engine = engine_for(csv_path, cache_path)
+    first = engine.get_recommendations('acne', 'Oily')
+    old_version = engine._state.version
+    assert len(engine.disk_cache) == 1
+
+    # A restart on the same data and settings serves the stored result
+    restarted = engine_for(csv_path, cache_path)
+    assert restarted.get_recommendations('acne', 'Oily') == first
+    assert restarted.cache_stats()['disk_hits'] == 1
+
+    # Different settings are a different version: the old entries go
+    engine_for(csv_path, cache_path, top_k_brands=1).get_recommendations('acne', 'Oily')
+    cache = DiskResultCache(cache_path)
+    assert cache.get(old_version, cache_key(['acne'], 'Oily')) is None and len(cache) == 1
+
+    # So does a changed dataset, picked up by a reload
+    with open(csv_path, 'a') as handle:
+        handle.write('acne,oily,zinc,Calms,Use daily,Cosrx,Patch test first\n')
+    engine.reload_dataset()
+    assert engine._state.version != old_version
+    assert len(cache) == 0
@@ -0,0 +1,60 @@
+import pytest
+
+from concern_matcher import ConcernMatcher
+from config import SAMPLE_INPUTS
+from fuzzy_matcher import FuzzyConcernMatcher
+from model import RecommendationEngine
+
+PRODUCT_INPUTS = [
+    "I use a serum daily",
+    "I apply two serums every night",
+    "My toner stings a little",
+    "I had reactions to a new cream",
+    "Which cleanser and moisturizer should I use?",
+    "My skin tone is uneven and I use a toner",
+]
+# Real words one edit away from a keyword word ("tried" / "tired")
+ENGLISH_INPUTS = [
+    "I tried everything",
+    "I tried a new cleanser last week",
+    "I pored over every label",
+    "My notebook is lined",
+    "I use panty liners",
+    "The sun shone all day",
+    "I ate greasy food",
+    "My hair gets matted",
+    "Fragrance can irritate me",
+]
+
+
+@pytest.fixture(scope='module')
+def engines():
+    return (RecommendationEngine(semantic_fallback=False, fuzzy_matching=False),
+            RecommendationEngine(semantic_fallback=False, fuzzy_matching=True))
+
+
+@pytest.mark.parametrize('text', SAMPLE_INPUTS + PRODUCT_INPUTS + ENGLISH_INPUTS)
+def test_fuzzy_matching_keeps_exact_results(engines, text):
+    exact, fuzzy = engines
+    assert fuzzy._extract_concerns(text) == exact._extract_concerns(text)
+
+
+@pytest.mark.parametrize('text', PRODUCT_INPUTS + ENGLISH_INPUTS)
+def test_dictionary_words_are_not_typos(engines, text):
+    _, fuzzy = engines
+    assert fuzzy.fuzzy_matcher.match(text) == []
+
+
+def test_corrections_never_match_inside_a_word():
+    # Without a dictionary "tierd" is corrected to "tired"; 'red' must not fire on it
+    matcher = FuzzyConcernMatcher(ConcernMatcher({'dull skin': ['tired'], 'redness': ['red']}))
+    assert matcher.match("i always look tierd") == ['dull skin']
+
+
+@pytest.mark.parametrize('text, concern', [
+    ("I get blackhedas on my nose", 'blackheads'),
+    ("my cheeks have rosaceaa", 'rosacea'),
+])
+def test_typos_are_still_corrected(engines, text, concern):
+    _, fuzzy = engines
+    assert concern in fuzzy._extract_concerns(text)
@@ -0,0 +1,41 @@
+import pytest
+
+from ingredients_db import INGREDIENT_GLOSSARY, GlossarySearchIndex, glossary_index
+
+
+def names(query, limit=8):
+    return [name for name, _ in glossary_index().search(query, limit)]
+
+
+def test_empty_query_lists_the_glossary_in_order():
+    assert names('', 3) == list(INGREDIENT_GLOSSARY)[:3]
+
+
+def test_name_prefix_ranks_first():
+    assert names('Retinol')[0] == 'Retinol'
+
+
+@pytest.mark.parametrize('query', ['soothing', 'soothe', 'soothes', 'Soothing'])
+def test_description_words_match_by_stem(query):
+    found = names(query)
+    assert found
+    assert all('sooth' in INGREDIENT_GLOSSARY[name].lower() for name in found)
+
+
+def test_app_placeholder_queries_find_something():
+    assert names('Retinol') and names('soothing')
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('ol', {'Retinol', 'Panthenol', 'Collagen'}),
+    ('ac', {'Niacinamide', 'Salicylic Acid'}),
+])
+def test_short_queries_match_name_substrings(query, expected):
+    assert expected <= set(names(query, limit=len(INGREDIENT_GLOSSARY)))
+
+
+@pytest.mark.parametrize('query', ['a', 'ol', 'cid', 'acid', 'in'])
+def test_substring_matches_agree_with_a_scan(query):
+    index = GlossarySearchIndex(INGREDIENT_GLOSSARY)
+    found = {name for name, _ in index.search(query, limit=len(INGREDIENT_GLOSSARY))}
+    assert {name for name in INGREDIENT_GLOSSARY if query in name.lower()} <= found
@@ -0,0 +1,101 @@
+import csv
+import os
+import time
+
+import pytest
+
+from ingestion import DatasetValidationError
+from model import RecommendationEngine
+
+HEADER = ['concern', 'skin_type', 'ingredients', 'benefits', 'directions', 'brands', 'notes']
+ROW = ['acne', 'oily', 'salicylic acid', 'Clears pores', 'Use at night', 'Cosrx', 'Patch test first']
+
+
+def write_csv(path, ingredients, header=HEADER):
+    """One acne row per ingredient; each write also moves the mtime on"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows([ROW[:2] + [ingredient] + ROW[3:] for ingredient in ingredients])
+    os.replace(tmp_path, path)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10_000_000_000))
+
+
+def ingredients(engine):
+    return engine.get_recommendations('acne', 'Oily')['ingredients']
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    write_csv(path, ['salicylic acid'])
+    return path
+
+
+@pytest.fixture
+def engine(csv_path):
+    engine = RecommendationEngine(csv_path=csv_path, use_snapshot=False, semantic_fallback=False,
+                                  disk_cache_path=None, answer_table_path=None)
+    yield engine
+    engine.stop_watching()
+
+
+def test_reload_swaps_in_a_new_generation(engine, csv_path):
+    assert ingredients(engine) == ['Salicylic Acid']
+    previous = engine._state
+    assert engine.dataset_generation == 1 and engine.cache_stats()['size'] == 1
+
+    write_csv(csv_path, ['salicylic acid', 'niacinamide'])
+    engine.reload_dataset()
+
+    assert engine.dataset_generation == 2
+    assert engine.cache_stats()['size'] == 0
+    assert sorted(ingredients(engine)) == ['Niacinamide', 'Salicylic Acid']
+    # Requests that took the old state keep a complete, unchanged dataset
+    assert previous.generation == 1 and len(previous.store) == 1
+
+
+def test_watcher_reloads_a_changed_file(engine, csv_path):
+    ingredients(engine)
+    engine.start_watching(interval=0.01)
+    write_csv(csv_path, ['niacinamide'])
+    wait_for(lambda: engine.dataset_generation == 2)
+    assert ingredients(engine) == ['Niacinamide']
+
+
+def test_failed_reload_keeps_the_previous_data_until_the_file_changes(engine, csv_path):
+    assert ingredients(engine) == ['Salicylic Acid']
+    previous = engine._state
+    attempts = []
+    reload_dataset = engine.reload_dataset
+
+    def counted_reload():
+        attempts.append(os.stat(csv_path).st_mtime_ns)
+        reload_dataset()
+
+    engine.reload_dataset = counted_reload
+    write_csv(csv_path, ['niacinamide'], header=HEADER[:3])
+    with pytest.raises(DatasetValidationError):
+        reload_dataset()
+    assert engine._state is previous
+
+    engine.start_watching(interval=0.01)
+    wait_for(lambda: attempts)
+    # The broken version's fingerprint is remembered, so it is not retried
+    time.sleep(0.2)
+    assert len(attempts) == 1
+    assert engine._state is previous and ingredients(engine) == ['Salicylic Acid']
+
+    write_csv(csv_path, ['niacinamide'])
+    wait_for(lambda: engine.dataset_generation == 2)
+    assert len(attempts) == 2
+    assert ingredients(engine) == ['Niacinamide']
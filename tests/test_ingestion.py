@@ -0,0 +1,96 @@
+import csv
+
+import pytest
+
+from ingestion import REQUIRED_COLUMNS, DatasetValidationError, IngestReport, RowError, ingest_csv
+from model import RecommendationEngine
+
+HEADER = ['concern', 'skin_type', 'ingredients', 'benefits', 'directions', 'brands', 'notes']
+GOOD = ['acne', 'Oily', 'salicylic acid, niacinamide', 'Clears pores', 'Use at night', 'Cosrx', 'Patch test first']
+
+
+def write_csv(path, rows, header=HEADER):
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def with_cell(column: str, value: str):
+    row = list(GOOD)
+    row[HEADER.index(column)] = value
+    return row
+
+
+def test_missing_required_columns_are_named(tmp_path):
+    header = [name for name in HEADER if name not in ('brands', 'notes')]
+    path = write_csv(tmp_path / 'data.csv', [[GOOD[HEADER.index(name)] for name in header]], header)
+    with pytest.raises(DatasetValidationError, match='missing required columns: brands, notes'):
+        ingest_csv(path, snapshot=False)
+
+
+def test_header_only_csv_has_no_valid_rows(tmp_path):
+    with pytest.raises(DatasetValidationError, match='no valid rows'):
+        ingest_csv(write_csv(tmp_path / 'data.csv', []), snapshot=False)
+
+
+@pytest.mark.parametrize('invalid, accepted', [(5, True), (6, False)])
+def test_invalid_row_threshold(tmp_path, invalid, accepted):
+    rows = [with_cell('skin_type', 'Scaly')] * invalid + [GOOD] * (100 - invalid)
+    path = write_csv(tmp_path / 'data.csv', rows)
+    if accepted:
+        assert ingest_csv(path, snapshot=False, max_invalid_fraction=0.05).report.rows_rejected == invalid
+        return
+    with pytest.raises(DatasetValidationError, match='rejected 6 of 100 rows') as raised:
+        ingest_csv(path, snapshot=False, max_invalid_fraction=0.05)
+    assert raised.value.report.rows_rejected == invalid
+
+
+def test_report_lists_each_rejected_row_once(tmp_path):
+    rows = [
+        GOOD,
+        with_cell('concern', '  '),
+        with_cell('skin_type', 'Scaly'),
+        with_cell('ingredients', ' , '),
+        # Only the first problem of a row is reported
+        ['acne', 'Oily', 'retinol', '', 'Use at night', '', 'Patch test first'],
+        with_cell('skin_type', ' COMBINATION '),
+    ]
+    result = ingest_csv(write_csv(tmp_path / 'data.csv', rows), snapshot=False,
+                        keep_frame=True, max_invalid_fraction=1.0)
+    report = result.report
+
+    assert (report.rows_read, report.rows_accepted, report.rows_rejected) == (6, 2, 4)
+    assert [(error.row, error.column, error.value) for error in report.errors] == [
+        (2, 'concern', '  '), (3, 'skin_type', 'Scaly'), (4, 'ingredients', ' , '), (5, 'benefits', '')]
+    assert report.errors[0] == RowError(2, 'concern', 'missing concern', '  ')
+    assert sum(report.error_counts.values()) == 4
+    assert list(result.frame['skin_type']) == ['oily', 'combination']
+    assert set(REQUIRED_COLUMNS) <= set(result.frame.columns)
+    assert "6 rows read, 2 accepted, 4 rejected" in report.format()
+
+
+def test_rows_are_numbered_across_chunks(tmp_path):
+    rows = [GOOD] + [with_cell('skin_type', 'Scaly')] * 5
+    with pytest.raises(DatasetValidationError) as raised:
+        ingest_csv(write_csv(tmp_path / 'data.csv', rows), snapshot=False, chunk_rows=2)
+    report = raised.value.report
+    assert [error.row for error in report.errors] == [2, 3, 4, 5, 6]
+    assert report.error_counts.most_common() == [(report.errors[0].message, 5)]
+
+
+def test_report_lists_only_the_first_rejected_rows():
+    report = IngestReport('data.csv', max_errors=3)
+    report.rows_read = 5
+    for row in range(1, 6):
+        report.reject(row, 'concern', 'missing concern', '')
+    assert [error.row for error in report.errors] == [1, 2, 3]
+    assert report.error_counts['missing concern'] == 5
+    assert "only the first 3 rejected rows are listed" in report.format()
+
+
+def test_missing_csv_raises_instead_of_serving_embedded_data(tmp_path):
+    engine = RecommendationEngine(csv_path=str(tmp_path / 'missing.csv'), semantic_fallback=False)
+    with pytest.raises(DatasetValidationError, match='not found'):
+        engine.get_recommendations('acne')
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from instrumentation import JsonLinesSink, PrometheusSink, SharedPrometheusSink, TimingSink
+from model import RecommendationEngine
+
+
+def test_sink_must_implement_emit():
+    class Incomplete(TimingSink):
+        pass
+
+    with pytest.raises(TypeError):
+        TimingSink()
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+@pytest.mark.parametrize('sink_type', [PrometheusSink, SharedPrometheusSink])
+def test_engine_reports_every_request(sink_type):
+    sink = sink_type()
+    engine = RecommendationEngine(cache_size=0, semantic_fallback=False, disk_cache_path=None,
+                                  answer_table_path=None, timing_sink=sink)
+    for _ in range(3):
+        engine.get_recommendations('acne and redness', 'Oily')
+    sums, counts = sink.totals()
+    assert counts['total'] == 3 and counts['extract'] == 3
+    assert sums['total'] >= sums['extract'] > 0
+    assert 'skincare_stage_seconds_count{stage="total"} 3' in sink.render()
+
+
+def test_json_lines_sink_appends_one_line_per_request(tmp_path):
+    path = tmp_path / 'timings.jsonl'
+    sink = JsonLinesSink(str(path))
+    sink.emit({'extract': 0.5, 'total': 0.5})
+    sink.emit({'extract': 0.25, 'total': 0.25})
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line['total'] for line in lines] == [0.5, 0.25]
+    assert all('timestamp' in line for line in lines)
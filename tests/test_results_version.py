@@ -0,0 +1,53 @@
+import pytest
+
+import ingredients_db
+import routines
+from conflicts import CompatibilityMatrix
+from model import RecommendationEngine
+from routines import RoutineTable
+
+
+def version():
+    return RecommendationEngine(semantic_fallback=False).results_version('source')
+
+
+@pytest.fixture(scope='module')
+def baseline():
+    return version()
+
+
+def test_version_is_stable(baseline):
+    assert version() == baseline
+
+
+@pytest.mark.parametrize('table, key, value', [
+    (ingredients_db.INGREDIENT_ALIASES, 'vit c', 'Vitamin C'),
+    (ingredients_db.BRAND_ALIASES, 'the ord', 'The Ordinary'),
+    (ingredients_db.INGREDIENT_GLOSSARY, 'Adapalene', 'Retinoid for acne'),
+])
+def test_names_and_aliases_change_the_version(monkeypatch, baseline, table, key, value):
+    monkeypatch.setitem(table, key, value)
+    assert version() != baseline
+
+
+def test_conflicts_change_the_version(baseline):
+    conflicts = list(ingredients_db.INGREDIENT_CONFLICTS)
+    first, second, kind, reason = conflicts[0]
+    conflicts[0] = (first, second, 'alternate' if kind == 'split' else 'split', reason)
+    engine = RecommendationEngine(semantic_fallback=False)
+    engine.compatibility = CompatibilityMatrix(conflicts)
+    assert engine.results_version('source') != baseline
+
+
+def test_routine_flags_change_the_version(baseline):
+    flags = dict(routines.FLAG_INGREDIENTS)
+    flags[routines.RETINOID] += ('adapalene',)
+    engine = RecommendationEngine(semantic_fallback=False)
+    engine.routines = RoutineTable(flags)
+    assert engine.results_version('source') != baseline
+
+
+def test_routine_text_changes_the_version(monkeypatch, baseline):
+    steps = [[(0, "**Cleanser**: Oil cleanser, then a gentle cleanser")]] + routines.NIGHT_STEPS[1:]
+    monkeypatch.setattr(routines, 'NIGHT_STEPS', steps)
+    assert version() != baseline
@@ -0,0 +1,64 @@
+import pytest
+
+from routines import RoutineTable
+
+DEFAULT_MORNING = (
+    "1. **Cleanser**: Gentle cleanser suitable for your skin type\n"
+    "2. **Toner** (Optional): Hydrating or exfoliating toner\n"
+    "3. **Serum**: Lightweight serum (2-3 drops)\n"
+    "4. **Moisturizer**: Suitable for your skin type\n"
+    "5. **SPF**: Broad-spectrum SPF 30+ sunscreen"
+)
+DEFAULT_NIGHT = (
+    "1. **Cleanser**: Gentle cleanser to remove impurities\n"
+    "2. **Toner** (Optional): Hydrating or treatment toner\n"
+    "3. **Treatment**: Target serum or treatment (as needed)\n"
+    "4. **Moisturizer**: Richer formula for overnight hydration"
+)
+
+
+@pytest.fixture(scope='module')
+def routines():
+    return RoutineTable()
+
+
+def routine(routines, ingredients):
+    mask = routines.mask(ingredients)
+    return routines.morning_routine(mask), routines.night_routine(mask)
+
+
+@pytest.mark.parametrize('ingredients', [[], ['Niacinamide', 'Hyaluronic Acid'], ['Ceramides']])
+def test_default_routine(routines, ingredients):
+    assert routine(routines, ingredients) == (DEFAULT_MORNING, DEFAULT_NIGHT)
+
+
+@pytest.mark.parametrize('name', ['vitamin C', 'Vitamin C', 'VITAMIN C', ' vitamin c '])
+def test_vitamin_c_triggers_the_brightening_serum(routines, name):
+    morning, night = routine(routines, ['Niacinamide', name])
+    assert "**Serum**: Vitamin C or brightening serum" in morning
+    assert night == DEFAULT_NIGHT
+
+
+@pytest.mark.parametrize('name', ['AHA', 'aha', 'Glycolic Acid'])
+def test_aha_triggers_the_aha_step(routines, name):
+    morning, night = routine(routines, [name])
+    assert "**AHA**: 2-3x per week" in night
+    assert morning == DEFAULT_MORNING
+
+
+@pytest.mark.parametrize('name', ['Retinol', 'retinol', 'Retinoid', 'Retinal'])
+def test_retinoids_trigger_the_retinoid_step(routines, name):
+    _, night = routine(routines, [name])
+    assert "**Retinoid**" in night
+
+
+@pytest.mark.parametrize('name', ['Retinol Palmitate', 'encapsulated retinol', 'Hydroxypinacolone Retinoate'])
+def test_names_containing_retinol_do_not_trigger_the_retinoid_step(routines, name):
+    assert routine(routines, [name]) == (DEFAULT_MORNING, DEFAULT_NIGHT)
+
+
+def test_retinoid_takes_precedence_over_aha(routines):
+    _, night = routine(routines, ['AHA', 'Retinol'])
+    assert "3. **Retinoid**" in night
+    assert "**AHA**:" not in night
+
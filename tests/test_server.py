@@ -0,0 +1,76 @@
+import json
+import multiprocessing
+import os
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import server
+from server import RecommendationHandler, ServiceState
+
+DATASET = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'skincare_dataset.csv')
+
+
+@pytest.fixture(scope='module')
+def address():
+    state = ServiceState(multiprocessing.Value('i', 0), 1, DATASET)
+    state.warm()
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), RecommendationHandler)
+    httpd.daemon_threads = True
+    httpd.state = state
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(address, headers: bytes, body: bytes = b''):
+    """Status and JSON payload of a raw POST /recommend"""
+    with socket.create_connection(address, timeout=5) as connection:
+        connection.sendall(b"POST /recommend HTTP/1.1\r\nHost: test\r\n" + headers + b"\r\n" + body)
+        response = connection.makefile('rb')
+        status = int(response.readline().split()[1])
+        length = 0
+        for line in iter(response.readline, b'\r\n'):
+            name, _, value = line.decode().partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        return status, json.loads(response.read(length))
+
+
+def test_valid_request_is_served(address):
+    body = json.dumps({'text': 'acne and dark spots', 'skin_type': 'Oily'}).encode()
+    status, payload = post(address, b"Content-Length: %d\r\n" % len(body), body)
+    assert status == 200
+    assert payload['concerns']
+
+
+@pytest.mark.parametrize('headers, status', [
+    (b"", 411),
+    (b"Content-Length: abc\r\n", 400),
+    (b"Content-Length: -1\r\n", 400),
+    (b"Content-Length: +5\r\n", 400),
+    (b"Content-Length: %d\r\n" % (server.MAX_BODY_BYTES + 1), 413),
+])
+def test_bad_content_length_is_rejected(address, headers, status):
+    # Answered without waiting for a body, rather than failing or blocking on the read
+    code, payload = post(address, headers)
+    assert code == status
+    assert 'Content-Length' in payload['error'] or 'too large' in payload['error']
+
+
+def test_worker_exits_when_the_dataset_fails_to_load(monkeypatch, tmp_path):
+    broken = tmp_path / 'broken.csv'
+    broken.write_text('concern,notes\nacne,none\n')
+    state = ServiceState(multiprocessing.Value('i', 0), 1, str(broken))
+
+    def exit_worker(code):
+        raise SystemExit(code)
+
+    monkeypatch.setattr(server.os, '_exit', exit_worker)
+    with pytest.raises(SystemExit) as exited:
+        state.warm()
+    assert exited.value.code == 1
+    assert not state.ready.is_set() and state.ready_workers.value == 0